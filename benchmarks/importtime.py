@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""Measure the import time of the server and download worker entry points.
+
+Each entry point is imported in a fresh interpreter with `-X importtime`, and
+the cumulative import time of the module is reported as the median of several
+runs, along with the imports that take the most time on their own.
+
+Run from the repository root:
+
+    python -m benchmarks.importtime --runs 5 --top 10
+
+With `--max-ms`, the exit status is 1 if an entry point is slower than the
+limit, so the benchmark can guard against startup regressions in CI.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ENTRY_POINTS = {
+    "server": "gallery_dl_server.server",
+    "worker": "gallery_dl_server.download",
+}
+
+LINE_PATTERN = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$")
+
+
+def measure(module: str):
+    """Import a module in a new interpreter and return the import times in microseconds.
+
+    Returns the cumulative time of the module and the self time of every import.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+    )
+
+    cumulative = 0
+    self_times: dict[str, int] = {}
+
+    for line in result.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if not match:
+            continue
+
+        self_us, cumulative_us, _, name = match.groups()
+        self_times[name] = int(self_us)
+
+        if name == module:
+            cumulative = int(cumulative_us)
+
+    return cumulative, self_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="imports per entry point")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--max-ms", type=float, help="fail if an entry point is slower")
+    args = parser.parse_args()
+
+    failed = False
+
+    for name, module in ENTRY_POINTS.items():
+        runs = [measure(module) for _ in range(args.runs)]
+        total_ms = statistics.median(cumulative for cumulative, _ in runs) / 1000
+
+        print(f"{name} ({module}): {total_ms:.1f} ms")
+
+        slowest = sorted(runs[-1][1].items(), key=lambda item: item[1], reverse=True)
+        for module_name, self_us in slowest[: args.top]:
+            print(f"  {self_us / 1000:8.1f} ms  {module_name}")
+
+        if args.max_ms is not None and total_ms > args.max_ms:
+            print(f"  exceeds {args.max_ms:.1f} ms")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""Measure the latency of the `/gallery-dl/files` listing code path.
+
+Each request resolves the download root from the gallery-dl configuration
+and then lists a directory. The `uncached` case clears the loaded config
+before every call, like every request did before the config cache, and the
+`cached` case only checks the config files for changes.
+
+Run from the repository root with the gallery-dl configuration in place:
+
+    python -m benchmarks.listing --files 200 --iterations 500
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from gallery_dl_server import config, listing, server
+
+
+def measure(iterations: int, directory: str, cached: bool):
+    """Return the latency of each listing in milliseconds."""
+    timings: list[float] = []
+
+    for _ in range(iterations):
+        if not cached:
+            config.clear()
+
+        start = time.perf_counter()
+        server.get_download_root()
+        listing.select_entries(directory, listing.ListingQuery())
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return timings
+
+
+def report(name: str, timings: list[float]):
+    """Print summary statistics of the timings."""
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+
+    print(
+        f"{name:<10} mean {statistics.mean(timings):8.3f} ms"
+        f"   median {statistics.median(timings):8.3f} ms"
+        f"   p95 {p95:8.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200, help="files in the listed directory")
+    parser.add_argument("--iterations", type=int, default=500, help="listings per case")
+    args = parser.parse_args()
+
+    # Reloading logs the configuration files found every time
+    config.log.setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for index in range(args.files):
+            with open(os.path.join(directory, f"file{index:05d}.jpg"), "wb") as file:
+                file.write(b"\0" * 1024)
+
+        print(f"Listing {args.files} files, {args.iterations} iterations")
+
+        report("uncached", measure(args.iterations, directory, cached=False))
+        report("cached", measure(args.iterations, directory, cached=True))
+
+
+if __name__ == "__main__":
+    main()
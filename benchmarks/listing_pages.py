@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""Measure the latency of the first page of a large download directory.
+
+The `full` case lists and sorts every entry, like a listing without a
+limit. The `single pass` case selects the first page with a bounded heap
+while reading the directory once, like directories that are not cached are
+listed. The `cached` case selects the first page of a cached listing, whose
+entries are already sorted, by bisection.
+
+Run from the repository root:
+
+    python -m benchmarks.listing_pages --files 150000 --limit 200
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from gallery_dl_server import listing
+
+
+def measure(function, iterations: int):
+    """Return the median latency of a function in milliseconds."""
+    timings: list[float] = []
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=150000, help="files in the directory")
+    parser.add_argument("--limit", type=int, default=200, help="entries per page")
+    parser.add_argument("--iterations", type=int, default=5, help="listings per case")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for index in range(args.files):
+            open(os.path.join(directory, f"file{index:06d}.jpg"), "wb").close()
+
+        print(f"First page of {args.limit} entries out of {args.files} files")
+
+        query = listing.ListingQuery(limit=args.limit)
+        cached = listing.DirectoryListing.scan(directory)
+        cached.select(query)
+
+        cases = (
+            ("full", lambda: listing.select_entries(directory, listing.ListingQuery())),
+            ("single pass", lambda: listing.select_entries(directory, query)),
+            ("cached", lambda: cached.select(query)),
+        )
+
+        for name, function in cases:
+            print(f"{name:<12} {measure(function, args.iterations):10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
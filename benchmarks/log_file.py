@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""Measure the throughput of writing log records to the log file.
+
+Records are handled one at a time, like the log dispatcher does while
+downloads log at a steady rate. The `flush` case uses a plain
+`logging.FileHandler`, which flushes the file after every record, and the
+`batch` case uses `BatchFileHandler`, which buffers records and writes them
+once enough are buffered or the flush interval has passed. The number of
+writes to the file is counted by opening it with a counting raw file object.
+
+Run from the repository root:
+
+    python -m benchmarks.log_file --records 100000 --runs 3
+"""
+
+import argparse
+import io
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from gallery_dl_server import output
+
+MESSAGE = "[downloader.http][info] Downloading https://example.org/image%05d.jpg"
+
+
+class CountingFileIO(io.FileIO):
+    """Raw file object that counts the writes to the file."""
+
+    writes = 0
+
+    def write(self, data):
+        CountingFileIO.writes += 1
+        return super().write(data)
+
+
+def open_counted(file, mode="r", encoding=None, errors=None):
+    """Open a text file like `open` does, on top of a counting raw file object."""
+    raw = CountingFileIO(file, mode)
+    return io.TextIOWrapper(io.BufferedWriter(raw), encoding=encoding, errors=errors)
+
+
+def measure(handler_class, records: int):
+    """Return the seconds taken to handle the records and the number of writes."""
+    with tempfile.TemporaryDirectory() as directory:
+        handler = handler_class(os.path.join(directory, "test.log"), encoding="utf-8", delay=True)
+        handler.setFormatter(output.CustomFormatter(output.LOG_FORMAT, output.LOG_FORMAT_DATE))
+        handler._builtin_open = open_counted
+        CountingFileIO.writes = 0
+
+        start = time.perf_counter()
+
+        for index in range(records):
+            record = logging.LogRecord("benchmark", logging.INFO, "", 0, MESSAGE, (index,), None)
+            handler.handle(record)
+
+            if handler_class is output.BatchFileHandler:
+                # The dispatcher flushes once the flush interval has passed
+                if handler.flush_time is not None and handler.flush_time <= time.monotonic():
+                    handler.flush()
+
+        handler.close()
+        elapsed = time.perf_counter() - start
+
+    return elapsed, CountingFileIO.writes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100000, help="records per run")
+    parser.add_argument("--runs", type=int, default=3, help="runs per handler")
+    args = parser.parse_args()
+
+    print(f"Writing {args.records} records, {args.runs} runs")
+
+    for name, handler_class in (("flush", logging.FileHandler), ("batch", output.BatchFileHandler)):
+        runs = [measure(handler_class, args.records) for _ in range(args.runs)]
+        elapsed = statistics.median(elapsed for elapsed, _ in runs)
+        writes = runs[-1][1]
+        print(
+            f"{name:<6} {args.records / elapsed:10.0f} records/s   "
+            f"{elapsed * 1000:8.1f} ms   {writes:8d} writes"
+        )
+
+
+if __name__ == "__main__":
+    main()
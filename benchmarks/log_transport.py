@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+"""Measure the throughput of sending download logs to the server process.
+
+A child process logs a number of records and the parent decodes them, like
+`download_task` does for every download. The `pipe` case uses the current
+transport, `PipeHandler` sending fixed tuples over a pipe, and the `queue`
+case replicates the previous transport, which copied the record dictionary,
+test-pickled every attribute and put the dictionary on a multiprocessing
+queue.
+
+Run from the repository root:
+
+    python -m benchmarks.log_transport --records 20000 --runs 3
+"""
+
+import argparse
+import logging
+import multiprocessing
+import pickle
+import statistics
+import time
+
+from gallery_dl_server import output
+
+MESSAGE = "[downloader.http][info] Downloading https://example.org/image%05d.jpg"
+
+
+class QueueHandler(logging.Handler):
+    """Replica of the previous handler that put sanitised record dicts on a queue."""
+
+    def __init__(self, queue):
+        super().__init__()
+        self.queue = queue
+
+    def emit(self, record: logging.LogRecord):
+        record.msg = self.format(record).strip()
+        record.args = ()
+        record_dict = record.__dict__.copy()
+        record_dict["level"] = record.levelno
+
+        for key, value in list(record_dict.items()):
+            try:
+                pickle.dumps(value)
+            except Exception:
+                record_dict.pop(key)
+
+        self.queue.put(record_dict)
+
+
+def log_records(handler: logging.Handler, records: int):
+    """Log the records in a child process through the handler."""
+    logger = logging.getLogger("benchmark")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+
+    for index in range(records):
+        logger.info(MESSAGE, index)
+
+
+def child_pipe(conn, records: int):
+    log_records(output.PipeHandler(conn, "benchmark", level=logging.DEBUG), records)
+    conn.close()
+
+
+def child_queue(queue, records: int):
+    log_records(QueueHandler(queue), records)
+    queue.put(None)
+
+
+def measure_pipe(records: int):
+    """Return the seconds taken to receive and decode the records over a pipe."""
+    reader, writer = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=child_pipe, args=(writer, records))
+
+    start = time.perf_counter()
+    process.start()
+    writer.close()
+
+    received = 0
+    try:
+        while True:
+            output.decode_record(reader.recv())
+            received += 1
+    except EOFError:
+        pass
+
+    elapsed = time.perf_counter() - start
+    process.join()
+
+    assert received == records
+    return elapsed
+
+
+def measure_queue(records: int):
+    """Return the seconds taken to receive and decode the records over a queue."""
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=child_queue, args=(queue, records))
+
+    start = time.perf_counter()
+    process.start()
+
+    received = 0
+    while True:
+        record_dict = queue.get()
+        if record_dict is None:
+            break
+        record_dict.pop("level")
+        logging.makeLogRecord(record_dict)
+        received += 1
+
+    elapsed = time.perf_counter() - start
+    process.join()
+
+    assert received == records
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000, help="records per run")
+    parser.add_argument("--runs", type=int, default=3, help="runs per transport")
+    args = parser.parse_args()
+
+    print(f"Sending {args.records} records, {args.runs} runs")
+
+    for name, measure in (("queue", measure_queue), ("pipe", measure_pipe)):
+        elapsed = statistics.median(measure(args.records) for _ in range(args.runs))
+        print(f"{name:<6} {args.records / elapsed:10.0f} records/s   {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,7 @@ if sys.version_info < (3, 10):
         "Please upgrade to Python 3.10 or above to use gallery-dl-server."
     )
 
-from . import app, options, utils, version
+from . import options, utils, version
 
 __version__ = version.__version__
 __all__ = ["run"]
@@ -29,6 +29,15 @@ def run(
     server_log_level: str = "info",
     access_log: bool = False,
     cors_allow_origins: str | list[str] = "*",
+    max_jobs: int = 4,
+    drain_timeout: int = 30,
+    progress_rate: float = 2.0,
+    log_max_size: int = 10,
+    log_max_age: int = 0,
+    log_backups: int = 5,
+    workers: int = 1,
+    broker: str = "sqlite",
+    data_dir: str = "",
 ) -> None:
     """
     Run gallery-dl-server with custom options.
@@ -55,9 +64,38 @@ def run(
         cors_allow_origins (str | list[str]): CORS allow origins, either '*' or a list of origins
             (comma-separated string supported).
 
+        max_jobs (int): The maximum number of downloads to run concurrently
+            (further requests wait in the download queue).
+
+        drain_timeout (int): The number of seconds running downloads are given to finish on shutdown
+            (unfinished downloads are resumed on the next start).
+
+        progress_rate (float): The maximum number of download progress updates per second for
+            each job (progress is kept in memory and the final value is written to the log).
+
+        log_max_size (int): The size in MiB at which the log file is rotated
+            (`0` disables rotation by size).
+
+        log_max_age (int): The number of hours after which the log file is rotated
+            (`0` disables rotation by age).
+
+        log_backups (int): The number of compressed log segments to keep.
+
+        workers (int): The number of server worker processes
+            (all workers share the job queue through the broker).
+
+        broker (str): The job broker that holds the queue and job state
+            (accepted values: `sqlite`, `memory`; `memory` only supports a single worker).
+
+        data_dir (str): The directory for the server database
+            (defaults to `/config` in Docker, otherwise the log file directory).
+
     Raises:
         TypeError: If an invalid parameter is passed to the function, it will raise a `TypeError`.
 
+        ValueError: If the `memory` broker is combined with more than one worker, since each
+            worker would get its own queue.
+
     Examples:
         To run the server on `localhost` with a specific port:
 
@@ -77,19 +115,22 @@ def run(
             server.run(host="0.0.0.0", port=0, server_log_level="debug", access_log=True)
         ```
 
-        The `if __name__ == "__main__"` guard is necessary on Windows to prevent the server from
+        The `if __name__ == "__main__"` guard is necessary to prevent the server from
         starting itself recursively when attempting to initiate a download.
 
         This is because the server runs each download in a child process using the
-        `multiprocessing` module, which uses `spawn` as the default start method on Windows.
+        `multiprocessing` module with the `forkserver` start method, or `spawn` on Windows.
 
-        The `spawn` method creates a new Python interpreter which imports the main module,
+        Both methods start a new Python interpreter which imports the main module,
         causing any unguarded code to be executed again in the child process.
 
         See the following:
         - https://docs.python.org/3/library/multiprocessing.html#contexts-and-start-methods
         - https://docs.python.org/3/library/multiprocessing.html#the-spawn-and-forkserver-start-methods
     """
+    if broker.lower() == "memory" and workers > 1:
+        raise ValueError("The memory broker cannot be shared by multiple workers, use 'sqlite'")
+
     kwargs = {
         "host": host,
         "port": port,
@@ -98,8 +139,20 @@ def run(
         "server_log_level": server_log_level.lower(),
         "access_log": access_log,
         "cors_allow_origins": options.parse_cors_allow_origins(cors_allow_origins),
+        "max_jobs": max_jobs,
+        "drain_timeout": drain_timeout,
+        "progress_rate": float(progress_rate),
+        "log_max_size": log_max_size,
+        "log_max_age": log_max_age,
+        "log_backups": log_backups,
+        "workers": workers,
+        "broker": broker.lower(),
+        "data_dir": utils.normalise_path(data_dir),
     }
 
+    # Imported here so download processes importing the package skip uvicorn
+    from . import app
+
     try:
         args = options.custom_args = options.CustomNamespace(**kwargs)
         app.main(args=args)
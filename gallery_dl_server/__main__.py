@@ -2,8 +2,10 @@
 
 import multiprocessing
 
-from gallery_dl_server import app
-
 if __name__ == "__main__":
     multiprocessing.freeze_support()
+
+    # Download processes started with `spawn` import this module as well
+    from gallery_dl_server import app
+
     app.main(is_main_module=True)
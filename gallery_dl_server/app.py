@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+import os
+
 import uvicorn
 
 from . import options
@@ -14,11 +16,17 @@ def main(
     if args is None:
         args = options.parse_args(is_main_module)
 
+    if args.workers > 1:
+        os.environ.update(options.to_environ(args))
+
     kwargs = {
         "host": args.host,
         "port": args.port,
         "log_level": args.server_log_level,
         "access_log": args.access_log,
+        "workers": args.workers,
+        # Log messages are repetitive text and compress well
+        "ws_per_message_deflate": True,
     }
 
     try:
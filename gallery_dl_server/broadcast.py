@@ -0,0 +1,478 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+import re
+import threading
+import time
+
+from collections import deque
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Mapping
+
+from . import output
+from .joblogs import parse_level, parse_level_or_zero
+
+log = output.initialise_logging(__name__)
+
+BUFFER_LINES = 1000
+READ_SIZE = 64 * 1024
+BATCH_INTERVAL = 0.25
+RESYNC_CLOSE_CODE = 4000
+JOB_DOMAINS_MAX = 1000
+TEXT_MAX_LENGTH = 500
+RESTART_DELAY = 1.0
+
+LINE_PATTERN = re.compile(r"\S+ \S+ \[(\w+)\] (?:\[job:([^\]\s]+)\] )?")
+
+# Level, job id and domain of a log line
+LineInfo = tuple[int, str | None, str | None]
+
+
+class ClientLagged(Exception):
+    """Raised when lines a client has not received were dropped from the buffer."""
+
+    def __init__(self, skipped: int):
+        super().__init__(f"{skipped} lines were dropped before they were sent")
+        self.skipped = skipped
+
+
+class LogFilter:
+    """Log lines and download progress a client subscribed to.
+
+    Lines are matched by minimum level, job ids, domains and a case-insensitive
+    substring. Clients cannot send regexes, since matching one that backtracks
+    badly on the event loop would stall the logs of every client. Progress is
+    only matched by job ids and domains,
+    since it is not a log line. The filter is compiled once per client, and
+    the level, job and domain of each line are only parsed once for all
+    clients.
+    """
+
+    def __init__(
+        self,
+        min_level: int = 0,
+        job_ids: list[str] | None = None,
+        domains: list[str] | None = None,
+        text: str = "",
+    ):
+        self.min_level = min_level
+        self.job_ids = frozenset(job_ids) if job_ids else None
+        self.domains = frozenset(domain.lower() for domain in domains) if domains else None
+        self.text = text.lower()
+
+    @classmethod
+    def from_params(cls, params: Mapping[str, str]):
+        """Create a filter from the `level`, `job`, `domain` and `q` query parameters.
+
+        `job` and `domain` take comma-separated lists. Returns None if none of
+        the parameters are given, and raises ValueError for invalid values.
+        """
+        level = params.get("level", "")
+        job_ids = split_list(params.get("job", ""))
+        domains = split_list(params.get("domain", ""))
+        text = params.get("q", "")
+
+        if not (level or job_ids or domains or text):
+            return None
+
+        if len(text) > TEXT_MAX_LENGTH:
+            raise ValueError(f"Search text must be at most {TEXT_MAX_LENGTH} characters")
+
+        min_level = parse_level(level) if level else 0
+
+        return cls(min_level, job_ids, domains, text)
+
+    def match_line(self, line: str, level: int, job_id: str | None, domain: str | None):
+        """Return whether a log line is wanted."""
+        if level < self.min_level:
+            return False
+
+        if not self.match_job(job_id, domain):
+            return False
+
+        return not self.text or self.text in line.lower()
+
+    def match_job(self, job_id: str | None, domain: str | None):
+        """Return whether the lines and progress of a job are wanted."""
+        if self.job_ids is not None and job_id not in self.job_ids:
+            return False
+
+        return self.domains is None or domain in self.domains
+
+
+def split_list(value: str):
+    """Return the non-empty items of a comma-separated list."""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class LogBroadcaster:
+    """Read new lines of the log file once and share them with all log stream clients.
+
+    Lines are kept in a bounded ring buffer with increasing sequence numbers.
+    Every client follows the buffer from its own position, so new clients can
+    start with a backlog and nothing is buffered per client. Download progress
+    is shared separately, since only the latest update of each job matters.
+
+    The level and job of each line are parsed when it is read, so clients
+    with a filter only get the lines they subscribed to. The domains of jobs
+    run by this server are added with `add_job` when they start. Jobs run by
+    other server processes are looked up with `get_job_domain` while reading,
+    outside the event loop, so streams only look domains up in memory.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        get_progress: Callable[[], dict[str, str]],
+        capacity=BUFFER_LINES,
+        get_job_domain: Callable[[str], str | None] | None = None,
+    ):
+        self.path = path
+        self.get_progress = get_progress
+        self.get_job_domain = get_job_domain
+        self.lines: deque[str] = deque(maxlen=capacity)
+        self.info: deque[LineInfo] = deque(maxlen=capacity)
+        self.last_info: LineInfo = (0, None, None)
+        self.job_domains: dict[str, str | None] = {}
+        self.last_seq = 0
+        self.progress: dict[str, str] = {}
+        self.changed = asyncio.Event()
+        self.closed = False
+        self.file_id: tuple[int, int] | None = None
+        self.position = 0
+        self.partial = b""
+        self.pending: list[str] = []
+        self.lock = threading.Lock()
+        self.domains_lock = threading.Lock()
+        # Sequence numbers start over with the server, so event ids include this
+        self.epoch = format(int(time.time()), "x")
+
+    @property
+    def first_seq(self):
+        """Return the sequence number of the oldest line in the buffer."""
+        return self.last_seq - len(self.lines) + 1
+
+    def publish(self, lines: list[str], info: list[LineInfo]):
+        """Add lines and their level, job and domain to the buffer and wake up the clients."""
+        if not lines:
+            return
+
+        self.lines.extend(lines)
+        self.info.extend(info)
+        self.last_seq += len(lines)
+        self.notify()
+
+    def update_progress(self):
+        """Take the latest download progress and wake up the clients if it changed."""
+        progress = self.get_progress()
+
+        if progress != self.progress:
+            self.progress = progress
+            self.notify()
+
+    def notify(self):
+        """Wake up the clients waiting for changes."""
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def since(self, seq: int, log_filter: LogFilter | None = None):
+        """Return the lines after a sequence number that are still in the buffer.
+
+        With a filter, only the lines it matches are returned.
+        """
+        start = max(seq + 1, self.first_seq)
+        if start > self.last_seq:
+            return []
+
+        offset = start - self.first_seq
+        lines = islice(self.lines, offset, None)
+
+        if log_filter is None:
+            return list(lines)
+
+        return [
+            line
+            for line, info in zip(lines, islice(self.info, offset, None))
+            if log_filter.match_line(line, *info)
+        ]
+
+    def backlog_seq(self, backlog: int, log_filter: LogFilter | None = None):
+        """Return the sequence number before the most recent `backlog` lines in the buffer.
+
+        With a filter, only the lines it matches are counted.
+        """
+        if log_filter is None or backlog <= 0:
+            return max(self.last_seq - max(backlog, 0), self.first_seq - 1)
+
+        seq = self.last_seq
+
+        for line, info in zip(reversed(self.lines), reversed(self.info)):
+            seq -= 1
+
+            if log_filter.match_line(line, *info):
+                backlog -= 1
+                if backlog == 0:
+                    break
+
+        return seq
+
+    def add_job(self, job_id: str, domain: str | None):
+        """Remember the domain of a job, dropping the oldest one above the limit."""
+        with self.domains_lock:
+            self.job_domains.pop(job_id, None)
+
+            if len(self.job_domains) >= JOB_DOMAINS_MAX:
+                self.job_domains.pop(next(iter(self.job_domains)), None)
+
+            self.job_domains[job_id] = domain
+
+    def get_domain(self, job_id: str | None):
+        """Return the known domain of a job, without looking it up."""
+        return self.job_domains.get(job_id) if job_id is not None else None
+
+    def lookup_domain(self, job_id: str | None):
+        """Return the domain of a job, looking up unknown jobs once. Not for the event loop."""
+        if job_id is None or job_id in self.job_domains:
+            return self.get_domain(job_id)
+
+        domain = self.get_job_domain(job_id) if self.get_job_domain is not None else None
+        self.add_job(job_id, domain)
+
+        return domain
+
+    def event_id(self, seq: int):
+        """Return the event id of a sequence number, for clients to resume from."""
+        return f"{self.epoch}-{seq}"
+
+    def parse_event_id(self, event_id: str):
+        """Return the sequence number of an event id of this server, or None."""
+        epoch, _, seq = event_id.partition("-")
+
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self.last_seq:
+            return None
+
+        return int(seq)
+
+    async def events(
+        self,
+        seq: int,
+        skip=False,
+        heartbeat: float | None = None,
+        log_filter: LogFilter | None = None,
+    ) -> AsyncIterator[tuple[str, Any, Any]]:
+        """Yield the changes after a sequence number until the broadcaster stops.
+
+        The changes are tuples of a kind and two values:
+
+        - `progress`, the job id and the latest progress line, or None once
+          the job has no progress anymore
+        - `skipped`, the number of lines dropped before they were taken
+        - `lines`, the sequence number of the last line and the new lines
+        - `heartbeat`, after `heartbeat` seconds without changes
+
+        Everything that changed during a batch interval is yielded together,
+        and the next batch is only read once the client has taken the last
+        one. A client that is too slow to keep up with the buffer gets
+        ClientLagged, or with `skip`, continues with the oldest buffered line.
+        With a filter, only the lines and progress it matches are yielded.
+        """
+        loop = asyncio.get_running_loop()
+        sent_progress: dict[str, str] = {}
+        next_batch = 0.0
+
+        while not self.closed:
+            delay = next_batch - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            changed = self.changed
+            next_batch = loop.time() + BATCH_INTERVAL
+
+            for job_id, line in self.progress.items():
+                if log_filter is not None:
+                    if not log_filter.match_job(job_id, self.get_domain(job_id)):
+                        continue
+
+                if sent_progress.get(job_id) != line:
+                    sent_progress[job_id] = line
+                    yield "progress", job_id, line
+
+            for job_id in sent_progress.keys() - self.progress.keys():
+                del sent_progress[job_id]
+                yield "progress", job_id, None
+
+            skipped = self.first_seq - 1 - seq
+            if skipped > 0:
+                if not skip:
+                    raise ClientLagged(skipped)
+
+                seq += skipped
+                yield "skipped", skipped, None
+
+            lines = self.since(seq, log_filter)
+            seq = max(seq, self.last_seq)
+            if lines:
+                yield "lines", seq, lines
+
+            if changed is self.changed:
+                try:
+                    await asyncio.wait_for(changed.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield "heartbeat", None, None
+
+    async def follow(
+        self,
+        backlog=0,
+        skip=False,
+        log_filter: LogFilter | None = None,
+    ) -> AsyncIterator[str]:
+        """Yield the WebSocket messages for a client until the broadcaster stops.
+
+        The client starts with up to `backlog` of the most recent lines. Each
+        progress update is a separate message, since the logs page replaces
+        the previous progress line with the first line of a message. With
+        `skip`, a client that fell behind gets a line saying how many lines
+        it missed, otherwise ClientLagged is raised. With a filter, only the
+        lines and progress it matches are sent.
+        """
+        seq = self.backlog_seq(backlog, log_filter)
+
+        async for kind, key, value in self.events(seq, skip, log_filter=log_filter):
+            if kind == "progress":
+                if value is not None:
+                    yield value + "\n"
+            elif kind == "skipped":
+                yield f"[{key} log lines skipped]\n"
+            elif kind == "lines":
+                yield "\n".join(value) + "\n"
+
+    async def run(self, stop_event: asyncio.Event):
+        """Read new lines whenever the log file changes, until the stop event is set.
+
+        The directory of the log file is watched, since the file is only
+        created once the first record is written and is replaced when it is
+        rotated. If watching fails, it is started again after a delay, so
+        clients stay subscribed.
+        """
+        import watchfiles
+
+        await asyncio.to_thread(self.seek_end)
+
+        directory, name = os.path.split(os.path.abspath(self.path))
+        failed = False
+
+        try:
+            while not stop_event.is_set():
+                try:
+                    async for _ in watchfiles.awatch(
+                        directory,
+                        watch_filter=lambda _, path: os.path.basename(path) == name,
+                        stop_event=stop_event,
+                        recursive=False,
+                        rust_timeout=100,
+                        yield_on_timeout=True,
+                    ):
+                        lines, info = await asyncio.to_thread(self.read_lines)
+                        self.publish(lines, info)
+                        self.update_progress()
+                        failed = False
+                except Exception as e:
+                    # Only log the first of consecutive failures
+                    if not failed:
+                        log.warning(f"Restarting the log file tailer: {type(e).__name__}: {e}")
+                    failed = True
+
+                    try:
+                        await asyncio.wait_for(stop_event.wait(), timeout=RESTART_DELAY)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self.closed = True
+            self.notify()
+
+    def seek_end(self):
+        """Start reading at the current end of the log file."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+
+        self.file_id = (stat.st_dev, stat.st_ino)
+        self.position = stat.st_size
+
+    def read_remaining(self):
+        """Keep the lines not read yet before the log file is rotated.
+
+        They are returned by the next read, which starts with the new file.
+        """
+        with self.lock:
+            self.pending.extend(self.read_file())
+
+    def read_lines(self):
+        """Return the complete lines added to the log file since the last read.
+
+        Returns the lines and the level, job and domain of each line.
+        """
+        with self.lock:
+            lines = self.pending + self.read_file()
+            self.pending = []
+
+        return lines, self.describe(lines)
+
+    def describe(self, lines: list[str]):
+        """Return the level, job and domain of each line.
+
+        Lines without a level, such as the following lines of a traceback,
+        belong to the line before them.
+        """
+        info: list[LineInfo] = []
+        level, job_id, domain = self.last_info
+
+        for line in lines:
+            match = LINE_PATTERN.match(line)
+
+            if match is not None:
+                level = parse_level_or_zero(match.group(1))
+                job_id = match.group(2)
+                domain = self.lookup_domain(job_id)
+
+            info.append((level, job_id, domain))
+
+        self.last_info = (level, job_id, domain)
+
+        return info
+
+    def read_file(self):
+        """Return the complete lines added to the log file since it was last read.
+
+        Reading starts over if the file was cleared or replaced.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+
+        file_id = (stat.st_dev, stat.st_ino)
+
+        if file_id != self.file_id or stat.st_size < self.position:
+            self.file_id = file_id
+            self.position = 0
+            self.partial = b""
+
+        if stat.st_size == self.position:
+            return []
+
+        chunks = [self.partial]
+
+        with open(self.path, "rb") as file:
+            file.seek(self.position)
+
+            while chunk := file.read(READ_SIZE):
+                chunks.append(chunk)
+
+            self.position = file.tell()
+
+        *lines, self.partial = b"".join(chunks).split(b"\n")
+
+        return [line.decode("utf-8", errors="replace").rstrip("\r") for line in lines]
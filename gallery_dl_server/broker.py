@@ -0,0 +1,559 @@
+# -*- coding: utf-8 -*-
+
+import copy
+import json
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+from . import database, resources
+from .jobs import Job
+
+BROKERS = ("sqlite", "memory")
+
+ACTIVE_STATUSES = ("queued", "running")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    domain TEXT,
+    options TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    subscription_id INTEGER,
+    status TEXT NOT NULL,
+    exit_code INTEGER,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    worker TEXT,
+    lease_until REAL,
+    available_at REAL NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    usage TEXT,
+    limit_exceeded TEXT,
+    tags TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, priority, created);
+CREATE INDEX IF NOT EXISTS jobs_url ON jobs (url, status);
+CREATE TABLE IF NOT EXISTS domain_stats (
+    domain TEXT PRIMARY KEY,
+    jobs INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    limited INTEGER NOT NULL DEFAULT 0,
+    wall_time REAL NOT NULL DEFAULT 0,
+    cpu_time REAL NOT NULL DEFAULT 0,
+    peak_rss INTEGER NOT NULL DEFAULT 0,
+    io_read_bytes INTEGER NOT NULL DEFAULT 0,
+    disk_bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS domain_cooldowns (
+    domain TEXT PRIMARY KEY,
+    until REAL NOT NULL
+);
+"""
+
+DOMAIN_STATS_KEYS = (
+    "jobs",
+    "failed",
+    "limited",
+    "wall_time",
+    "cpu_time",
+    "peak_rss",
+    "io_read_bytes",
+    "disk_bytes",
+)
+
+
+class Broker(ABC):
+    """Shared store for the job queue, job state and per-URL locks.
+
+    A URL is locked while a job for it is running with a valid lease, so
+    no two workers download the same URL at the same time. Workers renew
+    the leases of their running jobs, and jobs whose lease expires (e.g.
+    because the worker was killed) are handed to the next worker to claim.
+
+    Jobs queued with a delay, and jobs for a domain that is cooling down,
+    are not claimed until their time has come.
+
+    A job can only be finished or requeued by the worker holding the lease
+    of its latest claim. A worker whose lease expired and whose job was
+    claimed again gets `False`, and its result is dropped.
+    """
+
+    @abstractmethod
+    def submit(self, job: Job) -> Job:
+        """Queue a job, or return the queued job with the same URL and options."""
+
+    @abstractmethod
+    def claim(self, worker: str, lease: float) -> Job | None:
+        """Mark the next runnable job as running on the worker and return it."""
+
+    @abstractmethod
+    def renew(self, job_ids: list[str], worker: str, lease: float) -> None:
+        """Extend the leases of jobs running on the worker."""
+
+    @abstractmethod
+    def finish(self, job: Job) -> bool:
+        """Record the result and resource usage of a job and release its URL lock.
+
+        The usage is also added to the totals of the job's domain. Returns
+        whether the job was still leased by the claim it was run for.
+        """
+
+    @abstractmethod
+    def requeue(self, job: Job, delay: float = 0) -> bool:
+        """Return an unfinished job to the queue, runnable after the delay.
+
+        Returns whether the job was still leased by the claim it was run for.
+        """
+
+    @abstractmethod
+    def cooldown(self, domain: str, until: float) -> None:
+        """Hold back all jobs for a domain until the given time."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Job | None:
+        """Return a job by ID."""
+
+    @abstractmethod
+    def list_jobs(self, limit: int) -> list[Job]:
+        """Return the most recently created jobs."""
+
+    @abstractmethod
+    def count(self, status: str) -> int:
+        """Return the number of jobs with the given status."""
+
+    @abstractmethod
+    def has_active_subscription(self, subscription_id: int) -> bool:
+        """Check if a job for the subscription is queued or running."""
+
+    @abstractmethod
+    def prune(self, keep: int) -> None:
+        """Delete the oldest finished jobs beyond the number to keep."""
+
+    @abstractmethod
+    def domain_stats(self) -> list[dict[str, Any]]:
+        """Return resource usage totals per domain, most CPU time first."""
+
+
+def domain_stats_delta(job: Job):
+    """Return the amounts a finished job adds to its domain's totals."""
+    return {
+        "jobs": 1,
+        "failed": int(job.status == "failed"),
+        "limited": int(job.limit_exceeded is not None),
+        "wall_time": job.usage.get("wall_time", 0),
+        "cpu_time": job.usage.get("cpu_time", 0),
+        "peak_rss": int(job.usage.get("peak_rss", 0)),
+        "io_read_bytes": int(job.usage.get("io_read_bytes", 0)),
+        "disk_bytes": int(job.usage.get("disk_bytes", 0)),
+    }
+
+
+def holds_lease(stored: Job | None, job: Job):
+    """Return whether a stored job is still running for the claim a job was run for."""
+    return (
+        stored is not None
+        and stored.status == "running"
+        and stored.worker == job.worker
+        and stored.attempts == job.attempts
+    )
+
+
+def job_from_row(row: Any):
+    """Create a job from a database row."""
+    job = Job(
+        row["url"],
+        json.loads(row["options"]),
+        priority=row["priority"],
+        subscription_id=row["subscription_id"],
+        job_id=row["id"],
+    )
+    job.status = row["status"]
+    job.exit_code = row["exit_code"]
+    job.created = row["created"]
+    job.started = row["started"]
+    job.finished = row["finished"]
+    job.worker = row["worker"]
+    job.usage = json.loads(row["usage"]) if row["usage"] else {}
+    job.limit_exceeded = row["limit_exceeded"]
+    job.attempts = row["attempts"]
+    job.tags = json.loads(row["tags"]) if row["tags"] else []
+    job.available_at = row["available_at"]
+
+    return job
+
+
+class SQLiteBroker(database.Database, Broker):
+    """Broker backed by an SQLite database that can live on a shared volume."""
+
+    schema = SCHEMA
+
+    def submit(self, job: Job):
+        options = json.dumps(job.request_options, sort_keys=True)
+
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE url = ? AND options = ? AND status = 'queued'",
+                (job.url, options),
+            ).fetchone()
+
+            if row is not None:
+                return job_from_row(row)
+
+            conn.execute(
+                """
+                INSERT INTO jobs (
+                    id, url, domain, options, priority, subscription_id, status, created
+                )
+                VALUES (?, ?, ?, ?, ?, ?, 'queued', ?)
+                """,
+                (
+                    job.id,
+                    job.url,
+                    resources.get_domain(job.url),
+                    options,
+                    job.priority,
+                    job.subscription_id,
+                    job.created,
+                ),
+            )
+
+        return job
+
+    def claim(self, worker: str, lease: float):
+        now = time.time()
+
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                """
+                SELECT * FROM jobs
+                WHERE (status = 'queued' OR (status = 'running' AND lease_until < :now))
+                AND available_at <= :now
+                AND url NOT IN (
+                    SELECT url FROM jobs WHERE status = 'running' AND lease_until >= :now
+                )
+                AND (domain IS NULL OR domain NOT IN (
+                    SELECT domain FROM domain_cooldowns WHERE until > :now
+                ))
+                ORDER BY priority, created
+                LIMIT 1
+                """,
+                {"now": now},
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            conn.execute(
+                """
+                UPDATE jobs SET
+                    status = 'running', started = ?, worker = ?, lease_until = ?,
+                    attempts = attempts + 1
+                WHERE id = ?
+                """,
+                (now, worker, now + lease, row["id"]),
+            )
+
+        job = job_from_row(row)
+        job.status = "running"
+        job.started = now
+        job.worker = worker
+        job.attempts += 1
+
+        return job
+
+    def renew(self, job_ids: list[str], worker: str, lease: float):
+        lease_until = time.time() + lease
+
+        with self.connection() as conn:
+            conn.executemany(
+                """
+                UPDATE jobs SET lease_until = ?
+                WHERE id = ? AND worker = ? AND status = 'running'
+                """,
+                [(lease_until, job_id, worker) for job_id in job_ids],
+            )
+
+    def finish(self, job: Job):
+        delta = domain_stats_delta(job)
+
+        with self.connection() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs SET
+                    status = ?, exit_code = ?, finished = ?, lease_until = NULL,
+                    usage = ?, limit_exceeded = ?, tags = ?
+                WHERE id = ? AND status = 'running' AND worker = ? AND attempts = ?
+                """,
+                (
+                    job.status,
+                    job.exit_code,
+                    job.finished,
+                    json.dumps(job.usage),
+                    job.limit_exceeded,
+                    json.dumps(job.tags),
+                    job.id,
+                    job.worker,
+                    job.attempts,
+                ),
+            )
+
+            if cursor.rowcount == 0:
+                return False
+
+            conn.execute(
+                """
+                INSERT INTO domain_stats VALUES (
+                    :domain, :jobs, :failed, :limited, :wall_time,
+                    :cpu_time, :peak_rss, :io_read_bytes, :disk_bytes
+                )
+                ON CONFLICT (domain) DO UPDATE SET
+                    jobs = jobs + excluded.jobs,
+                    failed = failed + excluded.failed,
+                    limited = limited + excluded.limited,
+                    wall_time = wall_time + excluded.wall_time,
+                    cpu_time = cpu_time + excluded.cpu_time,
+                    peak_rss = MAX(peak_rss, excluded.peak_rss),
+                    io_read_bytes = io_read_bytes + excluded.io_read_bytes,
+                    disk_bytes = disk_bytes + excluded.disk_bytes
+                """,
+                {"domain": resources.get_domain(job.url), **delta},
+            )
+
+        return True
+
+    def requeue(self, job: Job, delay: float = 0):
+        with self.connection() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs SET
+                    status = 'queued', worker = NULL, lease_until = NULL, available_at = ?
+                WHERE id = ? AND status = 'running' AND worker = ? AND attempts = ?
+                """,
+                (time.time() + delay, job.id, job.worker, job.attempts),
+            )
+
+        return cursor.rowcount > 0
+
+    def cooldown(self, domain: str, until: float):
+        with self.connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO domain_cooldowns VALUES (?, ?)
+                ON CONFLICT (domain) DO UPDATE SET until = MAX(until, excluded.until)
+                """,
+                (domain, until),
+            )
+
+    def get(self, job_id: str):
+        with self.connection() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+        return job_from_row(row) if row is not None else None
+
+    def list_jobs(self, limit: int):
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs ORDER BY created DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+        return [job_from_row(row) for row in rows]
+
+    def count(self, status: str):
+        with self.connection() as conn:
+            row = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)).fetchone()
+
+        return row[0]
+
+    def has_active_subscription(self, subscription_id: int):
+        with self.connection() as conn:
+            row = conn.execute(
+                """
+                SELECT 1 FROM jobs
+                WHERE subscription_id = ? AND status IN ('queued', 'running')
+                LIMIT 1
+                """,
+                (subscription_id,),
+            ).fetchone()
+
+        return row is not None
+
+    def prune(self, keep: int):
+        with self.connection() as conn:
+            conn.execute(
+                """
+                DELETE FROM jobs WHERE status NOT IN ('queued', 'running') AND id NOT IN (
+                    SELECT id FROM jobs WHERE status NOT IN ('queued', 'running')
+                    ORDER BY finished DESC LIMIT ?
+                )
+                """,
+                (keep,),
+            )
+
+    def domain_stats(self):
+        with self.connection() as conn:
+            rows = conn.execute("SELECT * FROM domain_stats ORDER BY cpu_time DESC").fetchall()
+
+        return [dict(row) for row in rows]
+
+
+class MemoryBroker(Broker):
+    """Broker that keeps jobs in memory, shared only by threads of one process.
+
+    Claimed jobs are handed out as copies, so a worker only changes the
+    stored job when it finishes or requeues it, like with the SQLite broker.
+    """
+
+    def __init__(self):
+        self.jobs: dict[str, Job] = {}
+        self.leases: dict[str, float] = {}
+        self.stats: dict[str, dict[str, Any]] = {}
+        self.cooldowns: dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def submit(self, job: Job):
+        with self.lock:
+            for existing in self.jobs.values():
+                if (
+                    existing.status == "queued"
+                    and existing.url == job.url
+                    and existing.request_options == job.request_options
+                ):
+                    return existing
+
+            self.jobs[job.id] = job
+
+        return job
+
+    def claim(self, worker: str, lease: float):
+        now = time.time()
+
+        def leased(job: Job):
+            return job.status == "running" and self.leases.get(job.id, 0) >= now
+
+        def waiting(job: Job):
+            domain = resources.get_domain(job.url)
+            return job.available_at > now or self.cooldowns.get(domain, 0) > now
+
+        with self.lock:
+            locked = {job.url for job in self.jobs.values() if leased(job)}
+            runnable = [
+                job
+                for job in self.jobs.values()
+                if job.status in ACTIVE_STATUSES
+                and not leased(job)
+                and not waiting(job)
+                and job.url not in locked
+            ]
+
+            if not runnable:
+                return None
+
+            job = min(runnable, key=lambda job: (job.priority, job.created))
+            job.status = "running"
+            job.started = now
+            job.worker = worker
+            job.attempts += 1
+            self.leases[job.id] = now + lease
+
+            claimed = copy.copy(job)
+            claimed.usage = dict(job.usage)
+            claimed.tags = list(job.tags)
+
+        return claimed
+
+    def renew(self, job_ids: list[str], worker: str, lease: float):
+        lease_until = time.time() + lease
+
+        with self.lock:
+            for job_id in job_ids:
+                job = self.jobs.get(job_id)
+                if job is not None and job.worker == worker and job.status == "running":
+                    self.leases[job_id] = lease_until
+
+    def finish(self, job: Job):
+        domain = resources.get_domain(job.url)
+
+        with self.lock:
+            if not holds_lease(self.jobs.get(job.id), job):
+                return False
+
+            self.jobs[job.id] = job
+            self.leases.pop(job.id, None)
+
+            stats = self.stats.setdefault(
+                domain, {"domain": domain, **dict.fromkeys(DOMAIN_STATS_KEYS, 0)}
+            )
+            for key, value in domain_stats_delta(job).items():
+                stats[key] = max(stats[key], value) if key == "peak_rss" else stats[key] + value
+
+        return True
+
+    def requeue(self, job: Job, delay: float = 0):
+        with self.lock:
+            stored = self.jobs.get(job.id)
+
+            if stored is None or not holds_lease(stored, job):
+                return False
+
+            stored.status = "queued"
+            stored.worker = None
+            stored.available_at = time.time() + delay
+            self.leases.pop(job.id, None)
+
+        return True
+
+    def cooldown(self, domain: str, until: float):
+        with self.lock:
+            self.cooldowns[domain] = max(self.cooldowns.get(domain, 0), until)
+
+    def get(self, job_id: str):
+        return self.jobs.get(job_id)
+
+    def list_jobs(self, limit: int):
+        with self.lock:
+            jobs = sorted(self.jobs.values(), key=lambda job: job.created, reverse=True)
+
+        return jobs[:limit]
+
+    def count(self, status: str):
+        with self.lock:
+            return sum(1 for job in self.jobs.values() if job.status == status)
+
+    def has_active_subscription(self, subscription_id: int):
+        with self.lock:
+            return any(
+                job.subscription_id == subscription_id and job.status in ACTIVE_STATUSES
+                for job in self.jobs.values()
+            )
+
+    def prune(self, keep: int):
+        with self.lock:
+            finished = sorted(
+                (job for job in self.jobs.values() if job.status not in ACTIVE_STATUSES),
+                key=lambda job: job.finished or 0,
+                reverse=True,
+            )
+
+            for job in finished[keep:]:
+                del self.jobs[job.id]
+
+    def domain_stats(self):
+        with self.lock:
+            stats = [dict(stats) for stats in self.stats.values()]
+
+        return sorted(stats, key=lambda stats: stats["cpu_time"], reverse=True)
+
+
+def get_broker(name: str, path: str) -> Broker:
+    """Return the broker with the given name."""
+    if name == "memory":
+        return MemoryBroker()
+
+    return SQLiteBroker(path)
@@ -2,9 +2,10 @@
 
 import logging
 import os
+import stat
 import sys
 
-from typing import Any
+from typing import Any, Callable
 
 from gallery_dl import config
 
@@ -13,13 +14,50 @@ from . import output, utils
 _config: dict[str, Any] = config._config
 _files: list[str] = config._files
 
+_signature: tuple[tuple[str, int, int], ...] | None = None
+_version: int | None = None
+_versions = 0
+_snapshot: "Snapshot | None" = None
+
 log = output.initialise_logging(__name__)
 
 
+class Snapshot:
+    """Parsed configuration with a version that changes on every reload.
+
+    The parent process shares a snapshot with download processes, which
+    apply it instead of finding and parsing the configuration files again.
+    A snapshot must not be modified once it has been created.
+
+    Variants of the configuration, e.g. for different request options, are
+    created once per snapshot and kept with it.
+    """
+
+    def __init__(self, version: int, conf: dict[str, Any], files: list[str]):
+        self.version = version
+        self.conf = conf
+        self.files = files
+        self.variants: dict[Any, Any] = {}
+
+    def variant(self, key: Any, factory: Callable[[dict[str, Any], Any], Any]):
+        """Return the variant for a key, creating it with `factory(conf, key)` on first use."""
+        if key not in self.variants:
+            self.variants[key] = factory(self.conf, key)
+
+        return self.variants[key]
+
+
 def clear(conf: dict[str, Any] = _config):
     """Clear loaded configuration."""
+    global _signature, _version
+
     conf.clear()
 
+    if conf is _config:
+        _files.clear()
+        _signature = None
+        _version = None
+
 
 def get_default_configs():
     """Return default gallery-dl configuration file locations."""
@@ -69,15 +107,144 @@ def get_new_configs(_configs: list[str], exts: list[str]):
     return _new_configs
 
 
+def get_config_paths():
+    """Return all candidate configuration file paths in load order."""
+    return get_new_configs(get_default_configs(), [".toml", ".yaml", ".yml"])
+
+
+def get_signature():
+    """Return the path, modification time and size of each configuration file found."""
+    signature: list[tuple[str, int, int]] = []
+
+    for path in get_config_paths():
+        try:
+            st = os.stat(utils.normalise_path(path))
+        except OSError:
+            continue
+
+        if stat.S_ISREG(st.st_mode):
+            signature.append((path, st.st_mtime_ns, st.st_size))
+
+    return tuple(signature)
+
+
+def load_cached():
+    """Load gallery-dl configuration files if they changed since the last load.
+
+    Changes are detected from the path, modification time and size of the
+    files found, so unchanged files are not parsed again. Returns whether
+    the configuration was reloaded.
+
+    If a file fails to load and a previous configuration exists, the previous
+    configuration is kept until the files change again. Otherwise, raises
+    `SystemExit` if no configuration file could be loaded.
+    """
+    global _signature, _version, _versions, _snapshot
+
+    signature = get_signature()
+
+    if signature == _signature:
+        return False
+
+    clear()
+
+    try:
+        complete = load()
+    except SystemExit:
+        complete = False
+
+        if _snapshot is None:
+            raise
+
+    if not complete and _snapshot is not None:
+        log.error(f"Keeping previous configuration (version {_snapshot.version}) due to errors")
+        apply(_snapshot)
+        _signature = signature
+        return False
+
+    _versions += 1
+    _signature = signature
+    _version = _versions
+    # Reloading replaces the top-level values, so a shallow copy stays unchanged
+    _snapshot = Snapshot(_version, dict(_config), list(_files))
+
+    if _version > 1:
+        log.info(f"Reloaded gallery-dl configuration (version {_version})")
+
+    return True
+
+
+def get_snapshot(check: bool = True):
+    """Return a snapshot of the configuration.
+
+    With `check`, or if nothing has been loaded yet, the files are first
+    checked for changes. Raises `SystemExit` if no configuration file could
+    be loaded.
+    """
+    if check or _snapshot is None:
+        load_cached()
+
+    assert _snapshot is not None
+    return _snapshot
+
+
+def apply(snapshot: Snapshot, conf: dict[str, Any] | None = None):
+    """Make a snapshot, or a variant of it, the loaded configuration.
+
+    Only the top-level entries are replaced, so this takes constant time
+    regardless of the size of the configuration.
+    """
+    global _signature, _version
+
+    _config.clear()
+    _config.update(snapshot.conf if conf is None else conf)
+
+    if snapshot.version != _version:
+        _files[:] = snapshot.files
+        _version = snapshot.version
+
+    # The loaded configuration no longer matches the files
+    _signature = None
+
+
+def copy_on_write(conf: dict[str, Any], *keys: str):
+    """Replace the dicts and lists along a key path with shallow copies.
+
+    Returns the copy of the last value, or `None` if the path does not exist,
+    so it can be modified without changing the original configuration.
+    """
+    value: Any = conf
+
+    for key in keys:
+        if not isinstance(value, dict):
+            return None
+
+        child = value.get(key)
+
+        if isinstance(child, dict):
+            child = dict(child)
+        elif isinstance(child, list):
+            child = list(child)
+        else:
+            return None
+
+        value[key] = child
+        value = child
+
+    return value
+
+
 def load():
-    """Load gallery-dl configuration files."""
+    """Load gallery-dl configuration files.
+
+    Returns whether every configuration file found was loaded.
+    """
     configs_found: list[str] = []
     configs_loaded: list[str] = []
     exit_codes: list[int | str | None] = []
     messages: list[str] = []
 
-    new_exts = [".toml", ".yaml", ".yml"]
-    _configs = get_new_configs(get_default_configs(), new_exts)
+    _configs = get_config_paths()
 
     log_buffer = output.StringLogger()
 
@@ -101,6 +268,8 @@ def load():
 
     log_results(_configs, configs_loaded, configs_found, exit_codes, messages)
 
+    return len(configs_loaded) == len(configs_found)
+
 
 def load_config(path: str, exit_codes: list[int | str | None]):
     """Load a single configuration file based on its extension."""
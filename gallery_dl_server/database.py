@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+import sqlite3
+
+from contextlib import contextmanager
+
+
+class Database:
+    """SQLite database accessed through short-lived connections.
+
+    Subclasses set `schema` to the statements that create their tables.
+    """
+
+    schema = ""
+
+    def __init__(self, path: str):
+        self.path = path
+
+        with self.connection() as conn:
+            conn.executescript(self.schema)
+
+    @contextmanager
+    def connection(self):
+        """Open a connection, commit on success and always close it."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+import socket
+import sqlite3
+import time
+
+from typing import Callable
+
+from . import output
+from .broker import Broker
+from .jobs import Job
+from .resources import get_domain
+
+log = output.initialise_logging(__name__)
+
+LEASE_DURATION = 60
+POLL_INTERVAL = 2
+FINISHED_JOBS_MAX = 200
+
+
+def get_worker_id():
+    """Return an ID that is unique to this process across nodes."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobDispatcher:
+    """Claim jobs from the broker and run them on a bounded number of workers.
+
+    Several dispatchers, in one or more server processes or nodes, can share
+    one broker. Jobs submitted by other processes are picked up by polling.
+    """
+
+    def __init__(self, runner: Callable[[Job], int | None], max_jobs: int, broker: Broker):
+        self.runner = runner
+        self.max_jobs = max_jobs
+        self.broker = broker
+        self.worker_id = get_worker_id()
+        self.slots = asyncio.Semaphore(max_jobs)
+        self.accepting = asyncio.Event()
+        self.accepting.set()
+        self.wakeup = asyncio.Event()
+        self.running: dict[str, Job] = {}
+        self.tasks: set[asyncio.Task[None]] = set()
+        self.dispatcher: asyncio.Task[None] | None = None
+        self.heartbeat: asyncio.Task[None] | None = None
+        self.drain_task: asyncio.Task[None] | None = None
+
+    @property
+    def draining(self):
+        """Return whether dispatching has been stopped."""
+        return not self.accepting.is_set()
+
+    async def submit(self, job: Job):
+        """Add a job to the queue."""
+        job = await asyncio.to_thread(self.broker.submit, job)
+        log.debug(f"Queued job {job.id} with priority {job.priority}: {job.url}")
+
+        self.wakeup.set()
+
+        return job
+
+    async def list_jobs(self):
+        """Return recent jobs, most recent first."""
+        jobs = await asyncio.to_thread(self.broker.list_jobs, FINISHED_JOBS_MAX)
+        return [job.to_dict() for job in jobs]
+
+    async def domain_stats(self):
+        """Return resource usage totals per domain."""
+        return await asyncio.to_thread(self.broker.domain_stats)
+
+    async def has_active_subscription(self, subscription_id: int):
+        """Check if a job for the subscription is waiting or running."""
+        return await asyncio.to_thread(self.broker.has_active_subscription, subscription_id)
+
+    async def start(self):
+        """Start dispatching jobs."""
+        queued = await asyncio.to_thread(self.broker.count, "queued")
+        if queued:
+            log.info(f"Found {queued} job(s) waiting in the queue")
+
+        if self.dispatcher is None:
+            self.dispatcher = asyncio.create_task(self.dispatch())
+
+        if self.heartbeat is None:
+            self.heartbeat = asyncio.create_task(self.renew_leases())
+
+    async def stop(self):
+        """Stop dispatching jobs."""
+        for task in (self.dispatcher, self.heartbeat):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+        self.dispatcher = None
+        self.heartbeat = None
+
+    async def dispatch(self):
+        """Start the next job whenever a worker slot becomes available."""
+        while True:
+            await self.accepting.wait()
+            await self.slots.acquire()
+            try:
+                job = await self.claim()
+            except BaseException:
+                self.slots.release()
+                raise
+
+            if job is None:
+                self.slots.release()
+                continue
+
+            self.running[job.id] = job
+
+            task = asyncio.create_task(self.run(job))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def claim(self):
+        """Wait for a runnable job and claim it, or return None when draining."""
+        while not self.draining:
+            self.wakeup.clear()
+
+            try:
+                job = await asyncio.to_thread(self.broker.claim, self.worker_id, LEASE_DURATION)
+            except sqlite3.Error as e:
+                log.error(f"Failed to claim job: {type(e).__name__}: {e}")
+                job = None
+
+            if job is not None:
+                return job
+
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+        return None
+
+    async def run(self, job: Job):
+        """Run a job in a worker thread and record the result."""
+        job.status = "failed"
+
+        try:
+            job.exit_code = await asyncio.to_thread(self.runner, job)
+            job.status = "finished" if job.exit_code == 0 else "failed"
+        except Exception as e:
+            log.error(f"Job {job.id} raised an exception: {type(e).__name__}: {e}")
+        finally:
+            job.finished = time.time()
+            self.slots.release()
+            del self.running[job.id]
+
+        try:
+            if job.interrupted:
+                recorded = await asyncio.to_thread(self.broker.requeue, job)
+            elif job.retry_delay is not None:
+                if job.cooldown:
+                    until = time.time() + job.retry_delay
+                    await asyncio.to_thread(self.broker.cooldown, get_domain(job.url), until)
+                recorded = await asyncio.to_thread(self.broker.requeue, job, job.retry_delay)
+            else:
+                recorded = await asyncio.to_thread(self.broker.finish, job)
+                await asyncio.to_thread(self.broker.prune, FINISHED_JOBS_MAX)
+        except sqlite3.Error as e:
+            log.error(f"Failed to record result of job {job.id}: {type(e).__name__}: {e}")
+            return
+
+        if not recorded:
+            log.warning(
+                f"Dropped result of job {job.id} as its lease expired and it was claimed again"
+            )
+
+    async def renew_leases(self):
+        """Keep the leases of running jobs valid so other workers leave them alone."""
+        while True:
+            await asyncio.sleep(LEASE_DURATION / 3)
+
+            if not self.running:
+                continue
+
+            try:
+                await asyncio.to_thread(
+                    self.broker.renew, list(self.running), self.worker_id, LEASE_DURATION
+                )
+            except sqlite3.Error as e:
+                log.error(f"Failed to renew job leases: {type(e).__name__}: {e}")
+
+    def start_drain(self, timeout: float):
+        """Drain the queue in the background."""
+        if self.drain_task is None or self.drain_task.done():
+            self.drain_task = asyncio.create_task(self.drain(timeout))
+
+    async def drain(self, timeout: float):
+        """Stop claiming jobs and let running jobs finish before the deadline.
+
+        Queued jobs stay in the broker. Jobs that are still running at the
+        deadline are interrupted and returned to the queue, to be resumed by
+        the next worker to claim them, or by this one on the next start.
+        """
+        self.accepting.clear()
+        self.wakeup.set()
+
+        running = list(self.tasks)
+        if not running:
+            log.info("Drained job queue, no downloads were running")
+            return
+
+        log.info(f"Draining job queue, waiting up to {timeout} seconds for downloads to finish")
+
+        _, pending = await asyncio.wait(running, timeout=timeout)
+
+        if pending:
+            self.interrupt_all()
+            await asyncio.wait(pending)
+
+        log.info("Drained job queue")
+
+    def interrupt_all(self):
+        """Interrupt all running jobs so they are resumed later."""
+        for job in self.running.values():
+            if not job.interrupted:
+                log.warning(f"Interrupting job {job.id} to resume it later: {job.url}")
+                job.interrupt()
+
+    def resume(self):
+        """Cancel draining and start dispatching again."""
+        if self.drain_task is not None and not self.drain_task.done():
+            self.drain_task.cancel()
+
+        self.accepting.set()
@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 
+import signal
+
 from itertools import chain
+from multiprocessing.connection import Connection
 from multiprocessing.queues import Queue
 from typing import Any
 
 from gallery_dl import job, exception
 
-from . import options
+from . import options, resources
 
 
 def _init(custom_args: options.CustomNamespace | None):
@@ -20,6 +23,10 @@ def _init(custom_args: options.CustomNamespace | None):
     if options.custom_args is None and custom_args is not None:
         options.custom_args = custom_args
 
+    # Forked processes inherit the server's signal handlers, so restore the
+    # default one to turn an interrupt into a `KeyboardInterrupt`.
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
     from . import config, output
 
     output.configure_default_loggers(is_main_process=False)
@@ -30,29 +37,33 @@ def _init(custom_args: options.CustomNamespace | None):
 def run(
     url: str,
     request_options: dict[str, str],
-    log_queue: Queue[dict[str, Any]],
-    return_status: Queue[int],
+    snapshot: "config.Snapshot",
+    job_id: str,
+    log_conn: Connection,
+    return_status: Queue[tuple[int, dict[str, float]]],
     custom_args: options.CustomNamespace | None,
 ):
-    """Set gallery-dl configuration, set up logging and run download job."""
+    """Set gallery-dl configuration, set up logging and run download job.
+
+    The configuration is taken from the snapshot parsed by the parent process,
+    with the variant for the request options selected.
+    """
     _init(custom_args)
 
-    config.clear()
-    config.load()
+    conf, entries_added, entries_removed = get_variant(snapshot, request_options)
+    config.apply(snapshot, conf)
 
     output.setup_logging()
-    output.capture_logs(log_queue)
-    output.redirect_standard_streams()
+    output.capture_logs(log_conn, job_id)
+    logger_writer = output.redirect_standard_streams()
 
     log.info(f"Requested download with the following options: {request_options}")
 
-    entries = config_update(request_options)
+    if any(entries_added):
+        log.info(f"Added entries to the config dict: {entries_added}")
 
-    if any(entries[0]):
-        log.info(f"Added entries to the config dict: {entries[0]}")
-
-    if any(entries[1]):
-        log.info(f"Removed entries from the config dict: {entries[1]}")
+    if any(entries_removed):
+        log.info(f"Removed entries from the config dict: {entries_removed}")
 
     status = 0
     try:
@@ -66,23 +77,49 @@ def run(
     except KeyboardInterrupt:
         pass
 
+    logger_writer.close()
     output.close_handlers()
 
-    return_status.put(status)
+    return_status.put((status, resources.own_usage()))
+
 
+def get_variant(snapshot: "config.Snapshot", request_options: dict[str, str]):
+    """Return the configuration variant for the request options.
+
+    Variants are created once per configuration version and shared by all
+    jobs with the same options.
+    """
+    key = (request_options.get("video-options", "none-selected"), request_options.get("skip"))
 
-def config_update(request_options: dict[str, str]):
-    """Update loaded configuration with request options."""
+    return snapshot.variant(key, config_variant)
+
+
+def config_variant(conf: dict[str, Any], key: tuple[str, str | None]):
+    """Return a copy of the configuration with the request options applied.
+
+    Only the dicts and lists that change are copied, everything else is shared
+    with the original configuration, which is left unchanged.
+    """
+    from . import config
+
+    conf = dict(conf)
     entries_added: list[dict[str, Any] | None] = []
     entries_removed: list[Any] = []
 
-    requested_format = request_options.get("video-options", "none-selected")
+    requested_format, skip = key
+
+    if skip:
+        config.copy_on_write(conf, "extractor")
+        entries_added.extend(config.add({"extractor": {"skip": skip}}, conf=conf)[1])
 
     if requested_format == "none-selected":
-        return entries_added, entries_removed
+        return conf, entries_added, entries_removed
+
+    config.copy_on_write(conf, "extractor", "ytdl", "cmdline-args")
+    config.copy_on_write(conf, "extractor", "ytdl", "raw-options", "postprocessors")
 
-    cmdline_args = config.get(["extractor", "ytdl", "cmdline-args"])
-    raw_options = config.get(["extractor", "ytdl", "raw-options"])
+    cmdline_args = config.get(["extractor", "ytdl", "cmdline-args"], conf=conf)
+    raw_options = config.get(["extractor", "ytdl", "raw-options"], conf=conf)
     postprocessors = config.get(["postprocessors"], conf=raw_options)
 
     if requested_format == "download-video":
@@ -107,7 +144,8 @@ def config_update(request_options: dict[str, str]):
                                 ]
                             }
                         }
-                    }
+                    },
+                    conf=conf,
                 )[1],
                 config.add(
                     {
@@ -125,7 +163,8 @@ def config_update(request_options: dict[str, str]):
                                 }
                             }
                         }
-                    }
+                    },
+                    conf=conf,
                 )[1],
             )
         )
@@ -134,4 +173,4 @@ def config_update(request_options: dict[str, str]):
             config.remove(cmdline_args, item="--merge-output-format", value="any")
         )
 
-    return entries_added, entries_removed
+    return conf, entries_added, entries_removed
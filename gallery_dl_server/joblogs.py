@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import re
+
+from typing import Any
+
+from . import database, output, resources
+from .jobs import Job
+
+JOB_LOGS_MAX = 1000
+SEARCH_LIMIT = 200
+
+LEVEL_PATTERN = re.compile(r"^\S+ \S+ \[(\w+)\]")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_logs (
+    job_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    first_time REAL,
+    last_time REAL,
+    records INTEGER NOT NULL DEFAULT 0,
+    max_level INTEGER NOT NULL DEFAULT 0,
+    warnings INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS job_logs_domain ON job_logs (domain, last_time);
+CREATE INDEX IF NOT EXISTS job_logs_last_time ON job_logs (last_time);
+"""
+
+
+def parse_level(value: str):
+    """Return the number of a log level name such as `warning` or `error`."""
+    level = logging.getLevelName(value.upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Invalid log level: {value}")
+
+    return level
+
+
+def parse_level_or_zero(value: str):
+    """Return the number of a log level name, or 0 if it is not a level."""
+    try:
+        return parse_level(value)
+    except ValueError:
+        return 0
+
+
+class JobLog:
+    """Write the log records of one download to the log file of its job.
+
+    The records are counted by level, so the index can be updated once the
+    download finishes.
+    """
+
+    def __init__(self, path: str, job: Job, formatter: logging.Formatter):
+        self.path = path
+        self.job_id = job.id
+        self.url = job.url
+        self.domain = resources.get_domain(job.url)
+        self.formatter = formatter
+        self.file = None
+        self.first_time: float | None = None
+        self.last_time: float | None = None
+        self.records = 0
+        self.max_level = 0
+        self.warnings = 0
+        self.errors = 0
+
+    def write(self, record: logging.LogRecord):
+        """Write a record to the job log file."""
+        if self.file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.file = open(self.path, "a", encoding="utf-8")
+
+        self.file.write(self.formatter.format(record) + "\n")
+
+        if self.first_time is None:
+            self.first_time = record.created
+
+        self.last_time = record.created
+        self.records += 1
+        self.max_level = max(self.max_level, record.levelno)
+
+        if record.levelno >= logging.ERROR:
+            self.errors += 1
+        elif record.levelno >= logging.WARNING:
+            self.warnings += 1
+
+    def log(self, level: int, msg: str):
+        """Write a message of the server about the download to the job log file."""
+        self.write(logging.LogRecord(__name__, level, __file__, 0, msg, None, None))
+
+    def flush(self):
+        """Write buffered records to disk, so they can be searched."""
+        if self.file is not None:
+            self.file.flush()
+
+    def close(self):
+        """Close the job log file."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class JobLogIndex(database.Database):
+    """Store the log files of jobs and index them in an SQLite database.
+
+    The index holds the URL, domain, time range and level counts of each
+    job, so searches only read the log files of the jobs that can match.
+    """
+
+    schema = SCHEMA
+
+    def __init__(self, path: str, directory: str, keep: int = JOB_LOGS_MAX):
+        self.directory = directory
+        self.keep = keep
+        super().__init__(path)
+
+    def get_path(self, job_id: str):
+        """Return the path of the log file of a job."""
+        return os.path.join(self.directory, f"{job_id}.log")
+
+    def open(self, job: Job):
+        """Return a job log for a download of the job."""
+        formatter = output.CustomFormatter(output.LOG_FORMAT, output.LOG_FORMAT_DATE)
+        return JobLog(self.get_path(job.id), job, formatter)
+
+    def add(self, job_log: JobLog):
+        """Close a job log, add it to the index and remove the oldest job logs.
+
+        Retried and resumed jobs append to their log file and index entry.
+        """
+        job_log.close()
+
+        if not job_log.records:
+            return
+
+        with self.connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO job_logs (
+                    job_id, url, domain, first_time, last_time,
+                    records, max_level, warnings, errors
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (job_id) DO UPDATE SET
+                    first_time = MIN(first_time, excluded.first_time),
+                    last_time = MAX(last_time, excluded.last_time),
+                    records = records + excluded.records,
+                    max_level = MAX(max_level, excluded.max_level),
+                    warnings = warnings + excluded.warnings,
+                    errors = errors + excluded.errors
+                """,
+                (
+                    job_log.job_id,
+                    job_log.url,
+                    job_log.domain,
+                    job_log.first_time,
+                    job_log.last_time,
+                    job_log.records,
+                    job_log.max_level,
+                    job_log.warnings,
+                    job_log.errors,
+                ),
+            )
+            removed = conn.execute(
+                "SELECT job_id FROM job_logs ORDER BY last_time DESC LIMIT -1 OFFSET ?",
+                (self.keep,),
+            ).fetchall()
+            conn.executemany(
+                "DELETE FROM job_logs WHERE job_id = ?", [(row["job_id"],) for row in removed]
+            )
+
+        for row in removed:
+            try:
+                os.remove(self.get_path(row["job_id"]))
+            except OSError:
+                pass
+
+    def find(
+        self,
+        job_id: str | None = None,
+        domain: str | None = None,
+        min_level: int = 0,
+        since: float | None = None,
+        until: float | None = None,
+    ):
+        """Return the index entries of the matching jobs, most recent first."""
+        conditions = ["max_level >= ?"]
+        params: list[Any] = [min_level]
+
+        if job_id:
+            conditions.append("job_id = ?")
+            params.append(job_id)
+
+        if domain:
+            conditions.append("domain = ?")
+            params.append(domain.lower())
+
+        if since is not None:
+            conditions.append("last_time >= ?")
+            params.append(since)
+
+        if until is not None:
+            conditions.append("first_time <= ?")
+            params.append(until)
+
+        where = " AND ".join(conditions)
+
+        with self.connection() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM job_logs WHERE {where} ORDER BY last_time DESC", params
+            ).fetchall()
+
+        return [dict(row) for row in rows]
+
+    def search(
+        self,
+        job_id: str | None = None,
+        domain: str | None = None,
+        min_level: int = 0,
+        query: str = "",
+        since: float | None = None,
+        until: float | None = None,
+        limit: int = SEARCH_LIMIT,
+    ):
+        """Return the matching jobs with their log lines that match the level and query.
+
+        Jobs without matching lines are left out. At most `limit` lines are
+        returned in total.
+        """
+        results: list[dict[str, Any]] = []
+        query = query.lower()
+        remaining = limit
+
+        for entry in self.find(job_id, domain, min_level, since, until):
+            if remaining <= 0:
+                break
+
+            lines = self.read_matches(entry["job_id"], min_level, query, remaining)
+            if not lines:
+                continue
+
+            remaining -= len(lines)
+            entry["max_level"] = logging.getLevelName(entry["max_level"]).lower()
+            entry["lines"] = lines
+            results.append(entry)
+
+        return results
+
+    def read_matches(self, job_id: str, min_level: int, query: str, limit: int):
+        """Return up to `limit` lines of a job log file that match the level and query."""
+        lines: list[str] = []
+
+        try:
+            file = open(self.get_path(job_id), encoding="utf-8", errors="replace")
+        except FileNotFoundError:
+            return lines
+
+        with file:
+            for line in file:
+                if query and query not in line.lower():
+                    continue
+
+                if min_level:
+                    match = LEVEL_PATTERN.match(line)
+                    if match is None or parse_level_or_zero(match.group(1)) < min_level:
+                        continue
+
+                lines.append(line.rstrip("\n"))
+                if len(lines) >= limit:
+                    break
+
+        return lines
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import time
+import uuid
+
+from typing import Any
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+
+class Job:
+    """Download request tracked by the job broker."""
+
+    def __init__(
+        self,
+        url: str,
+        request_options: dict[str, str],
+        priority: int = PRIORITY_NORMAL,
+        subscription_id: int | None = None,
+        job_id: str | None = None,
+    ):
+        self.id = job_id or uuid.uuid4().hex[:12]
+        self.url = url
+        self.request_options = request_options
+        self.priority = priority
+        self.subscription_id = subscription_id
+        self.status = "queued"
+        self.exit_code: int | None = None
+        self.created = time.time()
+        self.started: float | None = None
+        self.finished: float | None = None
+        self.worker: str | None = None
+        self.usage: dict[str, float] = {}
+        self.limit_exceeded: str | None = None
+        self.attempts = 0
+        self.tags: list[str] = []
+        self.available_at = 0.0
+        self.retry_delay: float | None = None
+        self.cooldown = False
+        self.interrupted = False
+        self.progress: str | None = None
+
+    @property
+    def is_active(self):
+        """Return whether the job is waiting or running."""
+        return self.status in ("queued", "running")
+
+    def interrupt(self):
+        """Ask the worker to stop the download so it can be resumed later."""
+        self.interrupted = True
+
+    def retry_later(self, delay: float, cooldown: bool = False):
+        """Queue the job again after a delay once the download has stopped.
+
+        With `cooldown`, jobs for the same domain are also held back until then.
+        """
+        self.retry_delay = delay
+        self.cooldown = cooldown
+
+    def add_tag(self, tag: str):
+        """Add a tag to the job if it does not have it yet."""
+        if tag not in self.tags:
+            self.tags.append(tag)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable representation of the job."""
+        return {
+            "id": self.id,
+            "url": self.url,
+            "options": self.request_options,
+            "priority": self.priority,
+            "subscription": self.subscription_id,
+            "status": self.status,
+            "exit_code": self.exit_code,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "worker": self.worker,
+            "usage": self.usage,
+            "limit_exceeded": self.limit_exceeded,
+            "attempts": self.attempts,
+            "tags": self.tags,
+            "available_at": self.available_at,
+        }
@@ -0,0 +1,519 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import base64
+import binascii
+import bisect
+import hashlib
+import heapq
+import json
+import os
+import re
+
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, Mapping
+
+CACHE_SIZE = 64 * 1024 * 1024
+# Approximate memory used by an entry besides its name, including its place in sorted orders
+ENTRY_SIZE = 200
+PAGES_PER_LISTING = 32
+PAGE_LIMIT_MAX = 1000
+
+SORT_KEYS = ("name", "size", "mtime")
+TYPES = ("dir", "file", "image", "video", "audio")
+EXTENSIONS = {
+    "image": {"png", "jpg", "jpeg", "gif", "webp", "avif", "bmp", "svg", "apng", "jfif"},
+    "video": {"mp4", "webm", "mov", "m4v", "mkv", "ogv"},
+    "audio": {"mp3", "m4a", "ogg", "opus", "wav", "flac", "aac"},
+}
+DIGITS_PATTERN = re.compile(r"(\d+)")
+
+# Name, whether it is a directory, size and modification time of a directory entry
+Entry = tuple[str, bool, int, int]
+# Entries of a page, the entry the next page starts after and the number of entries
+Selection = tuple[list[Entry], Entry | None, int]
+
+
+def scan_directory(path: str, stat=True) -> Iterator[Entry]:
+    """Yield the entries of a directory as they are read.
+
+    Without `stat`, sizes and modification times are 0, which saves a system
+    call per entry when they are not needed.
+    """
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+
+                if not stat:
+                    yield entry.name, is_dir, 0, 0
+                    continue
+
+                stat_result = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+
+            yield entry.name, is_dir, stat_result.st_size, int(stat_result.st_mtime)
+
+
+def stat_entries(path: str, entries: Iterable[Entry]):
+    """Return entries with the sizes and modification times of the files."""
+    result: list[Entry] = []
+
+    for name, is_dir, _, _ in entries:
+        try:
+            stat_result = os.stat(os.path.join(path, name), follow_symlinks=False)
+        except OSError:
+            continue
+
+        result.append((name, is_dir, stat_result.st_size, int(stat_result.st_mtime)))
+
+    return result
+
+
+def natural_key(name: str):
+    """Return a case-insensitive sort key that orders `file2` before `file10`."""
+    parts: list[str | int] = list(DIGITS_PATTERN.split(name.lower()))
+    parts[1::2] = [int(part) for part in parts[1::2]]
+    return tuple(parts)
+
+
+def entry_type(name: str):
+    """Return the media type of a file from its extension, or `file`."""
+    extension = name.rpartition(".")[2].lower()
+
+    for kind, extensions in EXTENSIONS.items():
+        if extension in extensions:
+            return kind
+
+    return "file"
+
+
+def encode_cursor(entry: Entry):
+    """Return the cursor of the page starting after an entry."""
+    data = json.dumps(list(entry), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Entry:
+    """Return the entry a cursor points after."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        name, is_dir, size, mtime = json.loads(data)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError("Invalid cursor") from None
+
+    if not (
+        isinstance(name, str)
+        and isinstance(is_dir, bool)
+        and type(size) is int
+        and type(mtime) is int
+    ):
+        raise ValueError("Invalid cursor")
+
+    return name, is_dir, size, mtime
+
+
+class ListingQuery:
+    """Sort order, filters and page of a directory listing request.
+
+    Directories come first in either direction, and names are compared
+    case-insensitively with numbers by value. The cursor is the last entry of
+    the previous page, so a page continues after it even if entries were
+    added or removed in between. Without a limit, all matching entries are
+    returned.
+    """
+
+    def __init__(
+        self,
+        sort="name",
+        descending=False,
+        name="",
+        kind: str | None = None,
+        limit: int | None = None,
+        cursor: Entry | None = None,
+    ):
+        self.sort = sort
+        self.descending = descending
+        self.name = name.lower()
+        self.kind = kind
+        self.limit = limit
+        self.cursor = cursor
+        self.cursor_key = None if cursor is None else self.order_key(cursor)
+
+    @classmethod
+    def from_params(cls, params: Mapping[str, str]):
+        """Create a query from the `sort`, `order`, `name`, `type`, `limit` and `cursor` params.
+
+        Raises `ValueError` for invalid values.
+        """
+        sort = params.get("sort") or "name"
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Invalid sort: {sort}")
+
+        order = params.get("order") or "asc"
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Invalid order: {order}")
+
+        kind = params.get("type") or None
+        if kind is not None and kind not in TYPES:
+            raise ValueError(f"Invalid type: {kind}")
+
+        limit = params.get("limit") or None
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                raise ValueError(f"Invalid limit: {limit}") from None
+
+            if not 1 <= limit <= PAGE_LIMIT_MAX:
+                raise ValueError(f"Limit must be between 1 and {PAGE_LIMIT_MAX}")
+
+        cursor = params.get("cursor") or None
+
+        return cls(
+            sort,
+            order == "desc",
+            params.get("name", ""),
+            kind,
+            limit,
+            None if cursor is None else decode_cursor(cursor),
+        )
+
+    @property
+    def key(self):
+        """Return a hashable key of the query, for caching its results."""
+        return (self.sort, self.descending, self.name, self.kind, self.limit, self.cursor)
+
+    @property
+    def needs_stat(self):
+        """Return whether sizes or modification times are needed to order entries."""
+        return self.sort != "name"
+
+    def order_key(self, entry: Entry):
+        """Return the sort key of an entry. Descending pages are in reverse key order."""
+        name, is_dir, size, mtime = entry
+        group = is_dir if self.descending else not is_dir
+
+        if self.sort == "size":
+            return (group, size, natural_key(name), name)
+
+        if self.sort == "mtime":
+            return (group, mtime, natural_key(name), name)
+
+        return (group, natural_key(name), name)
+
+    def matches(self, entry: Entry):
+        """Return whether an entry passes the name and type filters."""
+        name, is_dir = entry[0], entry[1]
+
+        if self.name and self.name not in name.lower():
+            return False
+
+        if self.kind is None:
+            return True
+
+        if self.kind == "dir" or is_dir:
+            return is_dir and self.kind == "dir"
+
+        return self.kind == "file" or entry_type(name) == self.kind
+
+    def is_after_cursor(self, key: tuple):
+        """Return whether an entry with a sort key belongs after the cursor."""
+        if self.cursor_key is None:
+            return True
+
+        return key < self.cursor_key if self.descending else key > self.cursor_key
+
+    def take(self, entries: Iterable[Entry]) -> tuple[list[Entry], Entry | None]:
+        """Return the matching entries of a page from entries in page order.
+
+        The second item is the entry to continue after, if more entries match.
+        """
+        page: list[Entry] = []
+
+        for entry in entries:
+            if not self.matches(entry):
+                continue
+
+            if len(page) == self.limit:
+                return page, page[-1]
+
+            page.append(entry)
+
+        return page, None
+
+
+def select_entries(path: str, query: ListingQuery) -> Selection:
+    """Return a page of a directory in a single pass over its entries.
+
+    Only the entries of the page are kept sorted, so selecting the first page
+    of a large directory does not sort all of it. Entries are only stat'ed
+    up front when they are sorted by size or modification time.
+    """
+    total = 0
+
+    def candidates():
+        nonlocal total
+
+        for entry in scan_directory(path, stat=query.needs_stat):
+            total += 1
+
+            if not query.matches(entry):
+                continue
+
+            key = query.order_key(entry)
+            if query.is_after_cursor(key):
+                yield key, entry
+
+    if query.limit is None:
+        selected = sorted(candidates(), key=itemgetter(0), reverse=query.descending)
+    elif query.descending:
+        selected = heapq.nlargest(query.limit + 1, candidates(), key=itemgetter(0))
+    else:
+        selected = heapq.nsmallest(query.limit + 1, candidates(), key=itemgetter(0))
+
+    entries = [entry for _, entry in selected]
+    next_entry = None
+
+    if query.limit is not None and len(entries) > query.limit:
+        del entries[query.limit :]
+        next_entry = entries[-1]
+
+    if not query.needs_stat:
+        entries = stat_entries(path, entries)
+
+    return entries, next_entry, total
+
+
+class ListingPage:
+    """JSON response body of a listing request with its strong ETag."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class DirectoryListing:
+    """Entries of a download directory with its sorted orders and rendered pages.
+
+    `mtime_ns` is the modification time of the directory before it was
+    scanned, so a listing is known to be outdated once entries are added,
+    removed or renamed, even if the change was not reported yet.
+    """
+
+    def __init__(self, entries: list[Entry], mtime_ns: int):
+        self.entries = entries
+        self.mtime_ns = mtime_ns
+        self.orders: dict[tuple[str, bool], list[Entry]] = {}
+        self.pages: dict[tuple, ListingPage] = {}
+        self.size = sum(len(entry[0]) + ENTRY_SIZE for entry in entries)
+
+    @classmethod
+    def scan(cls, path: str):
+        """Read the entries of a directory."""
+        mtime_ns = os.stat(path).st_mtime_ns
+        return cls(list(scan_directory(path)), mtime_ns)
+
+    def is_current(self, path: str):
+        """Return whether the directory was not changed since it was scanned."""
+        try:
+            return os.stat(path).st_mtime_ns == self.mtime_ns
+        except OSError:
+            return False
+
+    def ordered(self, query: ListingQuery):
+        """Return the entries in ascending key order of a query, sorting them once per order.
+
+        Comparing natural sort keys is the slow part of sorting, so names are
+        only sorted once and other orders are sorted from the name order.
+        Descending orders hold the same runs of files and directories as
+        ascending ones, just with files first.
+        """
+        order = (query.sort, query.descending)
+        entries = self.orders.get(order)
+
+        if entries is not None:
+            return entries
+
+        by_name = self.orders.get(("", False))
+        if by_name is None:
+            by_name = sorted(self.entries, key=lambda entry: (natural_key(entry[0]), entry[0]))
+            self.orders[("", False)] = by_name
+
+        if query.sort == "name":
+            ascending = [entry for entry in by_name if entry[1]]
+            ascending += [entry for entry in by_name if not entry[1]]
+        else:
+            # Sorting is stable, so entries with the same value stay in name order
+            value = 2 if query.sort == "size" else 3
+            ascending = sorted(by_name, key=lambda entry: (not entry[1], entry[value]))
+
+        directories = sum(1 for entry in ascending if entry[1])
+        descending = ascending[directories:] + ascending[:directories]
+
+        self.orders[(query.sort, False)] = ascending
+        self.orders[(query.sort, True)] = descending
+
+        return descending if query.descending else ascending
+
+    def select(self, query: ListingQuery) -> Selection:
+        """Return a page, finding where it starts in the sorted entries by bisection."""
+        entries = self.ordered(query)
+
+        if query.descending:
+            start = len(entries)
+            if query.cursor_key is not None:
+                start = bisect.bisect_left(entries, query.cursor_key, key=query.order_key)
+            page = query.take(entries[index] for index in range(start - 1, -1, -1))
+        else:
+            start = 0
+            if query.cursor_key is not None:
+                start = bisect.bisect_right(entries, query.cursor_key, key=query.order_key)
+            page = query.take(entries[index] for index in range(start, len(entries)))
+
+        return *page, len(self.entries)
+
+    def add_page(self, key: tuple, page: ListingPage):
+        """Keep a rendered page and return by how many bytes the listing grew."""
+        growth = len(page.body)
+
+        if len(self.pages) >= PAGES_PER_LISTING:
+            oldest = next(iter(self.pages))
+            growth -= len(self.pages.pop(oldest).body)
+
+        self.pages[key] = page
+        self.size += growth
+
+        return growth
+
+
+class ListingCache:
+    """Keep the listings of download directories in memory until they change.
+
+    Listings are only cached while the download root is watched, and the
+    listing of a directory is dropped as soon as one of its entries changes.
+    Directories outside the watched root are listed with a single pass per
+    request instead. The least recently used listings are dropped once they
+    exceed `max_size` bytes. The cache is only used from the event loop.
+    """
+
+    def __init__(self, max_size=CACHE_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self.listings: OrderedDict[str, DirectoryListing] = OrderedDict()
+        self.root: str | None = None
+        self.scans = 0
+        # Directories that changed while a scan was running
+        self.changed: set[str] = set()
+
+    async def get_page(
+        self,
+        path: str,
+        query: ListingQuery,
+        render: Callable[[list[Entry], Entry | None, int], bytes],
+    ):
+        """Return a page of a directory listing, rendering its selection with `render`."""
+        listing = self.listings.get(path)
+
+        if listing is not None and listing.is_current(path):
+            self.listings.move_to_end(path)
+
+            page = listing.pages.get(query.key)
+            if page is None:
+                page = await asyncio.to_thread(lambda: ListingPage(render(*listing.select(query))))
+                self.remember(path, listing, query.key, page)
+
+            return page
+
+        if not self.is_watched(path):
+            return await asyncio.to_thread(
+                lambda: ListingPage(render(*select_entries(path, query)))
+            )
+
+        def load():
+            listing = DirectoryListing.scan(path)
+            return listing, ListingPage(render(*listing.select(query)))
+
+        self.scans += 1
+        try:
+            listing, page = await asyncio.to_thread(load)
+        finally:
+            self.scans -= 1
+
+        if path not in self.changed:
+            self.store(path, listing)
+            self.remember(path, listing, query.key, page)
+
+        if not self.scans:
+            self.changed.clear()
+
+        return page
+
+    def is_watched(self, path: str):
+        """Return whether changes of a directory are reported to the cache."""
+        return self.root is not None and (path == self.root or path.startswith(self.root + os.sep))
+
+    def store(self, path: str, listing: DirectoryListing):
+        """Add a listing and drop the least recently used ones above the size limit."""
+        self.discard(path)
+
+        if listing.size > self.max_size:
+            return
+
+        self.listings[path] = listing
+        self.size += listing.size
+        self.trim()
+
+    def remember(self, path: str, listing: DirectoryListing, key: tuple, page: ListingPage):
+        """Keep a rendered page of a cached listing."""
+        growth = listing.add_page(key, page)
+
+        if self.listings.get(path) is listing:
+            self.size += growth
+            self.trim()
+
+    def trim(self):
+        """Drop the least recently used listings above the size limit."""
+        while self.size > self.max_size and self.listings:
+            _, oldest = self.listings.popitem(last=False)
+            self.size -= oldest.size
+
+    def discard(self, path: str):
+        """Drop the listing of a directory."""
+        listing = self.listings.pop(path, None)
+        if listing is not None:
+            self.size -= listing.size
+
+        if self.scans:
+            self.changed.add(path)
+
+    def invalidate(self, paths: Iterable[str]):
+        """Drop the listings of changed paths and of the directories containing them.
+
+        The listing above the containing directory is dropped as well, since
+        it shows the modification time of the containing directory.
+        """
+        for path in paths:
+            parent = os.path.dirname(path)
+            self.discard(path)
+            self.discard(parent)
+            self.discard(os.path.dirname(parent))
+
+    def watch(self, root: str | None):
+        """Drop all listings and only cache directories under a newly watched root."""
+        self.listings.clear()
+        self.size = 0
+        self.root = root
+
+
+def etag_matches(if_none_match: str | None, etag: str):
+    """Return whether an If-None-Match header matches an ETag."""
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
@@ -74,6 +74,111 @@ def parse_args(is_main_module: bool = False):
         help="comma-separated list of allowed CORS origins or '*'",
     )
 
+    default_max_jobs = os.environ.get("MAX_JOBS", "4")
+    try:
+        default_max_jobs = int(default_max_jobs)
+    except ValueError:
+        default_max_jobs = 4
+
+    parser.add_argument(
+        "--max-jobs",
+        type=int,
+        default=default_max_jobs,
+        help="maximum number of concurrent downloads (default: 4)",
+    )
+
+    default_drain_timeout = os.environ.get("DRAIN_TIMEOUT", "30")
+    try:
+        default_drain_timeout = int(default_drain_timeout)
+    except ValueError:
+        default_drain_timeout = 30
+
+    parser.add_argument(
+        "--drain-timeout",
+        type=int,
+        default=default_drain_timeout,
+        help="seconds to let running downloads finish on shutdown (default: 30)",
+    )
+
+    default_workers = os.environ.get("WORKERS", "1")
+    try:
+        default_workers = int(default_workers)
+    except ValueError:
+        default_workers = 1
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=default_workers,
+        help="number of server worker processes (default: 1)",
+    )
+
+    parser.add_argument(
+        "--broker",
+        type=str,
+        default=os.environ.get("BROKER", "sqlite"),
+        help="job broker shared by workers [sqlite|memory] (default: sqlite)",
+    )
+
+    parser.add_argument(
+        "--data-dir",
+        type=str,
+        default=os.environ.get("DATA_DIR", ""),
+        help="directory for the server database (default: /config in Docker, else log directory)",
+    )
+
+    default_progress_rate = os.environ.get("PROGRESS_RATE", "2")
+    try:
+        default_progress_rate = float(default_progress_rate)
+    except ValueError:
+        default_progress_rate = 2.0
+
+    parser.add_argument(
+        "--progress-rate",
+        type=float,
+        default=default_progress_rate,
+        help="maximum download progress updates per second for each job (default: 2)",
+    )
+
+    default_log_max_size = os.environ.get("LOG_MAX_SIZE", "10")
+    try:
+        default_log_max_size = int(default_log_max_size)
+    except ValueError:
+        default_log_max_size = 10
+
+    parser.add_argument(
+        "--log-max-size",
+        type=int,
+        default=default_log_max_size,
+        help="rotate the log file at this size in MiB, 0 to disable (default: 10)",
+    )
+
+    default_log_max_age = os.environ.get("LOG_MAX_AGE", "0")
+    try:
+        default_log_max_age = int(default_log_max_age)
+    except ValueError:
+        default_log_max_age = 0
+
+    parser.add_argument(
+        "--log-max-age",
+        type=int,
+        default=default_log_max_age,
+        help="rotate the log file after this many hours, 0 to disable (default: 0)",
+    )
+
+    default_log_backups = os.environ.get("LOG_BACKUPS", "5")
+    try:
+        default_log_backups = int(default_log_backups)
+    except ValueError:
+        default_log_backups = 5
+
+    parser.add_argument(
+        "--log-backups",
+        type=int,
+        default=default_log_backups,
+        help="number of compressed log segments to keep (default: 5)",
+    )
+
     args = parser.parse_args()
 
     custom_args = validate_args(parser, args)
@@ -90,6 +195,15 @@ def validate_args(parser: ArgumentParser, args: Namespace):
     server_log_level: str = args.server_log_level
     access_log: str = args.access_log
     cors_allow_origins_raw: str = args.cors_allow_origins
+    max_jobs: int = args.max_jobs
+    drain_timeout: int = args.drain_timeout
+    workers: int = args.workers
+    broker: str = args.broker
+    data_dir: str = args.data_dir
+    progress_rate: float = args.progress_rate
+    log_max_size: int = args.log_max_size
+    log_max_age: int = args.log_max_age
+    log_backups: int = args.log_backups
 
     if port < 0 or port > 65535:
         parser.error("invalid value for --port, must be a valid integer between 0 and 65535")
@@ -110,6 +224,36 @@ def validate_args(parser: ArgumentParser, args: Namespace):
     if access_log.lower() not in ["true", "false"]:
         parser.error("invalid value for --access-log, must be 'true' or 'false'")
 
+    if max_jobs < 1:
+        parser.error("invalid value for --max-jobs, must be a positive integer")
+
+    if drain_timeout < 0:
+        parser.error("invalid value for --drain-timeout, must be a non-negative integer")
+
+    if workers < 1:
+        parser.error("invalid value for --workers, must be a positive integer")
+
+    if broker.lower() not in ["sqlite", "memory"]:
+        parser.error("invalid value for --broker, must be 'sqlite' or 'memory'")
+
+    if broker.lower() == "memory" and workers > 1:
+        parser.error("the memory broker cannot be shared by multiple workers, use --broker sqlite")
+
+    if data_dir != "" and not os.path.isdir(utils.normalise_path(data_dir)):
+        parser.error("invalid value for --data-dir, must be a path to an existing directory")
+
+    if progress_rate <= 0:
+        parser.error("invalid value for --progress-rate, must be a positive number")
+
+    if log_max_size < 0:
+        parser.error("invalid value for --log-max-size, must be a non-negative integer")
+
+    if log_max_age < 0:
+        parser.error("invalid value for --log-max-age, must be a non-negative integer")
+
+    if log_backups < 0:
+        parser.error("invalid value for --log-backups, must be a non-negative integer")
+
     cors_allow_origins = parse_cors_allow_origins(cors_allow_origins_raw)
 
     return CustomNamespace(
@@ -120,6 +264,15 @@ def validate_args(parser: ArgumentParser, args: Namespace):
         server_log_level=server_log_level.lower(),
         access_log=access_log.lower() == "true",
         cors_allow_origins=cors_allow_origins,
+        max_jobs=max_jobs,
+        drain_timeout=drain_timeout,
+        workers=workers,
+        broker=broker.lower(),
+        data_dir=utils.normalise_path(data_dir),
+        progress_rate=float(progress_rate),
+        log_max_size=log_max_size,
+        log_max_age=log_max_age,
+        log_backups=log_backups,
     )
 
 
@@ -132,6 +285,15 @@ def get_default_args():
     server_log_level = os.environ.get("SERVER_LOG_LEVEL", "info")
     access_log = os.environ.get("ACCESS_LOG", "false")
     cors_allow_origins_raw = os.environ.get("CORS_ALLOW_ORIGINS", "*")
+    max_jobs = os.environ.get("MAX_JOBS", "4")
+    drain_timeout = os.environ.get("DRAIN_TIMEOUT", "30")
+    workers = os.environ.get("WORKERS", "1")
+    broker = os.environ.get("BROKER", "sqlite")
+    data_dir = os.environ.get("DATA_DIR", "")
+    progress_rate = os.environ.get("PROGRESS_RATE", "2")
+    log_max_size = os.environ.get("LOG_MAX_SIZE", "10")
+    log_max_age = os.environ.get("LOG_MAX_AGE", "0")
+    log_backups = os.environ.get("LOG_BACKUPS", "5")
 
     cors_allow_origins = parse_cors_allow_origins(cors_allow_origins_raw)
 
@@ -143,9 +305,44 @@ def get_default_args():
         server_log_level=server_log_level.lower(),
         access_log=access_log.lower() == "true",
         cors_allow_origins=cors_allow_origins,
+        max_jobs=int(max_jobs),
+        drain_timeout=int(drain_timeout),
+        workers=int(workers),
+        broker=broker.lower(),
+        data_dir=utils.normalise_path(data_dir),
+        progress_rate=float(progress_rate),
+        log_max_size=int(log_max_size),
+        log_max_age=int(log_max_age),
+        log_backups=int(log_backups),
     )
 
 
+def to_environ(args: "CustomNamespace"):
+    """Return environment variables that reproduce the arguments in another process.
+
+    Worker processes started by uvicorn do not inherit parsed arguments, but
+    read their defaults from the environment in `get_default_args`.
+    """
+    return {
+        "HOST": args.host,
+        "PORT": str(args.port),
+        "LOG_DIR": args.log_dir,
+        "LOG_LEVEL": args.log_level,
+        "SERVER_LOG_LEVEL": args.server_log_level,
+        "ACCESS_LOG": str(args.access_log).lower(),
+        "CORS_ALLOW_ORIGINS": ",".join(args.cors_allow_origins),
+        "MAX_JOBS": str(args.max_jobs),
+        "DRAIN_TIMEOUT": str(args.drain_timeout),
+        "WORKERS": str(args.workers),
+        "BROKER": args.broker,
+        "DATA_DIR": args.data_dir,
+        "PROGRESS_RATE": str(args.progress_rate),
+        "LOG_MAX_SIZE": str(args.log_max_size),
+        "LOG_MAX_AGE": str(args.log_max_age),
+        "LOG_BACKUPS": str(args.log_backups),
+    }
+
+
 def parse_cors_allow_origins(value: str | list[str] | None):
     """Parse allowed CORS origins from string or list input."""
     if value is None:
@@ -176,6 +373,15 @@ class CustomNamespace(Namespace):
         server_log_level: str,
         access_log: bool,
         cors_allow_origins: list[str],
+        max_jobs: int = 4,
+        drain_timeout: int = 30,
+        workers: int = 1,
+        broker: str = "sqlite",
+        data_dir: str = "",
+        progress_rate: float = 2.0,
+        log_max_size: int = 10,
+        log_max_age: int = 0,
+        log_backups: int = 5,
     ):
         super().__init__()
         self.host = host
@@ -185,6 +391,15 @@ class CustomNamespace(Namespace):
         self.server_log_level = server_log_level
         self.access_log = access_log
         self.cors_allow_origins = cors_allow_origins
+        self.max_jobs = max_jobs
+        self.drain_timeout = drain_timeout
+        self.workers = workers
+        self.broker = broker
+        self.data_dir = data_dir
+        self.progress_rate = progress_rate
+        self.log_max_size = log_max_size
+        self.log_max_age = log_max_age
+        self.log_backups = log_backups
 
         self._validate_types()
 
@@ -234,3 +449,58 @@ class CustomNamespace(Namespace):
                     type(self.cors_allow_origins).__name__
                 )
             )
+
+        if not isinstance(self.max_jobs, int):
+            raise TypeError(
+                "Expected 'max_jobs' to be of type int, got {}".format(type(self.max_jobs).__name__)
+            )
+
+        if not isinstance(self.drain_timeout, int):
+            raise TypeError(
+                "Expected 'drain_timeout' to be of type int, got {}".format(
+                    type(self.drain_timeout).__name__
+                )
+            )
+
+        if not isinstance(self.workers, int):
+            raise TypeError(
+                "Expected 'workers' to be of type int, got {}".format(type(self.workers).__name__)
+            )
+
+        if not isinstance(self.broker, str):
+            raise TypeError(
+                "Expected 'broker' to be of type str, got {}".format(type(self.broker).__name__)
+            )
+
+        if not isinstance(self.data_dir, str):
+            raise TypeError(
+                "Expected 'data_dir' to be of type str, got {}".format(type(self.data_dir).__name__)
+            )
+
+        if not isinstance(self.progress_rate, float):
+            raise TypeError(
+                "Expected 'progress_rate' to be of type float, got {}".format(
+                    type(self.progress_rate).__name__
+                )
+            )
+
+        if not isinstance(self.log_max_size, int):
+            raise TypeError(
+                "Expected 'log_max_size' to be of type int, got {}".format(
+                    type(self.log_max_size).__name__
+                )
+            )
+
+        if not isinstance(self.log_max_age, int):
+            raise TypeError(
+                "Expected 'log_max_age' to be of type int, got {}".format(
+                    type(self.log_max_age).__name__
+                )
+            )
+
+        if not isinstance(self.log_backups, int):
+            raise TypeError(
+                "Expected 'log_backups' to be of type int, got {}".format(
+                    type(self.log_backups).__name__
+                )
+            )
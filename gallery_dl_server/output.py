@@ -3,17 +3,17 @@
 import os
 import sys
 
-import asyncio
+import atexit
 import io
 import logging
-import pickle
 import queue
 import re
 import threading
+import time
+import weakref
 
-from mmap import mmap, ACCESS_READ, ACCESS_WRITE
-from multiprocessing.queues import Queue
-from typing import TextIO, Any
+from multiprocessing.connection import Connection
+from typing import Callable, TextIO, Any
 
 from gallery_dl import output, job
 
@@ -28,6 +28,10 @@ log_dir = args.log_dir
 log_level = args.log_level
 server_log_level = args.server_log_level
 access_log = args.access_log
+progress_rate = args.progress_rate
+log_max_size = args.log_max_size
+log_max_age = args.log_max_age
+log_backups = args.log_backups
 
 if server_log_level == "trace":
     server_log_level = "debug"
@@ -39,7 +43,12 @@ LOG_LEVEL_MIN = min(LOG_LEVEL, LOG_LEVEL_DL)
 LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
 LOG_FORMAT_DEBUG = "%(asctime)s [%(name)s] [%(filename)s:%(lineno)d] [%(levelname)s] %(message)s"
 LOG_FORMAT_DATE = "%Y-%m-%d %H:%M:%S"
+LOG_JOB_TAG = "[job:%(job_id)s] "
 LOG_SEPARATOR = "/sep/"
+PROGRESS_LOGGER = "progress"
+LOG_SEGMENT_DATE = "%Y%m%d-%H%M%S"
+LOG_FLUSH_INTERVAL = 0.25
+LOG_FLUSH_SIZE = 64 * 1024
 
 
 def initialise_logging(
@@ -48,12 +57,18 @@ def initialise_logging(
     file=LOG_FILE,
     level=LOG_LEVEL,
 ):
-    """Set up basic logging functionality for gallery-dl-server."""
+    """Set up basic logging functionality for gallery-dl-server.
+
+    In download processes, logs are sent to the server process instead.
+    """
     logger = AsyncLogger(name, level)
     logger.propagate = False
+    _loggers.add(logger)
 
-    if not logger.hasHandlers():
-        formatter = CustomFormatter(LOG_FORMAT, LOG_FORMAT_DATE)
+    if _pipe_handler is not None:
+        _pipe_handler.attach(logger)
+    elif not logger.hasHandlers():
+        formatter = CustomFormatter(LOG_FORMAT, LOG_FORMAT_DATE, job_ids=True)
 
         handler_console = setup_stream_handler(stream, formatter)
         logger.addHandler(handler_console)
@@ -66,7 +81,11 @@ def initialise_logging(
 
 
 class AsyncLogger(logging.Logger):
-    """Custom logger for async logging and logging multi-line messages."""
+    """Custom logger for async logging and logging multi-line messages.
+
+    Records are handed to the log dispatch thread, so logging never waits
+    for the handlers to write to the console or log file.
+    """
 
     def __init__(self, name: str, level=logging.NOTSET):
         super().__init__(name, level)
@@ -78,20 +97,135 @@ class AsyncLogger(logging.Logger):
                 self.log(level, line)
 
     def handle(self, record):
-        """Override handle method to call the async version."""
+        """Override handle method to queue the record for the dispatch thread."""
+        _dispatcher.put(self, record)
+
+
+class LogDispatcher:
+    """Pass queued log records to their logger's handlers in a single thread.
+
+    Records are handled in the order they were queued. The thread is started
+    by the first record, and is replaced after a fork since threads are not
+    inherited by child processes.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Discard the queue and thread, e.g. those inherited from a parent process."""
+        self.queue: queue.SimpleQueue[tuple[logging.Logger, logging.LogRecord] | None]
+        self.queue = queue.SimpleQueue()
+        self.thread: threading.Thread | None = None
+        self.lock = threading.Lock()
+
+    def put(self, logger: logging.Logger, record: logging.LogRecord):
+        """Queue a record to be handled by the logger's handlers."""
+        if self.thread is None:
+            self.start()
+
+        self.queue.put((logger, record))
+
+    def start(self):
+        """Start the dispatch thread if it is not running."""
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="LogDispatcher", daemon=True)
+                self.thread.start()
+
+    def run(self):
+        """Handle queued records in batches until the stop marker is reached.
+
+        Once all records queued so far are handled, the file handlers whose
+        flush interval has passed are flushed. While no records are queued,
+        the thread wakes up in time to flush the remaining buffered records.
+        """
+        while True:
+            try:
+                item = self.queue.get(timeout=get_flush_timeout())
+            except queue.Empty:
+                flush_file_handlers(force=False)
+                continue
+
+            while item is not None:
+                self.handle(*item)
+
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            flush_file_handlers(force=item is None)
+
+            if item is None:
+                break
+
+    def handle(self, logger: logging.Logger, record: logging.LogRecord):
+        """Pass a record to the handlers of its logger."""
         try:
-            event_loop = asyncio.get_running_loop()
-            event_loop.create_task(self.handle_async(record))
-        except RuntimeError:
-            asyncio.run(self.handle_async(record))
+            logging.Logger.handle(logger, record)
+        except Exception:
+            # Handlers report their own errors, this only keeps the thread alive
+            pass
+
+    def stop(self):
+        """Handle all queued records and stop the dispatch thread."""
+        with self.lock:
+            thread = self.thread
+
+            if thread is None or thread is threading.current_thread():
+                return
+
+            self.queue.put(None)
+            thread.join()
+            self.thread = None
 
-    async def handle_async(self, record: logging.LogRecord):
-        """Perform asynchronous handling of log records."""
-        super().handle(record)
+            # Records queued after the stop marker
+            while True:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                if item is not None:
+                    self.handle(*item)
+
+            flush_file_handlers()
+
+
+_dispatcher = LogDispatcher()
+_loggers: "weakref.WeakSet[AsyncLogger]" = weakref.WeakSet()
+_pipe_handler: "PipeHandler | None" = None
+_file_handlers: dict[str, "BatchFileHandler"] = {}
+_rollover_listeners: dict[str, list[Callable[[], None]]] = {}
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispatcher.reset)
+
+atexit.register(_dispatcher.stop)
 
 
 class CustomFormatter(logging.Formatter):
-    """Custom formatter for log messages."""
+    """Custom formatter for log messages.
+
+    With `job_ids`, messages of records with a `job_id` attribute, such as
+    those of download processes, are tagged with the job id. This tells the
+    lines of concurrent downloads apart, and lets log streams follow a job.
+    """
+
+    def __init__(self, fmt: str | None = None, datefmt: str | None = None, job_ids=False):
+        super().__init__(fmt, datefmt)
+        self.job_style = None
+
+        if job_ids and fmt:
+            self.job_style = logging.PercentStyle(
+                fmt.replace("%(message)s", LOG_JOB_TAG + "%(message)s")
+            )
+
+    def formatMessage(self, record):
+        if self.job_style is not None and getattr(record, "job_id", None):
+            return self.job_style.format(record)
+
+        return super().formatMessage(record)
 
     def format(self, record):
         record.levelname = record.levelname.lower()
@@ -116,16 +250,231 @@ def setup_stream_handler(stream: TextIO | Any, formatter: logging.Formatter):
 
 
 def setup_file_handler(file: str, formatter: logging.Formatter):
-    """Set up a file handler for logging."""
+    """Set up a file handler for logging.
+
+    Loggers share one handler per file, so records are written in order
+    through a single file object.
+    """
+    if file in _file_handlers:
+        return _file_handlers[file]
+
     os.makedirs(os.path.dirname(file), exist_ok=True)
 
-    file_handler = logging.FileHandler(file, mode="a", encoding="utf-8", delay=False)
+    # Opened by the first record, so download processes never open the file
+    file_handler = BatchFileHandler(
+        file,
+        max_size=log_max_size * 1024 * 1024,
+        max_age=log_max_age * 3600,
+        backups=log_backups,
+        mode="a",
+        encoding="utf-8",
+        delay=True,
+    )
     file_handler.setFormatter(formatter)
     register_handler(file_handler)
 
+    _file_handlers[file] = file_handler
+
     return file_handler
 
 
+class BatchFileHandler(logging.FileHandler):
+    """File handler that buffers records and writes them to the file in batches.
+
+    Buffered records are written together once they reach `LOG_FLUSH_SIZE`,
+    when a record of level ERROR or above is emitted, or at the latest
+    `LOG_FLUSH_INTERVAL` seconds after the first of them, when the log
+    dispatcher flushes the handler. After flushing, the file is rotated into
+    a compressed segment when it reaches the maximum size or age.
+    """
+
+    def __init__(self, filename: str, max_size=0, max_age=0, backups=0, **kwargs):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.backups = backups
+        self.started = time.time()
+        self.buffer: list[str] = []
+        self.buffered = 0
+        self.flush_time: float | None = None
+        self.flushed = False
+        super().__init__(filename, **kwargs)
+
+    def _open(self):
+        stream = super()._open()
+        self.started = read_start_time(self.baseFilename)
+        return stream
+
+    def emit(self, record):
+        try:
+            message = self.format(record) + self.terminator
+        except Exception:
+            self.handleError(record)
+            return
+
+        self.buffer.append(message)
+        self.buffered += len(message)
+
+        if record.levelno >= logging.ERROR or self.buffered >= LOG_FLUSH_SIZE:
+            self.flush()
+        elif self.flush_time is None:
+            self.flush_time = time.monotonic() + LOG_FLUSH_INTERVAL
+
+    def flush(self):
+        """Write the buffered records to the log file with a single write."""
+        with self.lock:
+            if not self.buffer:
+                return
+
+            data = "".join(self.buffer)
+            self.buffer = []
+            self.buffered = 0
+            self.flush_time = None
+
+            try:
+                if self.stream is None:
+                    if self.mode != "w" or not self._closed:
+                        self.stream = self._open()
+
+                if self.stream is not None:
+                    self.stream.write(data)
+                    self.stream.flush()
+                    self.flushed = True
+            except Exception:
+                self.handleError(logging.makeLogRecord({"msg": "Failed to write to the log file"}))
+
+    def close(self):
+        # FileHandler only flushes if the file was opened, which is delayed
+        self.flush()
+        super().close()
+
+    def rollover_if_needed(self):
+        """Rotate the log file if it reached the maximum size or age."""
+        if self.stream is None or not (self.max_size or self.max_age):
+            return
+
+        try:
+            stat = os.fstat(self.stream.fileno())
+
+            # Another server worker may have rotated the file already
+            if not os.path.samestat(stat, os.stat(self.baseFilename)):
+                self.reopen()
+                return
+        except OSError:
+            self.reopen()
+            return
+
+        if self.max_size and stat.st_size >= self.max_size:
+            self.rollover()
+        elif self.max_age and stat.st_size and time.time() - self.started >= self.max_age:
+            self.rollover()
+
+    def rollover(self):
+        """Move the log file into a compressed segment and start a new file."""
+        for callback in _rollover_listeners.get(self.baseFilename, []):
+            try:
+                callback()
+            except Exception:
+                pass
+
+        segment = f"{self.baseFilename}.{time.strftime(LOG_SEGMENT_DATE)}"
+
+        self.stream.close()
+        self.stream = None
+
+        if not os.path.exists(segment + ".gz"):
+            try:
+                os.rename(self.baseFilename, segment)
+            except OSError:
+                pass
+            else:
+                compress_file(segment, segment + ".gz")
+                os.remove(segment)
+                remove_old_log_segments(self.baseFilename, self.backups)
+
+        self.stream = self._open()
+
+    def reopen(self):
+        """Close the file object, so the next record opens the log file again."""
+        self.stream.close()
+        self.stream = None
+
+
+def flush_file_handlers(force=True):
+    """Write buffered records of the file handlers to disk and rotate the files.
+
+    Unless forced, only the handlers whose flush interval has passed are
+    flushed. Files are only rotated after records were written to them.
+    """
+    now = time.monotonic()
+
+    for handler in list(_file_handlers.values()):
+        if force or (handler.flush_time is not None and handler.flush_time <= now):
+            handler.flush()
+
+        if handler.flushed:
+            handler.flushed = False
+            handler.rollover_if_needed()
+
+
+def get_flush_timeout():
+    """Return the seconds until the next file handler is due to be flushed, or None."""
+    flush_times = [
+        handler.flush_time
+        for handler in list(_file_handlers.values())
+        if handler.flush_time is not None
+    ]
+
+    if not flush_times:
+        return None
+
+    return max(min(flush_times) - time.monotonic(), 0)
+
+
+def on_rollover(file: str, callback: Callable[[], None]):
+    """Call a function in the log dispatch thread before the log file is rotated."""
+    _rollover_listeners.setdefault(os.path.abspath(file), []).append(callback)
+
+
+def read_start_time(file: str):
+    """Return the time of the first record in a log file, or the current time."""
+    try:
+        with open(file, "rb") as f:
+            date = f.read(19).decode("ascii")
+
+        return time.mktime(time.strptime(date, LOG_FORMAT_DATE))
+    except (OSError, UnicodeDecodeError, ValueError):
+        return time.time()
+
+
+def compress_file(src: str, dst: str):
+    """Write a gzip compressed copy of a file."""
+    import gzip
+    import shutil
+
+    with open(src, "rb") as f_in, gzip.open(dst + ".tmp", "wb", compresslevel=6) as f_out:
+        shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+
+    os.replace(dst + ".tmp", dst)
+
+
+def get_log_segments(file=LOG_FILE):
+    """Return the compressed segments of a log file, oldest first."""
+    import glob
+
+    return sorted(glob.glob(glob.escape(file) + ".*.gz"))
+
+
+def remove_old_log_segments(file: str, keep: int):
+    """Remove all but the newest compressed segments of a log file."""
+    segments = get_log_segments(file)
+
+    for segment in segments[: max(len(segments) - keep, 0)]:
+        try:
+            os.remove(segment)
+        except OSError:
+            pass
+
+
 def get_logger(name: str | None = None):
     """Return a logger with the specified name."""
     return logging.getLogger(name)
@@ -164,73 +513,89 @@ def setup_logging(level=LOG_LEVEL_DL):
     return logger
 
 
-def capture_logs(log_queue: Queue[dict[str, Any]]):
-    """Send logs that reach the root logger to a queue."""
+def capture_logs(conn: Connection, job_id: str):
+    """Send all logs of a download process to the server process.
+
+    Logs of gallery-dl and of this package are sent over the pipe, so the
+    server process is the only one writing to the console and log file.
+    """
+    global _pipe_handler
+
     root = logging.getLogger()
-    queue_handler = QueueHandler(log_queue)
+    pipe_handler = PipeHandler(conn, job_id)
 
     if root.handlers:
         existing_handler = root.handlers[0]
-        queue_handler.setFormatter(existing_handler.formatter)
+        pipe_handler.setFormatter(existing_handler.formatter)
 
         for handler in root.handlers[:]:
             if isinstance(handler, logging.StreamHandler):
                 handler.close()
                 root.removeHandler(handler)
 
-    root.addHandler(queue_handler)
-    register_handler(handler)
+    root.addHandler(pipe_handler)
+    register_handler(pipe_handler)
 
+    for logger in list(_loggers):
+        pipe_handler.attach(logger)
 
-class QueueHandler(logging.Handler):
-    """Custom logging handler that sends log messages to a queue."""
+    _pipe_handler = pipe_handler
 
-    def __init__(self, queue: Queue[dict[str, Any]]):
-        super().__init__()
-        self.queue = queue
+    return pipe_handler
 
-    def emit(self, record: logging.LogRecord):
-        record.msg = self.format(record).strip()
-        record.args = ()
-        record_dict = record_to_dict(record)
 
-        self.queue.put(record_dict)
+class PipeHandler(logging.Handler):
+    """Custom logging handler that sends log messages over a pipe.
 
+    Each record is sent as a tuple of level, creation time, logger name,
+    formatted message and job ID. Records below the lowest level the server
+    logs are dropped before they are sent.
 
-def record_to_dict(record: logging.LogRecord):
-    """Convert a log record into a dictionary."""
-    record_dict = record.__dict__.copy()
-    record_dict["level"] = record.levelno
+    Records of gallery-dl are formatted as configured for gallery-dl, while
+    only the message is sent for loggers of this package, since the server
+    formats them like its own records.
+    """
 
-    sanitise_dict(record_dict)
+    def __init__(self, conn: Connection, job_id: str, level=LOG_LEVEL_MIN):
+        super().__init__(level)
+        self.conn = conn
+        self.job_id = job_id
+        self.package_loggers: set[str] = set()
+        self.package_formatter = logging.Formatter()
 
-    return record_dict
+    def attach(self, logger: logging.Logger):
+        """Replace the handlers of a logger of this package with this handler."""
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
 
+        logger.addHandler(self)
+        self.package_loggers.add(logger.name)
 
-def sanitise_dict(record_dict: dict[str, Any]):
-    """Remove non-serialisable values from a dictionary."""
-    keys_to_remove = []
+    def emit(self, record: logging.LogRecord):
+        try:
+            if record.name in self.package_loggers:
+                msg = self.package_formatter.format(record)
+            else:
+                msg = self.format(record).strip()
 
-    for key, value in record_dict.items():
-        if not is_serialisable(value):
-            keys_to_remove.append(key)
+            self.conn.send((record.levelno, record.created, record.name, msg, self.job_id))
+        except (OSError, ValueError):
+            # The server closed its end of the pipe
+            pass
+        except Exception:
+            self.handleError(record)
 
-    for key in keys_to_remove:
-        record_dict.pop(key)
 
+def decode_record(data: tuple[int, float, str, str, str]):
+    """Create a log record from data sent by `PipeHandler`."""
+    levelno, created, name, msg, job_id = data
 
-def is_serialisable(value: Any):
-    """Check if a value can be serialised."""
-    try:
-        pickle.dumps(value)
-        return True
-    except Exception:
-        return False
+    record = logging.LogRecord(name, levelno, "", 0, msg, (), None)
+    record.created = created
+    record.msecs = (created - int(created)) * 1000
+    record.job_id = job_id
 
-
-def dict_to_record(record_dict: dict[str, Any]):
-    """Convert a dictionary back into a log record."""
-    return logging.LogRecord(**record_dict)
+    return record
 
 
 def stdout_write(s: str, /):
@@ -246,32 +611,28 @@ def stderr_write(s: str, /):
 
 
 def redirect_standard_streams(level=logging.INFO):
-    """Redirect stdout and stderr streams and log at level."""
+    """Redirect stdout and stderr streams and log at level.
+
+    Download progress is logged by a separate logger, and only the final
+    progress of each file is logged with the other messages.
+    """
     logger_writer = LoggerWriter(level)
 
     setattr(sys, "stdout", logger_writer)
     setattr(sys, "stderr", logger_writer)
 
+    return logger_writer
+
 
 class LoggerWriter:
     """Log writes to stdout and stderr."""
 
     def __init__(self, level=logging.INFO):
         self.level = level
-        self.stream = sys.__stdout__
         self.logger = initialise_logging(type(self).__name__)
-
-        for handler in self.logger.handlers[:]:
-            handler.close()
-            self.logger.removeHandler(handler)
-
-        self.stream_handler = ConsoleProgress(self.stream)
-        self.file_handler = FileProgress()
-
-        self.logger.addHandler(self.stream_handler)
-        self.logger.addHandler(self.file_handler)
-
-        register_handler(self.stream_handler, self.file_handler)
+        self.progress_logger = initialise_logging(PROGRESS_LOGGER)
+        self.progress = ProgressThrottle(self.log_progress)
+        self.last_progress: str | None = None
 
     def write(self, msg: str, /):
         """Prepare and log messages."""
@@ -280,6 +641,12 @@ class LoggerWriter:
         if not msg:
             return
 
+        if "B/s" in msg:
+            self.last_progress = msg
+            return self.progress.update(msg)
+
+        self.log_final_progress()
+
         if msg.startswith("* "):
             msg = f"Download successful: {msg[2:]}"
 
@@ -289,136 +656,57 @@ class LoggerWriter:
 
         self.logger.log(self.level, msg)
 
-    def flush(self):
-        pass
-
-
-class NullStream(io.TextIOBase):
-    """Suppress writes to stdout or stderr."""
-
-    def write(self, _: str, /):
-        pass
+    def log_progress(self, msg: str):
+        """Log a download progress update."""
+        self.progress_logger.log(self.level, msg)
 
     def flush(self):
         pass
 
+    def log_final_progress(self):
+        """Send the pending progress update and log the final progress of a file."""
+        self.progress.flush()
 
-class ConsoleProgress(logging.StreamHandler):
-    """Custom stream handler that can handle progress updates."""
+        if self.last_progress is not None:
+            self.logger.log(self.level, self.last_progress)
+            self.last_progress = None
 
-    def __init__(self, stream: TextIO | Any = NullStream()):
-        super().__init__(stream)
-        self.stream: TextIO | Any
-        self.formatter = CustomFormatter(LOG_FORMAT, LOG_FORMAT_DATE)
-        self.last_msg = ""
-
-    def emit(self, record):
-        """Override emit method to write final progress update."""
-        msg = self.format(record)
-
-        if "B/s" not in msg and "B/s" in self.last_msg:
-            self.stream.write(self.last_msg + "\n")
-            self.stream.flush()
-
-        if "B/s" not in msg:
-            super().emit(record)
-
-        self.last_msg = msg
-
-
-class FileProgress(logging.FileHandler):
-    """Custom file handler that can handle progress updates asynchronously."""
-
-    def __init__(self, filename=LOG_FILE, mode="a", encoding="utf-8", delay=False):
-        super().__init__(filename, mode, encoding, delay)
-        self.formatter = CustomFormatter(LOG_FORMAT, LOG_FORMAT_DATE)
-        self.last_pos = 0
-        self.queue = queue.Queue()
-        self.thread = threading.Thread(target=self.process_queue, daemon=True)
-        self.thread_lock = threading.Lock()
-        self.thread.start()
-
-    def emit(self, record):
-        """Override emit method to queue progress messages."""
-        msg = self.format(record)
-
-        if "B/s" in msg:
-            self.queue.put(msg)
-        else:
-            with self.thread_lock:
-                super().emit(record)
-
-    def process_queue(self):
-        """Process logging queue in a separate thread."""
-        while True:
-            msg = self.queue.get()
-            if msg is None:
-                break
-            with self.thread_lock:
-                self.write_to_file(msg)
-
-    def write_to_file(self, msg: str):
-        """Write download progress to the memory-mapped log file."""
-        with open(self.baseFilename, "r+b") as file:
-            with mmap(file.fileno(), 0, access=ACCESS_WRITE) as mm:
-                self.write_progress(mm, msg)
-
-    def write_progress(self, mmap: mmap, msg: str):
-        """Write download progress updates to the same line."""
-        if self.last_pos == 0:
-            self.last_pos = mmap.rfind(b"\n") + 1
-
-        mmap.seek(self.last_pos)
-
-        new_msg = msg.encode("utf-8")
-        new_msg_length = len(new_msg)
-        target_msg_length = 54
-
-        padding = b""
-        if new_msg_length < target_msg_length:
-            padding = b" " * (target_msg_length - new_msg_length)
-
-        terminator = b"\n"
-        new_size = self.last_pos + max(new_msg_length, target_msg_length) + 1
-
-        if utils.WINDOWS:
-            terminator = b"\r\n"
-            new_size += 1
-
-        if new_size > mmap.size():
-            mmap.resize(new_size)
+    def close(self):
+        """Log the final download progress if it has not been logged yet."""
+        self.log_final_progress()
 
-        mmap.write(new_msg + padding + terminator)
-        mmap.flush()
 
-    def close(self):
-        """Stop logging thread and close handler."""
-        self.queue.put(None)
-        self.thread.join()
-        super().close()
+class ProgressThrottle:
+    """Coalesce download progress updates to a maximum rate.
 
+    An update is sent if the previous one was sent at least one interval ago,
+    otherwise it replaces the pending update. `flush` sends the pending
+    update, so the final progress of a file is not lost.
+    """
 
-def read_previous_line(file_path: str, last_position: int):
-    """Return the previous line of a file or from a given position."""
-    previous_line = ""
-    position = 0
+    def __init__(self, send: Callable[[str], None], rate=progress_rate):
+        self.send = send
+        self.interval = 1 / rate
+        self.next_send = 0.0
+        self.pending: str | None = None
 
-    if os.path.getsize(file_path) == 0:
-        return previous_line, position
+    def update(self, msg: str):
+        """Send or hold back a progress update."""
+        now = time.monotonic()
 
-    with open(file_path, "rb") as file:
-        with mmap(file.fileno(), 0, access=ACCESS_READ) as mm:
-            if last_position == 0:
-                position = mm.rfind(b"\n", 0, mm.size() - 2) + 1
-                if position == 0:
-                    return previous_line, position
-            else:
-                position = last_position
+        if now < self.next_send:
+            self.pending = msg
+            return
 
-            next_line = mm.find(b"\n", position) + 1
-            previous_line = mm[position:next_line].decode("utf-8")
+        self.pending = None
+        self.next_send = now + self.interval
+        self.send(msg)
 
-    return previous_line, position
+    def flush(self):
+        """Send the pending progress update, if any."""
+        if self.pending is not None:
+            msg, self.pending = self.pending, None
+            self.send(msg)
 
 
 class StringLogger:
@@ -518,7 +806,9 @@ def register_handler(*handlers: logging.Handler):
 
 
 def close_handlers():
-    """Close all registered logging handlers."""
+    """Write queued log records and close all registered logging handlers."""
+    _dispatcher.stop()
+
     logging_manager = LoggingManager()
     logging_manager.close_all()
 
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+
+from typing import Any
+from urllib.parse import urlparse
+
+from . import utils
+
+USAGE_KEYS = ("wall_time", "cpu_time", "peak_rss", "io_read_bytes", "disk_bytes")
+
+SIZE_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*$", re.IGNORECASE)
+
+DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+DURATION_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$", re.IGNORECASE)
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def get_domain(url: str):
+    """Return the host name of a URL without a leading `www.`."""
+    host = urlparse(url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def parse_size(value: Any):
+    """Parse a size such as `1048576`, `512M` or `2G` into bytes."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+
+    match = SIZE_PATTERN.match(str(value))
+    if not match:
+        raise ValueError(f"Invalid size: {value}")
+
+    number, unit = match.groups()
+    return int(float(number) * SIZE_UNITS[unit.lower()])
+
+
+def parse_duration(value: Any):
+    """Parse a duration such as `3600`, `90s`, `30m` or `1.5h` into seconds."""
+    if value is None:
+        return None
+
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if value < 0:
+            raise ValueError(f"Invalid duration: {value}")
+        return value
+
+    match = DURATION_PATTERN.match(value) if isinstance(value, str) else None
+    if not match:
+        raise ValueError(f"Invalid duration: {value}")
+
+    number, unit = match.groups()
+    return float(number) * DURATION_UNITS[unit.lower()]
+
+
+def read_proc_usage(pid: int | str = "self"):
+    """Read CPU time, peak RSS and I/O counters of a process from `/proc`.
+
+    `io_read_bytes` are the bytes read through system calls (`rchar`) that
+    were not read from storage (`read_bytes`). They include socket reads, but
+    also reads served from the page cache, so they are not network traffic.
+
+    Returns `None` if `/proc` is not available.
+    """
+    usage: dict[str, float] = {}
+
+    try:
+        with open(f"/proc/{pid}/stat", "r") as file:
+            fields = file.read().rsplit(")", 1)[1].split()
+        # utime, stime, cutime and cstime are fields 14 to 17 of the stat file
+        usage["cpu_time"] = sum(int(tick) for tick in fields[11:15]) / CLOCK_TICKS
+
+        with open(f"/proc/{pid}/status", "r") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    usage["peak_rss"] = int(line.split()[1]) * 1024
+                    break
+
+        with open(f"/proc/{pid}/io", "r") as file:
+            io = dict(line.split(": ", 1) for line in file.read().splitlines())
+        usage["io_read_bytes"] = max(0, int(io["rchar"]) - int(io["read_bytes"]))
+        usage["disk_bytes"] = int(io["write_bytes"])
+    except (OSError, ValueError, KeyError, IndexError):
+        return usage or None
+
+    return usage
+
+
+def own_usage():
+    """Return the resource usage of the current process and its children."""
+    if utils.WINDOWS:
+        return {}
+
+    import resource
+
+    usage = read_proc_usage() or {}
+
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    usage["cpu_time"] = (
+        self_usage.ru_utime
+        + self_usage.ru_stime
+        + children_usage.ru_utime
+        + children_usage.ru_stime
+    )
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    maxrss = self_usage.ru_maxrss
+    usage.setdefault("peak_rss", maxrss if utils.MACOS else maxrss * 1024)
+
+    return usage
+
+
+def merge_usage(*usages: dict[str, float] | None):
+    """Combine usage figures by taking the largest value of each counter."""
+    merged: dict[str, float] = {}
+
+    for usage in usages:
+        for key, value in (usage or {}).items():
+            if key in USAGE_KEYS and value is not None:
+                merged[key] = max(merged.get(key, 0), value)
+
+    return merged
+
+
+class ResourceLimits:
+    """Optional per-job limits on peak RSS, CPU time and wall time."""
+
+    def __init__(
+        self,
+        max_rss: int | None = None,
+        max_cpu: float | None = None,
+        max_time: float | None = None,
+    ):
+        self.max_rss = max_rss
+        self.max_cpu = max_cpu
+        self.max_time = max_time
+
+    @classmethod
+    def from_config(cls, conf: Any):
+        """Create limits from the `limits` section of the server configuration.
+
+        Raises `ValueError` for invalid limits.
+        """
+        if not isinstance(conf, dict):
+            return cls()
+
+        return cls(
+            max_rss=parse_size(conf.get("rss")),
+            max_cpu=parse_duration(conf.get("cpu")),
+            max_time=parse_duration(conf.get("time")),
+        )
+
+    def __bool__(self):
+        return any(limit is not None for limit in (self.max_rss, self.max_cpu, self.max_time))
+
+    def exceeded(self, usage: dict[str, float]):
+        """Return a description of the first limit the usage exceeds, if any."""
+        checks = (
+            ("peak_rss", self.max_rss, "peak RSS"),
+            ("cpu_time", self.max_cpu, "CPU time"),
+            ("wall_time", self.max_time, "wall time"),
+        )
+
+        for key, limit, name in checks:
+            if limit is not None and usage.get(key, 0) > limit:
+                return f"{name} limit of {limit} exceeded"
+
+        return None
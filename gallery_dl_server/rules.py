@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+import json
+import re
+
+from typing import Any, Iterator
+
+ACTIONS = ("kill", "retry", "cooldown", "tag")
+
+DEFAULT_DELAY = 600
+DEFAULT_RETRIES = 3
+
+DEFAULT_RULES: list[dict[str, Any]] = [
+    {"pattern": "Video should already be available", "action": "kill"},
+]
+
+# Rule set of the last configuration read, with the configuration it was created from
+_cache: "tuple[str, RuleSet] | None" = None
+
+
+class Rule:
+    """Action to take when a download log message contains a pattern.
+
+    Actions:
+    - `kill`: stop the download and mark the job failed
+    - `retry`: stop the download and queue the job again after `delay` seconds
+    - `cooldown`: like `retry`, and hold back all jobs for the same domain
+    - `tag`: add `tag` to the job and let the download continue
+
+    `count` is the number of matching messages needed to trigger the action,
+    and `retries` limits how many times a job is queued again by the rule.
+    """
+
+    def __init__(
+        self,
+        pattern: str,
+        action: str,
+        regex: bool = False,
+        count: int = 1,
+        delay: float = DEFAULT_DELAY,
+        retries: int = DEFAULT_RETRIES,
+        tag: str | None = None,
+    ):
+        self.pattern = pattern
+        self.action = action
+        self.regex = regex
+        self.count = count
+        self.delay = delay
+        self.retries = retries
+        self.tag = tag or pattern
+
+    @classmethod
+    def from_config(cls, conf: Any):
+        """Create a rule from an entry of the `rules` configuration list."""
+        if not isinstance(conf, dict):
+            raise ValueError(f"Rule must be an object: {conf!r}")
+
+        pattern = conf.get("pattern")
+        action = conf.get("action")
+
+        if not isinstance(pattern, str) or not pattern:
+            raise ValueError(f"Rule has no pattern: {conf!r}")
+
+        if action not in ACTIONS:
+            raise ValueError(f"Rule has an invalid action: {action!r}")
+
+        regex = bool(conf.get("regex", False))
+        if regex:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Rule has an invalid regex: {pattern!r}: {e}") from None
+
+        return cls(
+            pattern,
+            action,
+            regex=regex,
+            count=max(1, int(conf.get("count", 1))),
+            delay=float(conf.get("delay", DEFAULT_DELAY)),
+            retries=int(conf.get("retries", DEFAULT_RETRIES)),
+            tag=conf.get("tag"),
+        )
+
+
+def trie_pattern(literals: list[str]):
+    """Return a regex matching any of the literals, merged into a prefix tree.
+
+    The branches at each node start with different characters, so the
+    regex engine follows at most one path per position of the message no
+    matter how many literals there are.
+    """
+    trie: dict[str, Any] = {}
+
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in node.items() if char]
+
+        if not branches:
+            return ""
+
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+        if "" in node:
+            pattern = f"(?:{pattern})?"
+
+        return pattern
+
+    return build(trie)
+
+
+class RuleSet:
+    """Rules matched against each log message.
+
+    All patterns are compiled into a single regex that rejects messages no
+    rule matches in one pass, which are almost all of them. Each rule is
+    then checked on its own, so rules whose matches overlap all apply.
+    """
+
+    def __init__(self, rules: list[Rule]):
+        self.rules = rules
+        self.patterns = [re.compile(rule.pattern) if rule.regex else None for rule in rules]
+
+        alternatives: list[str] = []
+
+        literals = [rule.pattern for rule in rules if not rule.regex]
+        if literals:
+            alternatives.append(trie_pattern(literals))
+
+        alternatives.extend(f"(?:{rule.pattern})" for rule in rules if rule.regex)
+
+        try:
+            self.regex = re.compile("|".join(alternatives)) if alternatives else None
+        except re.error:
+            # Patterns that cannot be combined, e.g. reused group names, are checked one by one
+            self.regex = None
+
+    @classmethod
+    def from_config(cls, conf: Any):
+        """Create a rule set from the default rules and the configured `rules` list.
+
+        Configured rules replace default rules with the same pattern. The last
+        compiled rule set is cached, since the configuration is read for every
+        job and rarely changes.
+        """
+        global _cache
+
+        key = json.dumps(conf, sort_keys=True, default=str)
+        cached = _cache
+
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        entries = {entry["pattern"]: entry for entry in DEFAULT_RULES}
+
+        if isinstance(conf, list):
+            for entry in conf:
+                entries[entry.get("pattern") if isinstance(entry, dict) else entry] = entry
+
+        rule_set = cls([Rule.from_config(entry) for entry in entries.values()])
+        _cache = (key, rule_set)
+
+        return rule_set
+
+    def match(self, message: str) -> Iterator[Rule]:
+        """Yield the rules matching anywhere in the message, in configuration order."""
+        if not self.rules:
+            return
+
+        if self.regex is not None and self.regex.search(message) is None:
+            return
+
+        for rule, pattern in zip(self.rules, self.patterns):
+            if pattern is None:
+                if rule.pattern in message:
+                    yield rule
+            elif pattern.search(message):
+                yield rule
+
+    def triggered(self, message: str, counts: dict[Rule, int]):
+        """Return the rules whose match count reaches their threshold with this message.
+
+        `counts` holds the number of matches per rule for the current job.
+        """
+        rules: list[Rule] = []
+
+        for rule in dict.fromkeys(self.match(message)):
+            counts[rule] = counts.get(rule, 0) + 1
+            if counts[rule] == rule.count:
+                rules.append(rule)
+
+        return rules
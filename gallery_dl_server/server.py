@@ -1,14 +1,19 @@
 # -*- coding: utf-8 -*-
 
 import asyncio
+import functools
+import json
+import logging
 import mimetypes
 import multiprocessing
 import os
 import queue
+import re
 import shutil
 import signal
 import struct
 import tempfile
+import threading
 import time
 import zlib
 import zipfile
@@ -16,13 +21,13 @@ import zipfile
 from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from pathlib import Path, PureWindowsPath
+from multiprocessing.process import BaseProcess
 from multiprocessing.queues import Queue
 from types import FrameType
 from typing import Any
 from urllib.parse import urlparse
 
 import aiofiles
-import watchfiles
 
 from starlette.applications import Starlette
 from starlette.background import BackgroundTask
@@ -30,31 +35,75 @@ from starlette.datastructures import UploadFile
 from starlette.middleware import Middleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.cors import CORSMiddleware
-from starlette.responses import RedirectResponse, JSONResponse, StreamingResponse, FileResponse
+from starlette.responses import (
+    RedirectResponse,
+    JSONResponse,
+    Response,
+    StreamingResponse,
+    FileResponse,
+)
 from starlette.requests import Request
 from starlette.routing import Route, WebSocketRoute, Mount
 from starlette.staticfiles import StaticFiles
 from starlette.status import (
     HTTP_200_OK,
+    HTTP_206_PARTIAL_CONTENT,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_400_BAD_REQUEST,
     HTTP_404_NOT_FOUND,
+    HTTP_416_RANGE_NOT_SATISFIABLE,
     HTTP_500_INTERNAL_SERVER_ERROR,
+    WS_1008_POLICY_VIOLATION,
 )
-from starlette.templating import Jinja2Templates
 from starlette.types import ASGIApp
 from starlette.websockets import WebSocket, WebSocketDisconnect, WebSocketState
 
-import gallery_dl.version
-import yt_dlp.version
-
-from . import download, output, utils, version
+from . import (
+    broadcast,
+    broker,
+    download,
+    joblogs,
+    jobs,
+    listing,
+    output,
+    resources,
+    rules,
+    subscriptions,
+    utils,
+    version,
+)
+from .dispatcher import JobDispatcher
 
 custom_args = output.args
 cors_allow_origins = custom_args.cors_allow_origins if custom_args else ["*"]
 
 log_file = output.LOG_FILE
+database_file = utils.get_database_path(custom_args.data_dir, log_file)
+job_log_dir = os.path.join(os.path.dirname(log_file), "jobs")
+
+INTERRUPT_GRACE_PERIOD = 10
+USAGE_SAMPLE_INTERVAL = 1
+LOG_PAGE_SIZE = 256 * 1024
+LOG_CURSOR_HEADER = "X-Log-Cursor"
+EVENT_HEARTBEAT = 15
+DOWNLOADS_WATCH_DEBOUNCE = 200
+MAX_CLOSE_REASON = 123
+BYTE_RANGE_PATTERN = re.compile(r"(\d*)-(\d*)", re.ASCII)
+
+config_lock = threading.Lock()
+config_watched = threading.Event()
 
 log = output.initialise_logging(__name__)
 
+progress_formatter = output.CustomFormatter(output.LOG_FORMAT, output.LOG_FORMAT_DATE)
+
+# Forking the server would copy locks held by its other threads, e.g. inside
+# SQLite, so download processes are forked from a single-threaded server.
+process_context = multiprocessing.get_context("spawn" if utils.WINDOWS else "forkserver")
+
+if not utils.WINDOWS:
+    process_context.set_forkserver_preload([download.__name__])
+
 
 class ServerState:
     """Shared server state stored on the app instance."""
@@ -64,8 +113,30 @@ class ServerState:
         self.connections_lock = asyncio.Lock()
         self.shutdown_event = asyncio.Event()
         self.shutdown_in_progress = False
-        self.last_line = ""
-        self.last_position = 0
+        self.broker = broker.get_broker(custom_args.broker, database_file)
+        self.job_logs = joblogs.JobLogIndex(database_file, job_log_dir)
+        self.dispatcher = JobDispatcher(self.run_download, custom_args.max_jobs, self.broker)
+        self.subscriptions = subscriptions.SubscriptionStore(database_file)
+        self.scheduler = subscriptions.SubscriptionScheduler(self.subscriptions, self.dispatcher)
+        self.listings = listing.ListingCache()
+        self.log_broadcaster = broadcast.LogBroadcaster(
+            log_file, self.get_progress, get_job_domain=self.get_job_domain
+        )
+        output.on_rollover(log_file, self.log_broadcaster.read_remaining)
+
+    def run_download(self, job: jobs.Job):
+        """Run a download, after telling the log broadcaster the domain of the job."""
+        self.log_broadcaster.add_job(job.id, resources.get_domain(job.url))
+        return download_task(job, self.job_logs)
+
+    def get_progress(self):
+        """Return the latest download progress of the running jobs."""
+        return {job.id: job.progress for job in self.dispatcher.running.values() if job.progress}
+
+    def get_job_domain(self, job_id: str):
+        """Return the domain of a job run by any server process, or None if it is unknown."""
+        job = self.broker.get(job_id)
+        return resources.get_domain(job.url) if job is not None else None
 
 
 async def redirect(request: Request):
@@ -73,24 +144,53 @@ async def redirect(request: Request):
     return RedirectResponse(url="/gallery-dl")
 
 
+@functools.cache
+def get_templates():
+    """Return the template renderer, loading Jinja on first use."""
+    from starlette.templating import Jinja2Templates
+
+    return Jinja2Templates(directory=utils.resource_path("templates"))
+
+
+@functools.cache
+def get_dependency_versions():
+    """Return the versions of gallery-dl and yt-dlp.
+
+    The yt-dlp version is read from its package metadata if available, since
+    importing yt-dlp takes longer than the rest of the server together.
+    """
+    import gallery_dl.version
+
+    from importlib import metadata
+
+    try:
+        yt_dlp_version = metadata.version("yt-dlp")
+    except metadata.PackageNotFoundError:
+        import yt_dlp.version
+
+        yt_dlp_version = yt_dlp.version.__version__
+
+    return gallery_dl.version.__version__, yt_dlp_version
+
+
 async def homepage(request: Request):
     """Return homepage template response."""
-    return templates.TemplateResponse(
+    gallery_dl_version, yt_dlp_version = await asyncio.to_thread(get_dependency_versions)
+
+    return get_templates().TemplateResponse(
         request,
         "index.html",
         {
             "app_version": version.__version__,
-            "gallery_dl_version": gallery_dl.version.__version__,
-            "yt_dlp_version": yt_dlp.version.__version__,
+            "gallery_dl_version": gallery_dl_version,
+            "yt_dlp_version": yt_dlp_version,
         },
     )
 
 
-async def submit_form(request: Request):
-    """Process form submission data and start download in the background."""
+async def get_request_data(request: Request, keys: tuple[str, ...]):
+    """Return the given keys from a JSON or form request body."""
     content_type = request.headers.get("content-type", "")
-    url = None
-    video_opts = None
 
     if "application/json" in content_type:
         try:
@@ -98,16 +198,34 @@ async def submit_form(request: Request):
         except ValueError:
             payload = {}
 
-        if isinstance(payload, dict):
-            url = payload.get("url")
-            video_opts = payload.get("video-opts")
+        if not isinstance(payload, dict):
+            payload = {}
+
+        values = tuple(payload.get(key) for key in keys)
     else:
         form_data = await request.form()
-
-        keys = ("url", "video-opts")
         values = tuple(form_data.get(key) for key in keys)
 
-        url, video_opts = (None if isinstance(value, UploadFile) else value for value in values)
+    return tuple(None if isinstance(value, UploadFile) else value for value in values)
+
+
+def validate_url(url: Any):
+    """Return the stripped URL if it is a valid web URL."""
+    if not isinstance(url, str) or not url.strip():
+        return None
+
+    url = url.strip()
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        return None
+
+    return url
+
+
+async def submit_form(request: Request):
+    """Process form submission data and add the download to the job queue."""
+    state = request.app.state.server_state
+    url, video_opts = await get_request_data(request, ("url", "video-opts"))
 
     if not isinstance(url, str) or not url.strip():
         log.error("No URL provided.")
@@ -119,10 +237,9 @@ async def submit_form(request: Request):
             },
         )
 
-    url = url.strip()
-    parsed = urlparse(url)
-    if parsed.scheme not in ("http", "https") or not parsed.netloc:
-        log.error("Invalid URL provided: %s", url)
+    valid_url = validate_url(url)
+    if valid_url is None:
+        log.error("Invalid URL provided: %s", url.strip())
         return JSONResponse(
             {
                 "success": False,
@@ -135,17 +252,180 @@ async def submit_form(request: Request):
 
     request_options = {"video-options": video_opts}
 
-    task = BackgroundTask(download_task, url, request_options)
+    job = await state.dispatcher.submit(jobs.Job(valid_url, request_options))
 
-    log.info("Added URL to the download queue: %s", url)
+    log.info("Added URL to the download queue: %s", valid_url)
 
     return JSONResponse(
         {
             "success": True,
-            "url": url,
+            "url": valid_url,
             "options": request_options,
+            "job": job.id,
+        },
+    )
+
+
+async def jobs_list(request: Request):
+    """Return queued, running and recently finished jobs."""
+    state = request.app.state.server_state
+
+    return JSONResponse(
+        {
+            "success": True,
+            "worker": state.dispatcher.worker_id,
+            "draining": state.dispatcher.draining,
+            "jobs": await state.dispatcher.list_jobs(),
+        },
+        status_code=HTTP_200_OK,
+    )
+
+
+async def jobs_drain(request: Request):
+    """Stop dispatching jobs in this server process.
+
+    Running jobs are given until the drain timeout to finish before they are
+    interrupted and returned to the queue. Accepts an optional `timeout` in seconds.
+    """
+    state = request.app.state.server_state
+    (timeout,) = await get_request_data(request, ("timeout",))
+
+    try:
+        drain_timeout = float(timeout) if timeout not in (None, "") else custom_args.drain_timeout
+    except (TypeError, ValueError):
+        return JSONResponse(
+            {
+                "success": False,
+                "error": "Invalid timeout provided.",
+            },
+            status_code=HTTP_400_BAD_REQUEST,
+        )
+
+    state.dispatcher.start_drain(drain_timeout)
+
+    return JSONResponse(
+        {
+            "success": True,
+            "draining": True,
+            "timeout": drain_timeout,
+        },
+        status_code=HTTP_200_OK,
+    )
+
+
+async def jobs_resume(request: Request):
+    """Cancel draining and resume dispatching jobs."""
+    state = request.app.state.server_state
+    state.dispatcher.resume()
+
+    return JSONResponse(
+        {
+            "success": True,
+            "draining": False,
+        },
+        status_code=HTTP_200_OK,
+    )
+
+
+async def jobs_stats(request: Request):
+    """Return resource usage totals per domain."""
+    state = request.app.state.server_state
+
+    return JSONResponse(
+        {
+            "success": True,
+            "domains": await state.dispatcher.domain_stats(),
+        },
+        status_code=HTTP_200_OK,
+    )
+
+
+async def subscriptions_list(request: Request):
+    """Return all subscriptions."""
+    state = request.app.state.server_state
+    entries = await asyncio.to_thread(state.subscriptions.list)
+
+    return JSONResponse(
+        {
+            "success": True,
+            "subscriptions": entries,
+        },
+        status_code=HTTP_200_OK,
+    )
+
+
+async def subscriptions_add(request: Request):
+    """Add or update a subscription that is re-crawled at a fixed interval."""
+    state = request.app.state.server_state
+    keys = ("url", "interval", "video-opts", "abort")
+    url, interval, video_opts, abort = await get_request_data(request, keys)
+
+    valid_url = validate_url(url)
+    if valid_url is None:
+        return JSONResponse(
+            {
+                "success": False,
+                "error": "Invalid URL provided.",
+            },
+            status_code=HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        seconds = subscriptions.parse_interval(interval if interval is not None else "1d")
+        abort_count = int(abort) if abort not in (None, "") else subscriptions.DEFAULT_ABORT
+        if abort_count < 1:
+            raise ValueError("Abort count must be a positive integer")
+    except (TypeError, ValueError) as e:
+        return JSONResponse(
+            {
+                "success": False,
+                "error": str(e),
+            },
+            status_code=HTTP_400_BAD_REQUEST,
+        )
+
+    subscription = await asyncio.to_thread(
+        state.subscriptions.add, valid_url, seconds, video_opts or "none-selected", abort_count
+    )
+
+    state.scheduler.wake()
+
+    log.info("Added subscription with interval of %s seconds: %s", seconds, valid_url)
+
+    return JSONResponse(
+        {
+            "success": True,
+            "subscription": subscription,
         },
-        background=task,
+        status_code=HTTP_200_OK,
+    )
+
+
+async def subscriptions_remove(request: Request):
+    """Remove a subscription by ID."""
+    state = request.app.state.server_state
+    (subscription_id,) = await get_request_data(request, ("id",))
+
+    try:
+        removed = await asyncio.to_thread(state.subscriptions.remove, int(subscription_id))
+    except (TypeError, ValueError):
+        removed = False
+
+    if not removed:
+        return JSONResponse(
+            {
+                "success": False,
+                "error": "Subscription not found",
+            },
+            status_code=HTTP_404_NOT_FOUND,
+        )
+
+    return JSONResponse(
+        {
+            "success": True,
+            "message": "Subscription removed.",
+        },
+        status_code=HTTP_200_OK,
     )
 
 
@@ -157,6 +437,115 @@ def get_default_download_root():
     return utils.normalise_path("./gallery-dl")
 
 
+def get_config_snapshot(check: bool | None = None):
+    """Return a snapshot of the gallery-dl configuration.
+
+    The configuration is only parsed again when its files change. While the
+    config watcher runs, the files are only checked when it sees a change,
+    unless `check` is given. Returns `None` if it could not be loaded.
+    """
+    if check is None:
+        check = not config_watched.is_set()
+
+    with config_lock:
+        try:
+            from . import config
+
+            return config.get_snapshot(check)
+        except (SystemExit, Exception) as e:
+            log.debug("Configuration could not be loaded: %s", e)
+
+    return None
+
+
+def get_config_values(*keys: tuple[str, ...]):
+    """Return the values at each key path of the gallery-dl configuration.
+
+    Values are `None` if the configuration could not be loaded.
+    """
+    from . import config
+
+    snapshot = get_config_snapshot()
+
+    if snapshot is None:
+        return [None] * len(keys)
+
+    return [config.get(list(key), conf=snapshot.conf) for key in keys]
+
+
+async def watch_config(state: ServerState):
+    """Reload the gallery-dl configuration when one of its files changes.
+
+    The directories of all candidate configuration files are watched, so
+    files that are replaced or created are noticed as well.
+    """
+    import watchfiles
+
+    from . import config
+
+    paths = {utils.normalise_path(path) for path in config.get_config_paths()}
+    parents = {os.path.dirname(path) for path in paths}
+    directories = sorted(path for path in parents if os.path.isdir(path))
+
+    if not directories:
+        return
+
+    config_watched.set()
+
+    try:
+        async for _ in watchfiles.awatch(
+            *directories,
+            watch_filter=lambda _, path: path in paths,
+            stop_event=state.shutdown_event,
+            recursive=False,
+        ):
+            await asyncio.to_thread(get_config_snapshot, True)
+    except Exception as e:
+        log.warning(f"Stopped watching configuration files: {type(e).__name__}: {e}")
+    finally:
+        config_watched.clear()
+
+
+async def watch_downloads(state: ServerState):
+    """Drop cached directory listings when files under the download root change.
+
+    The download root is checked again whenever changes are reported, and
+    at least once per second, so it is watched anew when the configuration
+    moves it. Listings are not cached if the root cannot be watched.
+    """
+    import watchfiles
+
+    cache = state.listings
+
+    try:
+        while not state.shutdown_event.is_set():
+            root = str(Path(await asyncio.to_thread(get_download_root)).resolve())
+            cache.watch(root)
+
+            async for changes in watchfiles.awatch(
+                root,
+                stop_event=state.shutdown_event,
+                debounce=DOWNLOADS_WATCH_DEBOUNCE,
+                rust_timeout=1000,
+                yield_on_timeout=True,
+            ):
+                cache.invalidate(path for _, path in changes)
+
+                current_root = Path(await asyncio.to_thread(get_download_root)).resolve()
+                if str(current_root) != root:
+                    break
+    except Exception as e:
+        log.warning(f"Stopped watching the download directory: {type(e).__name__}: {e}")
+    finally:
+        cache.watch(None)
+
+
+def get_server_config(snapshot: Any):
+    """Return the `gallery-dl-server` section of a configuration snapshot."""
+    section = snapshot.conf.get("gallery-dl-server") if snapshot is not None else None
+    return section if isinstance(section, dict) else {}
+
+
 def get_download_root():
     """Resolve the active gallery-dl base directory.
 
@@ -165,23 +554,16 @@ def get_download_root():
     """
     root = get_default_download_root()
 
-    try:
-        from . import config
-
-        config.clear()
-        config.load()
-        base_directory = config.get(["extractor", "base-directory"])
+    base_directory, legacy_base_directory = get_config_values(
+        ("extractor", "base-directory"), ("base-directory",)
+    )
 
-        # Support both current and legacy gallery-dl config styles.
-        if not isinstance(base_directory, str) or not base_directory.strip():
-            base_directory = config.get(["base-directory"])
+    # Support both current and legacy gallery-dl config styles.
+    if not isinstance(base_directory, str) or not base_directory.strip():
+        base_directory = legacy_base_directory
 
-        if isinstance(base_directory, str) and base_directory.strip():
-            root = utils.normalise_path(base_directory)
-    except SystemExit as e:
-        log.debug("Using fallback download root due to config exit: %s", e)
-    except Exception as e:
-        log.debug("Using fallback download root due to config load error: %s", e)
+    if isinstance(base_directory, str) and base_directory.strip():
+        root = utils.normalise_path(base_directory)
 
     os.makedirs(root, exist_ok=True)
     return root
@@ -209,32 +591,18 @@ def resolve_relative_path(relative_path: str):
     return str(root), str(absolute_path), rel_path_str
 
 
-def list_download_entries(directory_path: str, root_path: str):
-    """Return directory entries for downloads browser view."""
-    entries: list[dict[str, Any]] = []
-
-    with os.scandir(directory_path) as scandir_entries:
-        for entry in scandir_entries:
-            try:
-                stat = entry.stat(follow_symlinks=False)
-            except OSError:
-                continue
-
-            entry_path = os.path.relpath(entry.path, root_path)
-
-            entries.append(
-                {
-                    "name": entry.name,
-                    "path": "" if entry_path == "." else entry_path,
-                    "is_dir": entry.is_dir(follow_symlinks=False),
-                    "size": stat.st_size,
-                    "modified": int(stat.st_mtime),
-                }
-            )
-
-    entries.sort(key=lambda item: (not item["is_dir"], item["name"].lower()))
-
-    return entries
+def download_entry_dicts(rel_path: str, entries: list[listing.Entry]):
+    """Return directory entries of a directory relative to the downloads root as dicts."""
+    return [
+        {
+            "name": name,
+            "path": os.path.join(rel_path, name),
+            "is_dir": is_dir,
+            "size": size,
+            "modified": mtime,
+        }
+        for name, is_dir, size, mtime in entries
+    ]
 
 
 def _read_and_compress(file_path: str, arcname: str):
@@ -375,10 +743,55 @@ def remove_directory(path: str):
     shutil.rmtree(path, ignore_errors=True)
 
 
+def render_directory_listing(
+    root_path: str,
+    rel_path: str,
+    entries: list[listing.Entry],
+    next_entry: listing.Entry | None,
+    total: int,
+):
+    """Return the JSON listing of a page of a download directory."""
+    parent_path = ""
+    if rel_path:
+        parent_path = os.path.dirname(rel_path)
+
+    response = JSONResponse(
+        {
+            "success": True,
+            "root": root_path,
+            "path": rel_path,
+            "parent": parent_path,
+            "entries": download_entry_dicts(rel_path, entries),
+            "total": total,
+            "next": None if next_entry is None else listing.encode_cursor(next_entry),
+        }
+    )
+
+    return response.body
+
+
 async def downloads_list(request: Request):
-    """Return filebrowser-style directory listing for downloads."""
+    """Return filebrowser-style directory listing for downloads.
+
+    Entries can be sorted by `name`, `size` or `mtime` in `asc` or `desc`
+    order, filtered by `name` and `type`, and paged with `limit`, continuing
+    at the `next` cursor of the previous page. Listings are cached until the
+    directory changes, and sent with an ETag, so browsers revalidating an
+    unchanged page get `304 Not Modified`.
+    """
     relative_path = request.query_params.get("path", "")
 
+    try:
+        query = listing.ListingQuery.from_params(request.query_params)
+    except ValueError as e:
+        return JSONResponse(
+            {
+                "success": False,
+                "error": str(e),
+            },
+            status_code=HTTP_400_BAD_REQUEST,
+        )
+
     try:
         root_path, absolute_path, rel_path = resolve_relative_path(relative_path)
     except ValueError as e:
@@ -408,19 +821,24 @@ async def downloads_list(request: Request):
             status_code=HTTP_404_NOT_FOUND,
         )
 
-    parent_path = ""
-    if rel_path:
-        parent_path = os.path.dirname(rel_path)
+    cache: listing.ListingCache = request.app.state.server_state.listings
 
-    return JSONResponse(
-        {
-            "success": True,
-            "root": root_path,
-            "path": rel_path,
-            "parent": parent_path,
-            "entries": list_download_entries(absolute_path, root_path),
-        },
+    page = await cache.get_page(
+        absolute_path,
+        query,
+        functools.partial(render_directory_listing, root_path, rel_path),
+    )
+
+    headers = {"ETag": page.etag, "Cache-Control": "no-cache"}
+
+    if listing.etag_matches(request.headers.get("if-none-match"), page.etag):
+        return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(
+        page.body,
         status_code=HTTP_200_OK,
+        media_type="application/json",
+        headers=headers,
     )
 
 
@@ -556,71 +974,428 @@ async def downloads_archive(request: Request):
         )
 
 
-def download_task(url: str, request_options: dict[str, str]):
-    """Initiate download as a subprocess and log the output."""
-    log_queue: Queue[dict[str, Any]] = multiprocessing.Queue()
-    return_status: Queue[int] = multiprocessing.Queue()
+def download_task(job: jobs.Job, job_logs: joblogs.JobLogIndex | None = None):
+    """Initiate download as a subprocess, log the output and return the exit code.
 
-    args = (url, request_options, log_queue, return_status, custom_args)
+    The resource usage of the process is sampled while it runs and stored on
+    the job, and the process is killed if it exceeds any configured limit.
+    Log messages are checked against the configured rules, and also written
+    to the log file of the job if a job log index is given.
+    """
+    snapshot = get_config_snapshot()
+
+    if snapshot is None:
+        log.error("Download failed as the gallery-dl configuration could not be loaded")
+        return 1
+
+    log_reader, log_writer = process_context.Pipe(duplex=False)
+    return_status: Queue[tuple[int, dict[str, float]]] = process_context.Queue()
+
+    # Download processes are started with forkserver or spawn, so the snapshot is pickled for
+    # each of them. The variant is created here once and pickled along with it.
+    download.get_variant(snapshot, job.request_options)
+
+    args = (
+        job.url,
+        job.request_options,
+        snapshot,
+        job.id,
+        log_writer,
+        return_status,
+        custom_args,
+    )
+
+    server_config = get_server_config(snapshot)
+
+    try:
+        limits = resources.ResourceLimits.from_config(server_config.get("limits"))
+    except (ValueError, TypeError) as e:
+        log.warning("Ignoring invalid resource limits: %s", e)
+        limits = resources.ResourceLimits()
+
+    try:
+        rule_set = rules.RuleSet.from_config(server_config.get("rules"))
+    except (ValueError, TypeError) as e:
+        log.error("Ignoring invalid log rules: %s", e)
+        rule_set = rules.RuleSet.from_config(None)
 
-    process = multiprocessing.Process(target=download.run, args=args)
+    rule_counts: dict[rules.Rule, int] = {}
+
+    process = process_context.Process(target=download.run, args=args)
+    start_time = time.monotonic()
     process.start()
+    # Only the download process writes logs, so reading hits EOF when it exits
+    log_writer.close()
 
-    while True:
-        if log_queue.empty() and not process.is_alive():
-            break
-        try:
-            record_dict = log_queue.get(timeout=1)
-            record = output.dict_to_record(record_dict)
+    job_log = job_logs.open(job) if job_logs is not None else None
+
+    logs_open = True
+    interrupt_deadline = None
+    sample: dict[str, float] = {}
+    next_sample = start_time
+
+    try:
+        while True:
+            if not process.is_alive() and not (logs_open and log_reader.poll()):
+                break
+
+            now = time.monotonic()
+
+            if now >= next_sample and process.is_alive():
+                sample = resources.merge_usage(sample, resources.read_proc_usage(process.pid))
+                sample["wall_time"] = now - start_time
+                next_sample = now + USAGE_SAMPLE_INTERVAL
+
+                if limits and job.limit_exceeded is None:
+                    job.limit_exceeded = limits.exceeded(sample)
+
+                    if job.limit_exceeded:
+                        log.warning(
+                            "Killing process as the %s: %s",
+                            job.limit_exceeded,
+                            job.url,
+                            extra={"job_id": job.id},
+                        )
+                        process.kill()
+
+            stopping = job.interrupted or job.retry_delay is not None
+
+            if stopping and interrupt_deadline is None:
+                interrupt_process(process)
+                interrupt_deadline = time.monotonic() + INTERRUPT_GRACE_PERIOD
+            elif interrupt_deadline is not None and time.monotonic() > interrupt_deadline:
+                if process.is_alive():
+                    log.warning(
+                        "Killing process as it did not stop after being interrupted",
+                        extra={"job_id": job.id},
+                    )
+                    process.kill()
+                interrupt_deadline = float("inf")
+
+            if not logs_open:
+                process.join(1)
+                continue
+
+            try:
+                if not log_reader.poll(1):
+                    if job_log is not None:
+                        job_log.flush()
+                    continue
+
+                record = output.decode_record(log_reader.recv())
+            except EOFError:
+                logs_open = False
+                continue
+
+            # Progress is kept in memory, the download process logs the final value
+            if record.name == output.PROGRESS_LOGGER:
+                job.progress = progress_formatter.format(record)
+                continue
 
-            if record.levelno >= output.LOG_LEVEL_MIN:
-                log.handle(record)
+            log.handle(record)
 
-            if "Video should already be available" in record.getMessage():
-                log.warning("Terminating process as video is not available")
-                process.kill()
-        except queue.Empty:
-            continue
+            if job_log is not None:
+                job_log.write(record)
+
+            for rule in rule_set.triggered(record.getMessage(), rule_counts):
+                apply_rule(rule, job, process)
+    except BaseException:
+        # Nothing else drains the logs of the process or enforces its limits
+        process.kill()
+        process.join()
+        log_reader.close()
+        if job_log is not None:
+            job_log.close()
+        raise
 
     process.join()
+    log_reader.close()
 
     try:
-        exit_code = return_status.get(block=False)
+        exit_code, child_usage = return_status.get(block=False)
     except queue.Empty:
-        exit_code = process.exitcode
+        exit_code, child_usage = process.exitcode, {}
+
+    job.usage = resources.merge_usage(sample, child_usage)
+    job.usage["wall_time"] = time.monotonic() - start_time
+
+    if job.interrupted:
+        level, message = logging.WARNING, f"Download was interrupted and will be resumed: {job.url}"
+    elif job.retry_delay is not None:
+        level = logging.WARNING
+        message = f"Download will be retried in {job.retry_delay} seconds: {job.url}"
+    elif exit_code == 0:
+        level, message = logging.INFO, "Download process exited successfully"
+    else:
+        level, message = logging.ERROR, f"Download failed with exit code: {exit_code}"
+
+    log.log(level, message, extra={"job_id": job.id})
 
-    if exit_code == 0:
-        log.info("Download process exited successfully")
+    if job_logs is not None and job_log is not None:
+        job_log.log(level, message)
+        job_logs.add(job_log)
+
+    return exit_code
+
+
+def apply_rule(rule: rules.Rule, job: jobs.Job, process: BaseProcess):
+    """Carry out the action of a log rule that matched a download message."""
+    if rule.action == "tag":
+        job.add_tag(rule.tag)
+        return
+
+    if not process.is_alive() or job.interrupted or job.retry_delay is not None:
+        return
+
+    if rule.action in ("retry", "cooldown") and job.attempts <= rule.retries:
+        job.retry_later(rule.delay, cooldown=rule.action == "cooldown")
+        log.warning(
+            "Stopping process as log rule matched (%s): %s",
+            rule.action,
+            rule.pattern,
+            extra={"job_id": job.id},
+        )
     else:
-        log.error("Download failed with exit code: %s", exit_code)
+        log.warning(
+            "Terminating process as log rule matched: %s", rule.pattern, extra={"job_id": job.id}
+        )
+        process.kill()
 
 
-async def log_route(request: Request):
-    """Return logs page template response."""
+def interrupt_process(process: BaseProcess):
+    """Stop a download process the same way as pressing Ctrl+C.
 
-    async def read_log_file(file_path: str):
-        log_contents = ""
-        try:
-            async with aiofiles.open(file_path, mode="r", encoding="utf-8") as file:
-                async for line in file:
-                    log_contents += line
-        except FileNotFoundError:
-            return "Log file not found."
-        except Exception as e:
-            log.debug(f"Exception: {type(e).__name__}: {e}")
-            return f"An error occurred: {e}"
+    gallery-dl keeps partially downloaded `.part` files when interrupted,
+    so the download continues where it left off when it is resumed.
+    """
+    if process.pid is None or not process.is_alive():
+        return
+
+    if utils.WINDOWS:
+        process.terminate()
+    else:
+        os.kill(process.pid, signal.SIGINT)
+
+
+def read_log_page(path: str, before: int | None = None, size=LOG_PAGE_SIZE):
+    """Read whole lines from the end of the log file, or from before an offset.
+
+    Returns the text, the offsets where it starts and ends, and the cursor of
+    the end. The previous page can be read with `before` set to the start
+    offset, and new lines with the cursor from `/stream/logs`.
+    """
+    with open(path, "rb") as file:
+        stat = os.fstat(file.fileno())
+        end = file.seek(0, os.SEEK_END)
+        if before is not None:
+            end = min(max(before, 0), end)
+
+        start = max(end - size, 0)
+        file.seek(start)
+        data = file.read(end - start)
+
+    if start > 0:
+        newline = data.find(b"\n")
+        if newline != -1:
+            start += newline + 1
+            data = data[newline + 1 :]
+
+    return data.decode("utf-8", errors="replace"), start, end, get_log_cursor(stat, end)
+
+
+def get_log_cursor(stat: os.stat_result, offset: int):
+    """Return a cursor for an offset in the log file it was read from."""
+    return f"{stat.st_ino}:{offset}"
+
+
+def parse_log_cursor(cursor: str, stat: os.stat_result):
+    """Return the offset of a cursor in the current log file.
+
+    Returns None if the log file was rotated or cleared since the cursor was
+    returned. Raises ValueError for an invalid cursor.
+    """
+    inode, separator, offset = cursor.partition(":")
+    if not separator:
+        raise ValueError(cursor)
+
+    inode, offset = int(inode), int(offset)
+    if offset < 0:
+        raise ValueError(cursor)
+
+    if inode != stat.st_ino or offset > stat.st_size:
+        return None
+
+    return offset
+
+
+def parse_byte_range(header: str, size: int):
+    """Return the start and end offsets of a single byte range request.
+
+    Returns None if the header is not a single valid byte range, which is
+    answered with the full content. Raises ValueError if the range is not
+    satisfiable.
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip() != "bytes" or "," in ranges:
+        return None
+
+    match = BYTE_RANGE_PATTERN.fullmatch(ranges.strip())
+    if match is None or match.group() == "-":
+        return None
+
+    first, last = match.groups()
+
+    if not first:
+        start, end = max(size - int(last), 0), size
+    else:
+        start = int(first)
+        end = min(int(last) + 1, size) if last else size
+
+        # A last position before the first makes the range invalid, so it is ignored
+        if last and int(last) < start:
+            return None
 
-        return log_contents if log_contents else "No logs to display."
+    if start >= size or start >= end:
+        raise ValueError(header)
 
-    logs = await read_log_file(log_file)
+    return start, end
 
-    return templates.TemplateResponse(
+
+def find_tail_offset(path: str, lines: int, end: int):
+    """Return the offset where the last lines before an offset of the log file start."""
+    if lines <= 0:
+        return end
+
+    newlines = 0
+    position = end
+
+    with open(path, "rb") as file:
+        while position > 0:
+            size = min(LOG_PAGE_SIZE, position)
+            position -= size
+
+            file.seek(position)
+            chunk = file.read(size)
+            index = len(chunk)
+
+            # The newline ending the last line does not start a line
+            if position + size == end and chunk.endswith(b"\n"):
+                index -= 1
+
+            while (index := chunk.rfind(b"\n", 0, index)) != -1:
+                newlines += 1
+                if newlines == lines:
+                    return position + index + 1
+
+    return 0
+
+
+async def log_route(request: Request):
+    """Return logs page template response with the end of the log file."""
+    log_start = 0
+    log_cursor = ""
+
+    try:
+        logs, log_start, _, log_cursor = await asyncio.to_thread(read_log_page, log_file)
+    except FileNotFoundError:
+        logs = "Log file not found."
+    except Exception as e:
+        log.debug(f"Exception: {type(e).__name__}: {e}")
+        logs = f"An error occurred: {e}"
+    else:
+        if not logs:
+            logs = "No logs to display."
+
+    return get_templates().TemplateResponse(
         request,
         "logs.html",
         {
             "app_version": version.__version__,
             "logs": logs,
+            "log_start": log_start,
+            "log_cursor": log_cursor,
+        },
+    )
+
+
+async def log_page(request: Request):
+    """Return a page of the log file as JSON.
+
+    Without the `before` query parameter, the page ends at the end of the log
+    file. Older pages are read by passing the `start` offset of the last page.
+    """
+    before = request.query_params.get("before")
+
+    try:
+        before = int(before) if before not in (None, "") else None
+    except ValueError:
+        return JSONResponse(
+            {
+                "success": False,
+                "error": "Invalid offset provided.",
+            },
+            status_code=HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        logs, start, end, cursor = await asyncio.to_thread(read_log_page, log_file, before)
+    except FileNotFoundError:
+        logs, start, end, cursor = "", 0, 0, ""
+
+    return JSONResponse(
+        {
+            "success": True,
+            "logs": logs,
+            "start": start,
+            "end": end,
+            "cursor": cursor,
         },
+        status_code=HTTP_200_OK,
+    )
+
+
+async def log_search(request: Request):
+    """Search the log files of finished downloads.
+
+    Accepts `job`, `domain`, the minimum `level`, the text `q` to look for,
+    `since` and `until` as Unix times, and the maximum number of lines `limit`.
+    """
+    state = request.app.state.server_state
+    params = request.query_params
+
+    try:
+        min_level = joblogs.parse_level(params["level"]) if params.get("level") else 0
+        since = float(params["since"]) if params.get("since") else None
+        until = float(params["until"]) if params.get("until") else None
+        limit = int(params.get("limit") or joblogs.SEARCH_LIMIT)
+        if limit < 1:
+            raise ValueError(limit)
+    except ValueError:
+        return JSONResponse(
+            {
+                "success": False,
+                "error": "Invalid search parameters provided.",
+            },
+            status_code=HTTP_400_BAD_REQUEST,
+        )
+
+    results = await asyncio.to_thread(
+        state.job_logs.search,
+        params.get("job"),
+        params.get("domain"),
+        min_level,
+        params.get("q", ""),
+        since,
+        until,
+        limit,
+    )
+
+    return JSONResponse(
+        {
+            "success": True,
+            "jobs": results,
+        },
+        status_code=HTTP_200_OK,
     )
 
 
@@ -666,7 +1441,28 @@ async def clear_logs(request: Request):
 
 
 async def log_stream(request: Request):
-    """Stream the full contents of the log file."""
+    """Stream the contents of the log file.
+
+    Only part of the log file is sent with one of these query parameters:
+
+    - `offset`: from a byte offset to the end
+    - `cursor`: from the cursor of a previous response to the end, or from the
+      start if the log file was rotated or cleared since (`X-Log-Reset: true`)
+    - `tail`: the last N lines
+
+    A single byte range in a `Range` header is also supported. Partial content
+    is sent as stored in the log file, and the `X-Log-Cursor` header holds the
+    cursor to continue from. Otherwise, the whole log file is sent, with the
+    compressed segments of the rotated log first if `rotated=true`.
+    """
+    include_rotated = request.query_params.get("rotated", "false").lower() == "true"
+    offset = request.query_params.get("offset")
+    cursor = request.query_params.get("cursor")
+    tail = request.query_params.get("tail")
+    byte_range = request.headers.get("range")
+
+    def to_platform(chunk: str):
+        return chunk.replace("\n", "\r\n") if utils.WINDOWS else chunk
 
     async def file_iterator(file_path: str):
         try:
@@ -675,61 +1471,214 @@ async def log_stream(request: Request):
                     chunk = await file.read(64 * 1024)
                     if not chunk:
                         break
-                    if utils.WINDOWS:
-                        yield chunk.replace("\n", "\r\n")
-                    else:
-                        yield chunk
+                    yield to_platform(chunk)
         except FileNotFoundError:
             yield "Log file not found."
         except Exception as e:
             log.debug(f"Exception: {type(e).__name__}: {e}")
             yield f"An error occurred: {type(e).__name__}: {e}"
 
-    return StreamingResponse(file_iterator(log_file), media_type="text/plain")
+    async def segment_iterator(file_path: str):
+        import gzip
+
+        try:
+            with gzip.open(file_path, "rt", encoding="utf-8", errors="replace") as file:
+                while chunk := await asyncio.to_thread(file.read, 64 * 1024):
+                    yield to_platform(chunk)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log.debug(f"Exception: {type(e).__name__}: {e}")
+
+    async def log_iterator():
+        if include_rotated:
+            for segment in await asyncio.to_thread(output.get_log_segments, log_file):
+                async for chunk in segment_iterator(segment):
+                    yield chunk
+
+        async for chunk in file_iterator(log_file):
+            yield chunk
+
+    async def range_iterator(file_path: str, start: int, end: int):
+        async with aiofiles.open(file_path, mode="rb") as file:
+            await file.seek(start)
+            remaining = end - start
+
+            while remaining > 0:
+                chunk = await file.read(min(64 * 1024, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    if offset is None and cursor is None and tail is None and byte_range is None:
+        return StreamingResponse(
+            log_iterator(),
+            media_type="text/plain",
+            headers={"Accept-Ranges": "bytes"},
+        )
+
+    try:
+        stat = await asyncio.to_thread(os.stat, log_file)
+    except FileNotFoundError:
+        return Response("", media_type="text/plain")
+
+    size = stat.st_size
+    start, end = 0, size
+    status_code = HTTP_200_OK
+    headers = {"Accept-Ranges": "bytes"}
+
+    try:
+        if cursor is not None:
+            cursor_offset = parse_log_cursor(cursor, stat)
+            if cursor_offset is None:
+                headers["X-Log-Reset"] = "true"
+            else:
+                start = cursor_offset
+        elif offset is not None:
+            start = min(int(offset), size)
+            if start < 0:
+                raise ValueError(offset)
+        elif tail is not None:
+            start = await asyncio.to_thread(find_tail_offset, log_file, int(tail), size)
+    except ValueError:
+        return JSONResponse(
+            {
+                "success": False,
+                "error": "Invalid offset, cursor or tail provided.",
+            },
+            status_code=HTTP_400_BAD_REQUEST,
+        )
+
+    if byte_range is not None and offset is None and cursor is None and tail is None:
+        try:
+            requested_range = parse_byte_range(byte_range, size)
+        except ValueError:
+            return Response(
+                status_code=HTTP_416_RANGE_NOT_SATISFIABLE,
+                headers={"Content-Range": f"bytes */{size}"},
+            )
+
+        if requested_range is not None:
+            start, end = requested_range
+            status_code = HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+
+    headers["Content-Length"] = str(end - start)
+    headers[LOG_CURSOR_HEADER] = get_log_cursor(stat, end)
+
+    return StreamingResponse(
+        range_iterator(log_file, start, end),
+        status_code=status_code,
+        media_type="text/plain",
+        headers=headers,
+    )
+
+
+async def log_events(request: Request):
+    """Stream new log lines and download progress as server-sent events.
+
+    `log` events carry new lines, one per data field, with the id of the last
+    line. A client that reconnects with `Last-Event-ID` only gets the lines it
+    missed, as long as they are still buffered, and a `resync` event otherwise
+    to load the logs again. `progress` events carry the job id and progress
+    line as JSON, with a null line once the job stops. Without an event id,
+    up to `backlog` of the most recent lines are sent first.
+
+    The `level`, `job`, `domain` and `q` query parameters limit the events
+    to the matching lines and progress.
+    """
+    broadcaster: broadcast.LogBroadcaster = request.app.state.server_state.log_broadcaster
+
+    try:
+        log_filter = broadcast.LogFilter.from_params(request.query_params)
+    except ValueError as e:
+        return JSONResponse(
+            {"success": False, "error": str(e)},
+            status_code=HTTP_400_BAD_REQUEST,
+        )
+
+    last_event_id = request.headers.get("last-event-id")
+    seq = broadcaster.parse_event_id(last_event_id) if last_event_id else None
+    resync = last_event_id is not None and seq is None
+
+    if seq is None:
+        try:
+            backlog = int(request.query_params.get("backlog", 0))
+        except ValueError:
+            backlog = 0
+
+        seq = broadcaster.backlog_seq(backlog, log_filter)
+
+    async def event_iterator(seq: int):
+        if resync:
+            yield "event: resync\ndata: \n\n"
+
+        events = broadcaster.events(
+            seq, skip=True, heartbeat=EVENT_HEARTBEAT, log_filter=log_filter
+        )
+
+        async for kind, key, value in events:
+            if kind == "lines":
+                data = "".join(f"data: {line}\n" for line in value)
+                yield f"event: log\nid: {broadcaster.event_id(key)}\n{data}\n"
+            elif kind == "progress":
+                data = json.dumps({"job": key, "line": value})
+                yield f"event: progress\ndata: {data}\n\n"
+            elif kind == "skipped":
+                yield f"event: resync\ndata: {key}\n\n"
+            else:
+                # Keeps proxies from closing idle connections
+                yield ": heartbeat\n\n"
+
+    return StreamingResponse(
+        event_iterator(seq),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 async def log_update(websocket: WebSocket):
-    """Stream log file updates over WebSocket connection."""
+    """Stream new log lines and download progress over WebSocket connection.
+
+    With the `backlog` query parameter, up to that many of the most recent
+    lines are sent first. A client that falls too far behind is disconnected
+    with a close code asking it to load the logs again, or with `skip=true`,
+    skips ahead to the lines still buffered. The `level`, `job`, `domain`
+    and `q` query parameters limit the messages to the matching lines and
+    progress.
+    """
     state = websocket.app.state.server_state
+
+    try:
+        backlog = int(websocket.query_params.get("backlog", 0))
+    except ValueError:
+        backlog = 0
+
+    skip = websocket.query_params.get("skip", "false").lower() == "true"
+
     await websocket.accept()
     log.debug(f"Accepted WebSocket connection: {websocket}")
 
+    try:
+        log_filter = broadcast.LogFilter.from_params(websocket.query_params)
+    except ValueError as e:
+        log.debug(f"Closing WebSocket connection: {e}")
+        # Close reasons are limited to 123 bytes
+        reason = str(e).encode()[:MAX_CLOSE_REASON].decode("utf-8", errors="ignore")
+        await websocket.close(code=WS_1008_POLICY_VIOLATION, reason=reason)
+        return
+
     async with state.connections_lock:
         state.active_connections.add(websocket)
         log.debug("WebSocket added to active connections")
-    try:
-        async with aiofiles.open(log_file, mode="r", encoding="utf-8") as file:
-            await file.seek(0, os.SEEK_END)
 
-            async for changes in watchfiles.awatch(
-                log_file,
-                stop_event=state.shutdown_event,
-                rust_timeout=100,
-                yield_on_timeout=True,
-            ):
-                new_content = ""
-                do_update_state = False
-
-                previous_line, position = await asyncio.to_thread(
-                    output.read_previous_line, log_file, state.last_position
-                )
-                if "B/s" in previous_line and previous_line != state.last_line:
-                    new_content = previous_line
-                    do_update_state = True
-
-                new_lines = await file.read()
-                if new_lines.strip():
-                    new_content += new_lines
-
-                if new_content.strip():
-                    await websocket.send_text(new_content)
-
-                    if do_update_state:
-                        state.last_line = previous_line
-                        state.last_position = position
-                    else:
-                        state.last_line = ""
-                        state.last_position = 0
+    try:
+        async for message in state.log_broadcaster.follow(backlog, skip, log_filter):
+            await websocket.send_text(message)
+    except broadcast.ClientLagged as e:
+        log.debug(f"Closing WebSocket connection: {e}")
+        await websocket.close(code=broadcast.RESYNC_CLOSE_CODE, reason="resync")
     except asyncio.CancelledError as e:
         log.debug(f"Exception: {type(e).__name__}")
     except WebSocketDisconnect as e:
@@ -752,19 +1701,43 @@ async def lifespan(app: Starlette):
     uvicorn_log.info(f"Starting {type(app).__name__} application.")
 
     await shutdown_override(app)
+
+    if await asyncio.to_thread(get_config_snapshot) is None:
+        log.error("Failed to load gallery-dl configuration, downloads will fail until it is fixed")
+
+    state = app.state.server_state
+    await state.dispatcher.start()
+    state.scheduler.start()
+    config_watcher = asyncio.create_task(watch_config(state))
+    downloads_watcher = asyncio.create_task(watch_downloads(state))
+    log_broadcaster = asyncio.create_task(state.log_broadcaster.run(state.shutdown_event))
     try:
         yield
     except asyncio.CancelledError:
         pass
     finally:
+        for task in (config_watcher, downloads_watcher, log_broadcaster):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        await state.scheduler.stop()
+        await state.dispatcher.stop()
+
         if utils.CONTAINER and os.path.isdir("/config"):
             if os.path.isfile(log_file) and os.path.getsize(log_file) > 0:
                 dst_dir = "/config/logs"
 
                 os.makedirs(dst_dir, exist_ok=True)
 
-                dst = os.path.join(dst_dir, "app_" + time.strftime("%Y-%m-%d_%H-%M-%S") + ".log")
-                shutil.copy2(log_file, dst)
+                dst = os.path.join(dst_dir, "app_" + time.strftime("%Y-%m-%d_%H-%M-%S") + ".log.gz")
+                output.compress_file(log_file, dst)
+
+                archives = sorted(Path(dst_dir).glob("app_*.log.gz"))
+                for archive in archives[: -max(custom_args.log_backups, 1)]:
+                    archive.unlink(missing_ok=True)
 
 
 async def shutdown_override(app: Starlette):
@@ -776,6 +1749,7 @@ async def shutdown_override(app: Starlette):
         """Call shutdown handler and then original handler as a callback."""
         state = app.state.server_state
         if state.shutdown_in_progress:
+            state.dispatcher.interrupt_all()
             return
 
         state.shutdown_in_progress = True
@@ -796,8 +1770,13 @@ async def shutdown_override(app: Starlette):
 
 
 async def shutdown_handler(app: Starlette):
-    """Initiate server shutdown."""
+    """Drain the job queue and initiate server shutdown.
+
+    A second signal while draining interrupts running downloads immediately.
+    """
     state = app.state.server_state
+    await state.dispatcher.drain(custom_args.drain_timeout)
+
     if not state.shutdown_event.is_set():
         state.shutdown_event.set()
         log.debug("Set shutdown event")
@@ -841,19 +1820,27 @@ class CSPMiddleware(BaseHTTPMiddleware):
         return response
 
 
-templates = Jinja2Templates(directory=utils.resource_path("templates"))
-
 routes = [
     Route("/", endpoint=redirect, methods=["GET"]),
     Route("/gallery-dl", endpoint=homepage, methods=["GET"]),
     Route("/gallery-dl/q", endpoint=submit_form, methods=["POST"]),
+    Route("/gallery-dl/jobs", endpoint=jobs_list, methods=["GET"]),
+    Route("/gallery-dl/jobs/drain", endpoint=jobs_drain, methods=["POST"]),
+    Route("/gallery-dl/jobs/resume", endpoint=jobs_resume, methods=["POST"]),
+    Route("/gallery-dl/jobs/stats", endpoint=jobs_stats, methods=["GET"]),
+    Route("/gallery-dl/subscriptions", endpoint=subscriptions_list, methods=["GET"]),
+    Route("/gallery-dl/subscriptions", endpoint=subscriptions_add, methods=["POST"]),
+    Route("/gallery-dl/subscriptions/remove", endpoint=subscriptions_remove, methods=["POST"]),
     Route("/gallery-dl/files", endpoint=downloads_list, methods=["GET"]),
     Route("/gallery-dl/files/content", endpoint=downloads_content, methods=["GET"]),
     Route("/gallery-dl/files/download", endpoint=downloads_file, methods=["GET"]),
     Route("/gallery-dl/files/archive", endpoint=downloads_archive, methods=["GET"]),
     Route("/gallery-dl/logs", endpoint=log_route, methods=["GET"]),
+    Route("/gallery-dl/logs/page", endpoint=log_page, methods=["GET"]),
+    Route("/gallery-dl/logs/search", endpoint=log_search, methods=["GET"]),
     Route("/gallery-dl/logs/clear", endpoint=clear_logs, methods=["POST"]),
     Route("/stream/logs", endpoint=log_stream, methods=["GET"]),
+    Route("/stream/logs/events", endpoint=log_events, methods=["GET"]),
     WebSocketRoute("/ws/logs", endpoint=log_update),
     Mount("/static", app=StaticFiles(directory=utils.resource_path("static")), name="static"),
 ]
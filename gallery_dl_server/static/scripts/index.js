@@ -100,6 +100,9 @@ const state = {
   parent: "",
   root: "",
   entries: [],
+  next: null,
+  total: 0,
+  filter: "",
   view: localStorage.getItem("filesView") || "grid",
   sort: localStorage.getItem("filesSort") || "name-asc",
 };
@@ -112,6 +115,7 @@ const refreshBtn = document.getElementById("refresh-downloads");
 const viewGridBtn = document.getElementById("view-grid");
 const viewListBtn = document.getElementById("view-list");
 const sortSelect = document.getElementById("sort-select");
+const filterInput = document.getElementById("filter-input");
 const form = document.getElementById("form");
 const videoOpts = form.querySelector("select[name='video-opts']");
 const urlInput = form.querySelector("input[name='url']");
@@ -151,7 +155,17 @@ viewListBtn.onclick = () => {
 sortSelect.onchange = () => {
   state.sort = sortSelect.value;
   localStorage.setItem("filesSort", state.sort);
-  renderView();
+  loadDownloads(state.path);
+};
+
+let filterTimer = null;
+
+filterInput.oninput = () => {
+  clearTimeout(filterTimer);
+  filterTimer = setTimeout(() => {
+    state.filter = filterInput.value.trim();
+    loadDownloads(state.path);
+  }, 250);
 };
 
 // Breadcrumbs
@@ -179,24 +193,9 @@ function renderBreadcrumbs() {
   });
 }
 
-// Sort
-function sortedEntries() {
-  const [key, dir] = state.sort.split("-");
-  const mult = dir === "asc" ? 1 : -1;
-  const copy = state.entries.slice();
-  copy.sort((a, b) => {
-    if (a.is_dir !== b.is_dir) return a.is_dir ? -1 : 1;
-    if (key === "name") return a.name.localeCompare(b.name, undefined, { numeric: true }) * mult;
-    if (key === "modified") return (a.modified - b.modified) * mult;
-    if (key === "size") return (a.size - b.size) * mult;
-    return 0;
-  });
-  return copy;
-}
-
-// Media list for viewer (files only, in sorted order)
+// Media list for viewer (loaded files only, in sorted order)
 function mediaList() {
-  return sortedEntries().filter((e) => !e.is_dir && ["image", "video", "audio"].includes(mediaKind(e.name)));
+  return state.entries.filter((e) => !e.is_dir && ["image", "video", "audio"].includes(mediaKind(e.name)));
 }
 
 // Render main view
@@ -208,20 +207,33 @@ function renderView() {
     return;
   }
 
-  const entries = sortedEntries();
-
-  if (!entries.length) {
-    viewEl.innerHTML = `<div class="state-msg"><i class="bi bi-folder"></i>Empty folder.</div>`;
+  if (!state.entries.length) {
+    const message = state.filter ? "No matching files." : "Empty folder.";
+    viewEl.innerHTML = `<div class="state-msg"><i class="bi bi-folder"></i>${message}</div>`;
     return;
   }
 
   if (state.view === "grid") {
-    renderGrid(entries);
+    renderGrid(state.entries);
   } else {
-    renderList(entries);
+    renderList(state.entries);
   }
 }
 
+// Add the entries of a further page without rendering the loaded ones again
+function appendView(entries) {
+  const html = state.view === "grid" ? gridCards(entries) : listRows(entries);
+  document.getElementById("load-more")?.remove();
+  viewEl.insertAdjacentHTML("beforeend", html.join("") + loadMoreButton());
+  bindEntryClicks();
+}
+
+function loadMoreButton() {
+  if (!state.next) return "";
+  const count = state.filter ? "" : ` (${state.entries.length} of ${state.total})`;
+  return `<button id="load-more" class="btn-ghost load-more" type="button">Load more${count}</button>`;
+}
+
 function renderGrid(entries) {
   const cards = [];
 
@@ -237,6 +249,14 @@ function renderGrid(entries) {
     `);
   }
 
+  cards.push(...gridCards(entries));
+  viewEl.innerHTML = cards.join("") + loadMoreButton();
+  bindEntryClicks();
+}
+
+function gridCards(entries) {
+  const cards = [];
+
   for (const entry of entries) {
     const name = escapeHtml(entry.name);
     const path = escapeHtml(entry.path);
@@ -278,8 +298,7 @@ function renderGrid(entries) {
     `);
   }
 
-  viewEl.innerHTML = cards.join("");
-  bindEntryClicks();
+  return cards;
 }
 
 function renderList(entries) {
@@ -308,6 +327,14 @@ function renderList(entries) {
     `);
   }
 
+  rows.push(...listRows(entries));
+  viewEl.innerHTML = rows.join("") + loadMoreButton();
+  bindEntryClicks();
+}
+
+function listRows(entries) {
+  const rows = [];
+
   for (const entry of entries) {
     const name = escapeHtml(entry.name);
     const path = escapeHtml(entry.path);
@@ -344,8 +371,7 @@ function renderList(entries) {
     `);
   }
 
-  viewEl.innerHTML = rows.join("");
-  bindEntryClicks();
+  return rows;
 }
 
 function bindEntryClicks() {
@@ -361,23 +387,64 @@ function bindEntryClicks() {
       openViewer(el.getAttribute("data-path"));
     };
   });
+
+  const loadMoreBtn = document.getElementById("load-more");
+  if (loadMoreBtn) {
+    loadMoreBtn.onclick = loadMore;
+    loadMoreObserver.observe(loadMoreBtn);
+  }
+}
+
+// Loads the next page once the load more button scrolls into view
+const loadMoreObserver = new IntersectionObserver(
+  (observed) => {
+    if (observed.some((item) => item.isIntersecting)) loadMore();
+  },
+  { rootMargin: "400px" }
+);
+
+function listingUrl(path, cursor = null) {
+  const [key, dir] = state.sort.split("-");
+  const params = new URLSearchParams({
+    limit: String(PAGE_SIZE),
+    sort: key === "modified" ? "mtime" : key,
+    order: dir,
+  });
+  if (state.filter) params.set("name", state.filter);
+  if (cursor) params.set("cursor", cursor);
+  return `/gallery-dl/files?path=${pathToParam(path)}&${params}`;
+}
+
+async function fetchListing(url) {
+  // Revalidates the cached page, which is reused if it did not change
+  const response = await fetch(url, {
+    method: "GET",
+    cache: "no-cache",
+  });
+  if (!response.ok) throw new Error(`HTTP ${response.status}`);
+  const data = await response.json();
+  if (!data.success) throw new Error(data.error || "Failed to load");
+  return data;
 }
 
+const PAGE_SIZE = 200;
+let listingRequest = null;
+let loadingMore = false;
+
 async function loadDownloads(path = "") {
   viewEl.innerHTML = `<div class="state-msg"><i class="bi bi-hourglass-split"></i>Loading...</div>`;
+  const url = listingUrl(path);
+  listingRequest = url;
   try {
-    const response = await fetch(`/gallery-dl/files?path=${pathToParam(path)}`, {
-      method: "GET",
-      headers: { "Cache-Control": "no-cache" },
-    });
-    if (!response.ok) throw new Error(`HTTP ${response.status}`);
-    const data = await response.json();
-    if (!data.success) throw new Error(data.error || "Failed to load");
+    const data = await fetchListing(url);
+    if (listingRequest !== url) return;
 
     state.path = data.path || "";
     state.parent = data.parent || "";
     state.root = data.root || "";
     state.entries = data.entries || [];
+    state.next = data.next || null;
+    state.total = data.total || 0;
 
     downloadsRoot.textContent = data.root ? `· ${data.root}` : "";
     renderBreadcrumbs();
@@ -387,6 +454,35 @@ async function loadDownloads(path = "") {
   }
 }
 
+async function loadMore() {
+  if (!state.next || loadingMore) return;
+
+  const url = listingUrl(state.path, state.next);
+  const request = listingRequest;
+  loadingMore = true;
+  try {
+    const data = await fetchListing(url);
+    // Drop the page if another folder, order or filter was loaded meanwhile
+    if (listingRequest !== request) return;
+
+    const entries = data.entries || [];
+    state.entries.push(...entries);
+    state.next = data.next || null;
+    state.total = data.total || 0;
+    appendView(entries);
+  } catch (error) {
+    console.error(error);
+    // Retry on click only, so a failing page is not requested again while in view
+    const loadMoreBtn = document.getElementById("load-more");
+    if (loadMoreBtn) {
+      loadMoreObserver.unobserve(loadMoreBtn);
+      loadMoreBtn.textContent = "Failed to load, retry";
+    }
+  } finally {
+    loadingMore = false;
+  }
+}
+
 refreshBtn.onclick = () => loadDownloads(state.path);
 
 // Viewer
@@ -603,7 +699,7 @@ let isPageAlive = true;
 
 async function fetchLogs() {
   try {
-    const response = await fetch("/stream/logs", {
+    const response = await fetch("/gallery-dl/logs/page", {
       method: "GET",
       headers: {
         "Cache-Control": "no-cache, no-store, must-revalidate",
@@ -612,7 +708,7 @@ async function fetchLogs() {
       },
     });
     if (!response.ok) throw new Error(`HTTP ${response.status}`);
-    const logs = await response.text();
+    const { logs } = await response.json();
     if (box.textContent !== logs) {
       box.textContent = logs;
       box.scrollTop = box.scrollHeight;
@@ -666,10 +762,13 @@ function connectWebSocket(allowReconnect = true) {
 
   ws.onerror = (event) => console.error("WebSocket error:", event);
 
-  ws.onclose = () => {
+  ws.onclose = (event) => {
     if (isConnected) {
       isConnected = false;
-      if (isPageAlive && allowReconnect) {
+      // The server dropped lines this page did not receive, so load the logs again
+      if (event.code === 4000) {
+        fetchLogs();
+      } else if (isPageAlive && allowReconnect) {
         setTimeout(() => connectWebSocket(allowReconnect), 2000);
       }
     }
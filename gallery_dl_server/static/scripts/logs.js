@@ -1,9 +1,77 @@
 const logsContainer = document.getElementById("container-logs");
 const clearLogsButton = document.getElementById("clear-logs");
 const refreshLogsButton = document.getElementById("refresh-logs");
+const olderLogsButton = document.getElementById("older-logs");
+
+let logsStart = parseInt(logsContainer.dataset.start) || 0;
+let logsCursor = logsContainer.dataset.cursor || "";
 
 logsContainer.scrollTop = logsContainer.scrollHeight;
 
+async function fetchLogPage(before) {
+  const url = before === undefined ? "/gallery-dl/logs/page" : `/gallery-dl/logs/page?before=${before}`;
+
+  const response = await fetch(url, {
+    method: "GET",
+    headers: {
+      "Cache-Control": "no-cache, no-store, must-revalidate",
+      "Pragma": "no-cache",
+      "Expires": "0"
+    }
+  });
+
+  if (!response.ok) {
+    throw new Error(`Response status: ${response.status}`);
+  }
+
+  return await response.json();
+}
+
+async function fetchNewLogs() {
+  const response = await fetch(`/stream/logs?cursor=${encodeURIComponent(logsCursor)}`, {
+    method: "GET",
+    headers: {
+      "Cache-Control": "no-cache, no-store, must-revalidate",
+      "Pragma": "no-cache",
+      "Expires": "0"
+    }
+  });
+
+  if (!response.ok) {
+    throw new Error(`Response status: ${response.status}`);
+  }
+
+  return {
+    logs: await response.text(),
+    cursor: response.headers.get("X-Log-Cursor") || "",
+    reset: response.headers.get("X-Log-Reset") === "true"
+  };
+}
+
+function setLogsStart(start) {
+  logsStart = start;
+  olderLogsButton.hidden = logsStart === 0;
+}
+
+olderLogsButton.onclick = async () => {
+  olderLogsButton.disabled = true;
+
+  try {
+    const page = await fetchLogPage(logsStart);
+    const scrollBottom = logsContainer.scrollHeight - logsContainer.scrollTop;
+
+    logsContainer.textContent = page.logs + logsContainer.textContent;
+    logsContainer.scrollTop = logsContainer.scrollHeight - scrollBottom;
+    setLogsStart(page.start);
+  }
+  catch (error) {
+    console.error(error);
+  }
+  finally {
+    olderLogsButton.disabled = false;
+  }
+};
+
 clearLogsButton.onclick = async () => {
   clearLogsButton.disabled = true;
 
@@ -20,6 +88,8 @@ clearLogsButton.onclick = async () => {
     console.log(data);
 
     logsContainer.textContent = "Cleared logs.";
+    setLogsStart(0);
+    logsCursor = "";
   }
   catch (error) {
     console.error(error);
@@ -33,23 +103,21 @@ refreshLogsButton.onclick = async () => {
   refreshLogsButton.disabled = true;
 
   try {
-    const response = await fetch("/stream/logs", {
-      method: "GET",
-      headers: {
-        "Cache-Control": "no-cache, no-store, must-revalidate",
-        "Pragma": "no-cache",
-        "Expires": "0"
-      }
-    });
+    // Only new lines are fetched, unless nothing was shown or the log was replaced
+    const update = logsCursor && !logsCursor.endsWith(":0") ? await fetchNewLogs() : null;
 
-    if (!response.ok) {
-      throw new Error(`Response status: ${response.status}`);
-    }
+    if (!update || update.reset) {
+      const page = await fetchLogPage();
 
-    const logs = await response.text();
-    console.log(response);
+      logsContainer.textContent = page.logs.length ? page.logs : "No logs to display.";
+      setLogsStart(page.start);
+      logsCursor = page.cursor;
+    }
+    else {
+      logsContainer.textContent += update.logs;
+      logsCursor = update.cursor;
+    }
 
-    logsContainer.textContent = logs.length ? logs : "No logs to display.";
     logsContainer.scrollTop = logsContainer.scrollHeight;
   }
   catch (error) {
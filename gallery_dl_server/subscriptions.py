@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import re
+import sqlite3
+import time
+
+from typing import Any
+
+from . import database, jobs, output
+from .dispatcher import JobDispatcher
+
+log = output.initialise_logging(__name__)
+
+SCHEDULER_INTERVAL = 30
+DEFAULT_ABORT = 1
+
+INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+INTERVAL_PATTERN = re.compile(r"^\s*(\d+)\s*([smhdw]?)\s*$", re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscriptions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL UNIQUE,
+    interval INTEGER NOT NULL,
+    video_options TEXT NOT NULL DEFAULT 'none-selected',
+    abort INTEGER NOT NULL DEFAULT 1,
+    last_run REAL,
+    next_run REAL NOT NULL
+);
+"""
+
+
+def parse_interval(value: str | int):
+    """Parse an interval such as `3600`, `30m`, `12h` or `1d` into seconds."""
+    if isinstance(value, int):
+        seconds = value
+    else:
+        match = INTERVAL_PATTERN.match(value)
+        if not match:
+            raise ValueError(f"Invalid interval: {value}")
+
+        number, unit = match.groups()
+        seconds = int(number) * INTERVAL_UNITS[unit.lower() or "s"]
+
+    if seconds < 60:
+        raise ValueError("Interval must be at least 60 seconds")
+
+    return seconds
+
+
+def request_options(subscription: dict[str, Any]):
+    """Return download request options for an incremental subscription update.
+
+    The `skip` option uses gallery-dl's `abort:N` semantics, which stops the
+    extractor after N consecutive files that already exist or are archived.
+    """
+    return {
+        "video-options": subscription["video_options"],
+        "skip": f"abort:{subscription['abort']}",
+    }
+
+
+class SubscriptionStore(database.Database):
+    """Persist subscriptions in an SQLite database."""
+
+    schema = SCHEMA
+
+    def add(self, url: str, interval: int, video_options: str, abort: int = DEFAULT_ABORT):
+        """Add a subscription or update the existing one for the URL."""
+        with self.connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO subscriptions (url, interval, video_options, abort, next_run)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    interval = excluded.interval,
+                    video_options = excluded.video_options,
+                    abort = excluded.abort
+                """,
+                (url, interval, video_options, abort, time.time()),
+            )
+            row = conn.execute("SELECT * FROM subscriptions WHERE url = ?", (url,)).fetchone()
+
+        return dict(row)
+
+    def list(self):
+        """Return all subscriptions."""
+        with self.connection() as conn:
+            rows = conn.execute("SELECT * FROM subscriptions ORDER BY id").fetchall()
+
+        return [dict(row) for row in rows]
+
+    def remove(self, subscription_id: int):
+        """Remove a subscription and return whether it existed."""
+        with self.connection() as conn:
+            cursor = conn.execute("DELETE FROM subscriptions WHERE id = ?", (subscription_id,))
+
+        return cursor.rowcount > 0
+
+    def claim_due(self, now: float):
+        """Return subscriptions that are due and schedule their next run."""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT * FROM subscriptions WHERE next_run <= ? ORDER BY next_run", (now,)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE subscriptions SET last_run = ?, next_run = ? + interval WHERE id = ?",
+                [(now, now, row["id"]) for row in rows],
+            )
+
+        return [dict(row) for row in rows]
+
+
+class SubscriptionScheduler:
+    """Enqueue due subscriptions as low-priority incremental jobs."""
+
+    def __init__(
+        self,
+        store: SubscriptionStore,
+        dispatcher: JobDispatcher,
+        interval: float = SCHEDULER_INTERVAL,
+    ):
+        self.store = store
+        self.dispatcher = dispatcher
+        self.interval = interval
+        self.wakeup = asyncio.Event()
+        self.task: asyncio.Task[None] | None = None
+
+    def start(self):
+        """Start the scheduler loop."""
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop the scheduler loop."""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def run(self):
+        """Check for due subscriptions at a fixed interval."""
+        while True:
+            try:
+                await self.enqueue_due()
+            except sqlite3.Error as e:
+                log.error(f"Failed to check subscriptions: {type(e).__name__}: {e}")
+
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+            self.wakeup.clear()
+
+    def wake(self):
+        """Check for due subscriptions without waiting for the next interval."""
+        self.wakeup.set()
+
+    async def enqueue_due(self):
+        """Submit a job for each subscription that is due."""
+        due = await asyncio.to_thread(self.store.claim_due, time.time())
+        queued = 0
+
+        for subscription in due:
+            if await self.dispatcher.has_active_subscription(subscription["id"]):
+                log.debug(f"Subscription {subscription['id']} is still in progress, skipping")
+                continue
+
+            job = jobs.Job(
+                subscription["url"],
+                request_options(subscription),
+                priority=jobs.PRIORITY_LOW,
+                subscription_id=subscription["id"],
+            )
+            await self.dispatcher.submit(job)
+            queued += 1
+
+        if queued:
+            log.info(f"Queued {queued} subscription(s) for incremental update")
@@ -3,9 +3,8 @@
 import os
 import sys
 
-from importlib import metadata
-
 WINDOWS = os.name == "nt"
+MACOS = sys.platform == "darwin"
 DOCKER = os.path.isfile("/.dockerenv")
 KUBERNETES = os.environ.get("KUBERNETES_SERVICE_HOST") is not None
 EXECUTABLE = bool(getattr(sys, "frozen", False))
@@ -44,6 +43,17 @@ def get_log_file_path(log_dir: str):
     return os.path.join(log_dir, filename)
 
 
+def get_database_path(data_dir: str, log_file: str):
+    """Get database file path depending on the runtime environment."""
+    if not data_dir:
+        if CONTAINER and os.path.isdir("/config"):
+            data_dir = "/config"
+        else:
+            data_dir = os.path.dirname(log_file)
+
+    return os.path.join(data_dir, "gallery-dl-server.db")
+
+
 def dirname_parent(path: str):
     """Return grandparent directory of the given path."""
     return os.path.dirname(os.path.dirname(path))
@@ -69,8 +79,17 @@ def is_package(package_name: str):
 def is_package_installed(installed_name: str):
     """Check if the package is installed in the current environment and not
     in the current working directory."""
-    installed = {dist.metadata["Name"] for dist in metadata.distributions()}
-    return installed_name in installed if not is_package(get_package_name()) else False
+    if is_package(get_package_name()):
+        return False
+
+    from importlib import metadata
+
+    try:
+        metadata.distribution(installed_name)
+    except metadata.PackageNotFoundError:
+        return False
+
+    return True
 
 
 def normalise_path(path: str):
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+
+import atexit
+import os
+import shutil
+import tempfile
+
+# The log file and database paths are resolved on import, so keep them out of the working directory
+if not os.environ.get("LOG_DIR"):
+    os.environ["LOG_DIR"] = tempfile.mkdtemp(prefix="gallery-dl-server-tests-")
+    atexit.register(shutil.rmtree, os.environ["LOG_DIR"], ignore_errors=True)
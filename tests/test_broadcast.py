@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+import pytest
+
+from gallery_dl_server import broadcast
+
+
+@pytest.fixture
+def lookups():
+    return []
+
+
+@pytest.fixture
+def broadcaster(tmp_path, lookups):
+    def get_job_domain(job_id):
+        lookups.append(job_id)
+        return "other.example"
+
+    return broadcast.LogBroadcaster(str(tmp_path / "app.log"), dict, get_job_domain=get_job_domain)
+
+
+@pytest.mark.parametrize(
+    "params, expected",
+    [
+        ({"q": "HELLO"}, [True, False, False]),
+        ({"level": "warning"}, [False, True, True]),
+        ({"job": "a,c"}, [True, False, True]),
+        ({"domain": "Example.com"}, [True, True, False]),
+        ({"domain": "example.com", "q": "world"}, [False, True, False]),
+    ],
+)
+def test_filter_matches_lines(params, expected):
+    log_filter = broadcast.LogFilter.from_params(params)
+    lines = [
+        ("hello", logging.INFO, "a", "example.com"),
+        ("world", logging.WARNING, "b", "example.com"),
+        ("(a+)+$", logging.ERROR, "c", None),
+    ]
+
+    assert [log_filter.match_line(*line) for line in lines] == expected
+
+
+def test_filter_treats_text_literally():
+    log_filter = broadcast.LogFilter.from_params({"q": "(a+)+$"})
+
+    assert not log_filter.match_line("a" * 50 + "!", 0, None, None)
+    assert log_filter.match_line("pattern (A+)+$ found", 0, None, None)
+
+
+def test_filter_params():
+    assert broadcast.LogFilter.from_params({}) is None
+    assert broadcast.LogFilter.from_params({"regex": "a+"}) is None
+
+    with pytest.raises(ValueError, match="at most"):
+        broadcast.LogFilter.from_params({"q": "x" * (broadcast.TEXT_MAX_LENGTH + 1)})
+
+    with pytest.raises(ValueError):
+        broadcast.LogFilter.from_params({"level": "loud"})
+
+
+def test_known_domains_are_not_looked_up(broadcaster, lookups):
+    broadcaster.add_job("a", "example.com")
+    lines = [
+        "2026-01-01 00:00:00 [info] [job:a] Downloading",
+        "2026-01-01 00:00:01 [warning] [job:b] Retrying",
+        "2026-01-01 00:00:02 [error] [job:b] Failed",
+        "Traceback (most recent call last):",
+    ]
+
+    assert broadcaster.describe(lines) == [
+        (logging.INFO, "a", "example.com"),
+        (logging.WARNING, "b", "other.example"),
+        (logging.ERROR, "b", "other.example"),
+        (logging.ERROR, "b", "other.example"),
+    ]
+    assert lookups == ["b"]
+    assert broadcaster.get_domain("c") is None
+    assert lookups == ["b"]
+
+
+def test_job_domains_are_bounded(broadcaster, monkeypatch):
+    monkeypatch.setattr(broadcast, "JOB_DOMAINS_MAX", 2)
+
+    for job_id in ("a", "b", "c"):
+        broadcaster.add_job(job_id, job_id + ".example")
+
+    assert list(broadcaster.job_domains) == ["b", "c"]
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import gallery_dl_server
+
+from gallery_dl_server import broker, jobs
+
+LEASE = 60
+
+
+@pytest.fixture(params=broker.BROKERS)
+def job_broker(request, tmp_path):
+    return broker.get_broker(request.param, str(tmp_path / "jobs.db"))
+
+
+def test_broker_is_abstract():
+    with pytest.raises(TypeError):
+        broker.Broker()
+
+
+def test_submit_returns_queued_duplicate(job_broker):
+    first = job_broker.submit(jobs.Job("https://example.org/1", {"a": "b"}))
+    second = job_broker.submit(jobs.Job("https://example.org/1", {"a": "b"}))
+    other = job_broker.submit(jobs.Job("https://example.org/1", {"a": "c"}))
+
+    assert second.id == first.id
+    assert other.id != first.id
+    assert job_broker.count("queued") == 2
+
+
+def test_claim_by_priority_and_lock_url(job_broker):
+    low = job_broker.submit(jobs.Job("https://example.org/1", {}, priority=jobs.PRIORITY_LOW))
+    high = job_broker.submit(jobs.Job("https://example.org/2", {}, priority=jobs.PRIORITY_HIGH))
+    same_url = job_broker.submit(jobs.Job("https://example.org/2", {"x": "y"}))
+
+    assert job_broker.claim("a", LEASE).id == high.id
+    assert job_broker.claim("b", LEASE).id == low.id
+    # The URL of the running job is locked
+    assert job_broker.claim("b", LEASE) is None
+
+    running = job_broker.get(high.id)
+    assert running.status == "running" and running.worker == "a"
+    assert job_broker.get(same_url.id).status == "queued"
+
+
+def test_finish_releases_url_and_records_stats(job_broker):
+    first = job_broker.submit(jobs.Job("https://example.org/1", {}))
+    second = job_broker.submit(jobs.Job("https://example.org/1", {"x": "y"}))
+
+    job = job_broker.claim("a", LEASE)
+    assert job.id == first.id
+
+    job.status = "finished"
+    job.exit_code = 0
+    job.usage = {"cpu_time": 1.5}
+    assert job_broker.finish(job)
+
+    assert job_broker.get(first.id).status == "finished"
+    assert job_broker.claim("a", LEASE).id == second.id
+
+    (stats,) = job_broker.domain_stats()
+    assert stats["domain"] == "example.org"
+    assert stats["jobs"] == 1 and stats["cpu_time"] == 1.5
+
+
+def test_expired_lease_cannot_finish_or_requeue(job_broker):
+    submitted = job_broker.submit(jobs.Job("https://example.org/1", {}))
+
+    stale = job_broker.claim("a", -1)
+    current = job_broker.claim("b", LEASE)
+    assert stale.id == current.id == submitted.id
+
+    stale.status = "failed"
+    assert not job_broker.finish(stale)
+    assert not job_broker.requeue(stale)
+    assert job_broker.get(submitted.id).worker == "b"
+    assert job_broker.domain_stats() == []
+
+    current.status = "finished"
+    assert job_broker.finish(current)
+    assert job_broker.get(submitted.id).status == "finished"
+
+
+def test_expired_lease_finishes_if_not_claimed_again(job_broker):
+    job_broker.submit(jobs.Job("https://example.org/1", {}))
+
+    job = job_broker.claim("a", -1)
+    job.status = "finished"
+
+    assert job_broker.finish(job)
+
+
+def test_renew_only_for_own_jobs(job_broker):
+    job_broker.submit(jobs.Job("https://example.org/1", {}))
+    job = job_broker.claim("a", -1)
+
+    job_broker.renew([job.id], "b", LEASE)
+    assert job_broker.claim("b", LEASE) is not None
+
+    job_broker.renew([job.id], "a", LEASE)
+    assert not job_broker.requeue(job)
+
+
+def test_requeue_with_delay(job_broker):
+    submitted = job_broker.submit(jobs.Job("https://example.org/1", {}))
+    job = job_broker.claim("a", LEASE)
+
+    assert job_broker.requeue(job, delay=60)
+    assert job_broker.get(submitted.id).status == "queued"
+    assert job_broker.claim("a", LEASE) is None
+
+    assert job_broker.requeue(job) is False
+
+
+def test_cooldown_holds_back_domain(job_broker):
+    job_broker.submit(jobs.Job("https://example.org/1", {}))
+    job_broker.cooldown("example.org", 2**40)
+
+    assert job_broker.claim("a", LEASE) is None
+
+
+def test_run_rejects_memory_broker_with_workers():
+    with pytest.raises(ValueError):
+        gallery_dl_server.run(workers=2, broker="memory")
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import os
+
+import pytest
+
+from gallery_dl_server import listing
+
+
+def render(entries, next_entry, total):
+    return json.dumps([[entry[0] for entry in entries], next_entry, total]).encode()
+
+
+@pytest.fixture
+def directory(tmp_path):
+    for name in ("b.jpg", "a10.mp4", "a2.txt"):
+        (tmp_path / name).write_bytes(b"x" * len(name))
+    (tmp_path / "sub").mkdir()
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, False),
+        ("", False),
+        ("*", True),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", "abc"', True),
+        (' "xyz" ,W/"abc" ', True),
+        ('"xyz"', False),
+        ("abc", False),
+    ],
+)
+def test_etag_matches(header, expected):
+    assert listing.etag_matches(header, '"abc"') is expected
+
+
+def test_page_etag_depends_on_body():
+    page = listing.ListingPage(b"[]")
+
+    assert page.etag == listing.ListingPage(b"[]").etag
+    assert page.etag != listing.ListingPage(b"[1]").etag
+    assert page.etag.startswith('"') and page.etag.endswith('"')
+
+
+def test_cache_reuses_pages_until_invalidated(directory):
+    cache = listing.ListingCache()
+    cache.watch(directory)
+    query = listing.ListingQuery()
+
+    page = asyncio.run(cache.get_page(directory, query, render))
+
+    assert directory in cache.listings
+    assert asyncio.run(cache.get_page(directory, query, render)) is page
+
+    cache.invalidate([os.path.join(directory, "b.jpg")])
+
+    assert directory not in cache.listings
+    assert asyncio.run(cache.get_page(directory, query, render)) is not page
+
+
+def test_cache_skips_directories_outside_root(directory, tmp_path_factory):
+    cache = listing.ListingCache()
+    cache.watch(str(tmp_path_factory.mktemp("root")))
+
+    page = asyncio.run(cache.get_page(directory, listing.ListingQuery(), render))
+
+    assert not cache.listings
+    assert json.loads(page.body)[2] == 4
+
+
+def test_cache_drops_listings_above_max_size(directory):
+    cache = listing.ListingCache(max_size=1)
+    cache.watch(directory)
+
+    asyncio.run(cache.get_page(directory, listing.ListingQuery(), render))
+
+    assert not cache.listings
+    assert cache.size == 0
+
+
+def test_cache_detects_unreported_changes(directory):
+    cache = listing.ListingCache()
+    cache.watch(directory)
+    query = listing.ListingQuery()
+
+    page = asyncio.run(cache.get_page(directory, query, render))
+    os.mkdir(os.path.join(directory, "new"))
+    os.utime(directory, ns=(0, cache.listings[directory].mtime_ns + 1))
+
+    assert json.loads(asyncio.run(cache.get_page(directory, query, render)).body)[2] == 5
+    assert page.body != cache.listings[directory].pages[query.key].body
+
+
+@pytest.fixture
+def pages_directory(tmp_path):
+    names = ["File10.jpg", "file2.jpg", "file1.png", "clip.mp4", "song.mp3", "notes.txt"]
+    for index, name in enumerate(names):
+        path = tmp_path / name
+        path.write_bytes(b"x" * (index % 3))
+        os.utime(path, (1000 + index % 2, 1000 + index % 2))
+    for name in ("dir2", "Dir10", "dir1"):
+        (tmp_path / name).mkdir()
+    return str(tmp_path)
+
+
+def read_pages(select, query_params):
+    """Return the names of all pages of a listing, following the cursors."""
+    params = dict(query_params)
+    names: list[str] = []
+
+    while True:
+        entries, next_entry, total = select(listing.ListingQuery.from_params(params))
+        names += [entry[0] for entry in entries]
+
+        if next_entry is None:
+            return names, total
+
+        params["cursor"] = listing.encode_cursor(next_entry)
+
+
+QUERIES = [
+    {},
+    {"order": "desc"},
+    {"sort": "size"},
+    {"sort": "size", "order": "desc"},
+    {"sort": "mtime", "order": "desc"},
+    {"type": "image"},
+    {"type": "dir", "order": "desc"},
+    {"type": "file"},
+    {"name": "FILE"},
+]
+
+
+def test_select_entries_orders_and_filters(pages_directory):
+    def names(params):
+        query = listing.ListingQuery.from_params(params)
+        return [entry[0] for entry in listing.select_entries(pages_directory, query)[0]]
+
+    assert names({}) == [
+        "dir1",
+        "dir2",
+        "Dir10",
+        "clip.mp4",
+        "file1.png",
+        "file2.jpg",
+        "File10.jpg",
+        "notes.txt",
+        "song.mp3",
+    ]
+    assert names({"order": "desc"})[:5] == ["Dir10", "dir2", "dir1", "song.mp3", "notes.txt"]
+    assert names({"sort": "size", "type": "file"})[:4] == [
+        "clip.mp4",
+        "File10.jpg",
+        "file2.jpg",
+        "song.mp3",
+    ]
+    assert names({"type": "image"}) == ["file1.png", "file2.jpg", "File10.jpg"]
+    assert names({"type": "audio"}) == ["song.mp3"]
+    assert names({"name": "DIR"}) == ["dir1", "dir2", "Dir10"]
+
+
+@pytest.mark.parametrize("params", QUERIES)
+@pytest.mark.parametrize("limit", ["1", "2", "4"])
+def test_pages_match_full_listing(pages_directory, params, limit):
+    def single_pass(query):
+        return listing.select_entries(pages_directory, query)
+
+    expected = read_pages(single_pass, params)
+    cached = listing.DirectoryListing.scan(pages_directory)
+
+    assert expected[1] == 9
+    assert read_pages(single_pass, dict(params, limit=limit)) == expected
+    assert read_pages(cached.select, dict(params, limit=limit)) == expected
+    assert read_pages(cached.select, params) == expected
+
+
+def test_select_entries_stats_page_entries(pages_directory):
+    entries, _, _ = listing.select_entries(pages_directory, listing.ListingQuery(limit=4))
+
+    assert entries[3] == ("clip.mp4", False, 0, 1001)
+
+
+def test_cursor_survives_removed_entries(pages_directory):
+    query = listing.ListingQuery(limit=4)
+    _, next_entry, _ = listing.select_entries(pages_directory, query)
+    os.remove(os.path.join(pages_directory, next_entry[0]))
+
+    entries, _, _ = listing.select_entries(
+        pages_directory, listing.ListingQuery(limit=2, cursor=next_entry)
+    )
+
+    assert [entry[0] for entry in entries] == ["file1.png", "file2.jpg"]
+
+
+@pytest.mark.parametrize(
+    "entry", [("name", False, 1, 2), ("ä/b", True, 0, 0), ("", False, 2**40, -1)]
+)
+def test_cursor_round_trip(entry):
+    cursor = listing.encode_cursor(entry)
+
+    assert "=" not in cursor
+    assert listing.decode_cursor(cursor) == entry
+
+
+@pytest.mark.parametrize(
+    "cursor", ["!", "bm90IGpzb24", "WzEsMiwzXQ", "WyJhIiwxLDIsM10", "WyJhIixmYWxzZSwxLjUsMl0"]
+)
+def test_decode_cursor_rejects_invalid(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        listing.decode_cursor(cursor)
+
+
+@pytest.mark.parametrize(
+    "params, message",
+    [
+        ({"sort": "date"}, "Invalid sort"),
+        ({"order": "up"}, "Invalid order"),
+        ({"type": "text"}, "Invalid type"),
+        ({"limit": "ten"}, "Invalid limit"),
+        ({"limit": "0"}, "Limit must be between"),
+        ({"limit": str(listing.PAGE_LIMIT_MAX + 1)}, "Limit must be between"),
+        ({"cursor": "!"}, "Invalid cursor"),
+    ],
+)
+def test_query_rejects_invalid_params(params, message):
+    with pytest.raises(ValueError, match=message):
+        listing.ListingQuery.from_params(params)
+
+
+def test_query_defaults_for_empty_params():
+    query = listing.ListingQuery.from_params({"sort": "", "order": "", "type": "", "limit": ""})
+
+    assert query.key == ("name", False, "", None, None, None)
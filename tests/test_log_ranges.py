@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+from gallery_dl_server import server
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-99", (0, 100)),
+        ("bytes=10-", (10, 1000)),
+        ("bytes=-100", (900, 1000)),
+        ("bytes=-5000", (0, 1000)),
+        ("bytes=990-5000", (990, 1000)),
+        (" bytes = 5-5 ", (5, 6)),
+    ],
+)
+def test_parse_byte_range(header, expected):
+    assert server.parse_byte_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "items=0-99",
+        "bytes=0-9,20-29",
+        "bytes=-",
+        "bytes=5",
+        "bytes=abc-",
+        "bytes=--5",
+        "bytes=+5-",
+        "bytes=50-10",
+        "bytes=٣-",
+    ],
+)
+def test_parse_byte_range_ignores_invalid_ranges(header):
+    assert server.parse_byte_range(header, 1000) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=2000-3000", "bytes=-0"])
+def test_parse_byte_range_unsatisfiable(header):
+    with pytest.raises(ValueError):
+        server.parse_byte_range(header, 1000)
+
+
+@pytest.fixture
+def log_stat(tmp_path):
+    path = tmp_path / "test.log"
+    path.write_bytes(b"line\n" * 20)
+    return os.stat(path)
+
+
+def test_parse_log_cursor(log_stat):
+    assert server.parse_log_cursor(f"{log_stat.st_ino}:0", log_stat) == 0
+    assert server.parse_log_cursor(f"{log_stat.st_ino}:100", log_stat) == 100
+
+
+def test_parse_log_cursor_after_rotation(log_stat):
+    # Another file, or a cursor past the end of a cleared file
+    assert server.parse_log_cursor(f"{log_stat.st_ino + 1}:10", log_stat) is None
+    assert server.parse_log_cursor(f"{log_stat.st_ino}:101", log_stat) is None
+
+
+@pytest.mark.parametrize("cursor", ["", "123", "abc:1", "1:abc", "1:-1"])
+def test_parse_log_cursor_invalid(cursor, log_stat):
+    with pytest.raises(ValueError):
+        server.parse_log_cursor(cursor, log_stat)
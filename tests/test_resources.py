@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from gallery_dl_server import resources
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(None, None), (60, 60), (1.5, 1.5), ("60", 60), ("90s", 90), ("30m", 1800), ("1.5H", 5400)],
+)
+def test_parse_duration(value, expected):
+    assert resources.parse_duration(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "1 hour", "-5", "1h30m", -1, True, [60], {"s": 1}])
+def test_parse_duration_rejects_invalid(value):
+    with pytest.raises(ValueError, match="Invalid duration"):
+        resources.parse_duration(value)
+
+
+def test_limits_from_config():
+    limits = resources.ResourceLimits.from_config({"rss": "2G", "cpu": "1h", "time": 7200})
+
+    assert (limits.max_rss, limits.max_cpu, limits.max_time) == (2 * 1024**3, 3600, 7200)
+    assert limits.exceeded({"cpu_time": 3601}) == "CPU time limit of 3600.0 exceeded"
+    assert limits.exceeded({"cpu_time": 10, "wall_time": 10}) is None
+    assert not resources.ResourceLimits.from_config(None)
+
+
+@pytest.mark.parametrize("conf", [{"rss": "lots"}, {"cpu": "1 hour"}, {"time": [60]}])
+def test_limits_from_config_rejects_invalid(conf):
+    with pytest.raises(ValueError):
+        resources.ResourceLimits.from_config(conf)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from gallery_dl_server import rules
+
+
+def rule_set(*entries: dict):
+    return rules.RuleSet([rules.Rule.from_config(entry) for entry in entries])
+
+
+def patterns(matched):
+    return [rule.pattern for rule in matched]
+
+
+def test_overlapping_rules_all_match():
+    rule_set_ = rule_set(
+        {"pattern": "HTTP 429", "action": "retry"},
+        {"pattern": r"HTTP \d+", "action": "tag", "regex": True},
+        {"pattern": "login", "action": "kill"},
+        {"pattern": "login required", "action": "tag"},
+    )
+
+    matched = rule_set_.match("got HTTP 429 login required")
+
+    assert patterns(matched) == ["HTTP 429", r"HTTP \d+", "login", "login required"]
+
+
+def test_literal_prefix_of_longer_literal():
+    rule_set_ = rule_set(
+        {"pattern": "login", "action": "kill"},
+        {"pattern": "login required", "action": "tag"},
+    )
+
+    assert patterns(rule_set_.match("login required")) == ["login", "login required"]
+    assert patterns(rule_set_.match("login failed")) == ["login"]
+
+
+def test_no_match():
+    rule_set_ = rule_set({"pattern": "HTTP 429", "action": "retry"})
+
+    assert patterns(rule_set_.match("HTTP 404")) == []
+    assert patterns(rules.RuleSet([]).match("HTTP 429")) == []
+
+
+def test_patterns_that_cannot_be_combined():
+    rule_set_ = rule_set(
+        {"pattern": r"(?P<code>4\d\d)", "action": "tag", "regex": True},
+        {"pattern": r"(?P<code>5\d\d)", "action": "tag", "regex": True},
+    )
+
+    assert patterns(rule_set_.match("HTTP 503")) == [r"(?P<code>5\d\d)"]
+
+
+def test_triggered_counts_each_rule_once_per_message():
+    rule_set_ = rule_set({"pattern": "error", "action": "kill", "count": 2})
+    counts: dict[rules.Rule, int] = {}
+
+    assert rule_set_.triggered("error error", counts) == []
+    assert patterns(rule_set_.triggered("error", counts)) == ["error"]
+
+
+def test_invalid_rules():
+    with pytest.raises(ValueError):
+        rules.Rule.from_config({"pattern": "(", "action": "tag", "regex": True})
+
+    with pytest.raises(ValueError):
+        rules.Rule.from_config({"pattern": "x", "action": "explode"})
+
+
+def test_from_config_caches_only_the_last_rule_set():
+    first = [{"pattern": "first", "action": "tag"}]
+    second = [{"pattern": "second", "action": "tag"}]
+
+    rule_set_ = rules.RuleSet.from_config(first)
+    assert rules.RuleSet.from_config(first) is rule_set_
+
+    assert patterns(rules.RuleSet.from_config(second).match("second")) == ["second"]
+    assert rules._cache is not None and rules._cache[1] is not rule_set_
+    assert rules.RuleSet.from_config(first) is not rule_set_